@@ -0,0 +1,6 @@
+"""Performance measurements for pylgrum.
+
+These are not shipped with the package. Each module is runnable with
+`python -m benchmarks.<module>` from the repository root, and prints its
+results as JSON.
+"""
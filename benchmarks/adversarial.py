@@ -0,0 +1,132 @@
+"""Search for the hands that are hardest for meld detection.
+
+Usage:
+    python -m benchmarks.adversarial [--hands N] [--restarts R] [--steps S]
+                                     [--seed SEED] [--write VERSION]
+
+MeldDetector.detect_optimal_melds() is quick unless complete melds in the
+hand share cards. When they do, it tries every ordering of up to three of
+the "overused" melds, so its cost grows with the cube of their number - and
+hands like a long run (every 3-card stretch of it is a meld) or a 4-card set
+crossing several runs take seconds to minutes. Random deals almost never
+produce them.
+
+This module finds such hands by local search. Each hand is scored by
+(orderings tried, overused melds, complete melds), and the search starts
+both from random deals and from structured seeds - long runs, grids of
+runs crossed with sets - then repeatedly swaps a card in the hand for one
+outside it, keeping any swap that doesn't lower the score. Hands that differ
+only by a relabelling of suits are counted once.
+
+The hardest N hands found are printed, or with --write stored as the
+"adversarial" corpus of that corpus version (see `benchmarks.corpora`),
+hardest first, with their scores.
+"""
+
+import argparse
+import json
+import random
+
+from benchmarks import corpora
+from pylgrum.meld_solver import canonical_mask, mask_indices
+from pylgrum.solver_fuzz import meld_conflicts
+
+def conflict_score(hand: int) -> tuple:
+    """Score how hard a hand is for MeldDetector.
+
+    Returns (orderings of overused melds tried, overused melds, complete
+    melds), to be compared as a tuple. See `pylgrum.solver_fuzz.meld_conflicts()`.
+    """
+    (orderings, overused, melds) = meld_conflicts(hand)
+    return (orderings if overused else 0, overused, melds)
+
+def _seeds() -> list:
+    """Structured starting hands: long runs, and runs crossed with sets."""
+    seeds = []
+    for length in range(6, 11):
+        for start in range(0, 14 - length):
+            seeds.append(sum(1 << rank for rank in range(start, start + length)))
+    for low in range(0, 10):
+        for width in (3, 4):
+            seeds.append(sum(1 << (suit * 13 + rank) for suit in range(3)
+                             for rank in range(low, low + width) if rank < 13))
+    for rank in range(1, 12):
+        # a 4-card set, each card in the middle of a run
+        seeds.append(sum(1 << (suit * 13 + rank) for suit in range(4))
+                     | sum(1 << (suit * 13 + rank + step) for suit in range(3)
+                           for step in (-1, 1)))
+    return seeds
+
+def _fill(hand: int, rng: random.Random) -> int:
+    """Trim or pad a hand to 10 cards at random."""
+    cards = mask_indices(hand)
+    while len(cards) > 10:
+        cards.remove(rng.choice(cards))
+    while len(cards) < 10:
+        index = rng.randrange(52)
+        if index not in cards:
+            cards.append(index)
+    return sum(1 << index for index in cards)
+
+def climb(hand: int, rng: random.Random, steps: int) -> tuple:
+    """Improve a hand by single-card swaps; return (score, hand)."""
+    score = conflict_score(hand)
+    for _ in range(steps):
+        held = mask_indices(hand)
+        out = rng.choice(held)
+        into = rng.randrange(52)
+        if hand >> into & 1:
+            continue
+        candidate = hand ^ (1 << out) ^ (1 << into)
+        candidate_score = conflict_score(candidate)
+        if candidate_score >= score:
+            (hand, score) = (candidate, candidate_score)
+    return (score, hand)
+
+def generate(hands: int = 50, restarts: int = 200, steps: int = 400,
+             seed: int = None) -> list:
+    """Search for the hardest hands; return [(score, card indices)], hardest first.
+
+    Args:
+        hands (int): [optional] number of hands to return
+        restarts (int): [optional] random starting deals to climb from
+            (as well as every structured seed)
+        steps (int): [optional] swaps tried in each climb
+        seed (int): [optional] seed for the search
+    """
+    rng = random.Random(seed)
+    found = {}
+    starts = [_fill(start, rng) for start in _seeds()]
+    starts += [_fill(0, rng) for _ in range(restarts)]
+    for start in starts:
+        (score, hand) = climb(start, rng, steps)
+        for candidate in (start, hand):
+            key = canonical_mask(candidate)
+            if key not in found:
+                found[key] = conflict_score(key)
+    ranked = sorted(found.items(), key=lambda item: (item[1], -item[0]), reverse=True)
+    return [(score, mask_indices(hand)) for (hand, score) in ranked[:hands]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--hands", type=int, default=50)
+    parser.add_argument("--restarts", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--write", type=int, default=None, metavar="VERSION",
+                        help="store the hands as corpus version VERSION's adversarial corpus")
+    args = parser.parse_args()
+    found = generate(args.hands, args.restarts, args.steps, args.seed)
+    if args.write is None:
+        print(json.dumps([{"score": score, "hand": hand} for (score, hand) in found]))
+        return
+    path = corpora.write_corpus(
+        args.write, "adversarial",
+        "the hands with the most overlapping melds found by local search "
+        "(benchmarks.adversarial), hardest first",
+        args.seed, [hand for (_, hand) in found],
+        scores=[list(score) for (score, _) in found])
+    print(json.dumps([path], indent=2))
+
+if __name__ == '__main__':
+    main()
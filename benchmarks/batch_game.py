@@ -0,0 +1,78 @@
+"""Benchmark stepping games in a BatchGame against stepping Game objects.
+
+Usage:
+    python -m benchmarks.batch_game [--games K] [--seed SEED]
+
+Both engines play K games to the end with the same trivial policy (draw,
+then discard the lowest-indexed card legal to discard, knocking if that is
+legal), so the timings are dominated by the engines themselves: dealing,
+legality checks, moving cards and ending games.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from pylgrum.batch_game import DRAW, BatchGame
+from pylgrum.game import Game
+from pylgrum.meld_solver import cards_to_mask, deadwood_value
+from pylgrum.player import Player
+
+class LowestCardPlayer(Player):
+    """Player with the policy described above, for Game."""
+
+    def turn_start(self, move) -> None:
+        move.choose_card_from_draw()
+
+    def turn_finish(self, move) -> None:
+        card = min(self.hand.cards, key=lambda card: card.index)
+        hand = cards_to_mask(self.hand.cards)
+        move.knocking = deadwood_value(hand ^ (1 << card.index)) <= 10
+        move.discard(card)
+
+def _batch_policy(legal: int) -> int:
+    if legal >> DRAW & 1:
+        return DRAW
+    low_bit = legal & -legal
+    index = low_bit.bit_length() - 1
+    return index + 52 if legal >> (index + 52) & 1 else index
+
+def run(games: int, seed: int = None) -> dict:
+    """Time K games in a BatchGame and as Game objects."""
+    random.seed(seed)
+    start = time.perf_counter()
+    decisions = 0
+    for _ in range(games):
+        game = Game(LowestCardPlayer(), LowestCardPlayer())
+        game.play()
+        decisions += 2 * (game.num_moves + 1)
+    game_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = BatchGame(games, seed=seed)
+    steps = 0
+    batch_decisions = 0
+    while not all(batch.is_over):
+        legal = batch.legal_actions()
+        batch_decisions += sum(1 for actions in legal if actions)
+        batch.step([_batch_policy(actions) if actions else None for actions in legal], legal)
+        steps += 1
+    batch_seconds = time.perf_counter() - start
+    return {
+        "games": games,
+        "game_decisions_per_second": decisions / game_seconds,
+        "batch_decisions_per_second": batch_decisions / batch_seconds,
+        "batch_steps": steps,
+        "speedup": (batch_decisions / batch_seconds) / (decisions / game_seconds),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.games, args.seed), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Store benchmark baselines, and flag statistically significant regressions.
+
+Usage:
+    python -m benchmarks.compare save NAME [--results FILE] [--repeat R] ...
+    python -m benchmarks.compare check NAME [--results FILE] [--repeat R]
+                                 [--threshold T] [--confidence C] ...
+
+`save` runs the benchmark suite (see `benchmarks.suite`), or reads the
+results of an earlier run from FILE, and stores them as baseline NAME.
+`check` does the same and compares the results with baseline NAME,
+printing a JSON report; it exits with status 1 if anything regressed.
+
+Each benchmark's repetitions are compared with the baseline's by
+bootstrapping: both sets of per-operation times are resampled many times,
+giving a confidence interval for the ratio of the current median time to the
+baseline's. A benchmark has regressed only if the whole interval is above
+1 + T - that is, if it is confidently more than T slower - and has improved
+only if the whole interval is below 1 / (1 + T). Anything else is
+"unchanged". With few repetitions the intervals are wide, so use at least
+five (the default here is ten).
+
+Baselines are stored as JSON in `benchmarks/baselines/` (or --store DIR).
+They are only meaningful on the machine that made them, so they aren't
+kept in the repository.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+
+from benchmarks import suite
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+def baseline_path(name: str, store: str = STORE_DIR) -> str:
+    """Return where baseline name is stored."""
+    return os.path.join(store, "{}.json".format(name))
+
+def save(name: str, results: dict, store: str = STORE_DIR) -> str:
+    """Store suite results as baseline name; return its path."""
+    os.makedirs(store, exist_ok=True)
+    path = baseline_path(name, store)
+    with open(path, "w") as out:
+        json.dump(results, out, indent=2)
+        out.write("\n")
+    return path
+
+def load(name: str, store: str = STORE_DIR) -> dict:
+    """Return the suite results stored as baseline name."""
+    with open(baseline_path(name, store)) as baseline:
+        return json.load(baseline)
+
+def ratio_interval(baseline: list, current: list, confidence: float = 0.95,
+                   resamples: int = 2000, seed: int = 0) -> tuple:
+    """Bootstrap a confidence interval for median(current) / median(baseline).
+
+    Args:
+        baseline (list): the baseline's per-operation times
+        current (list): the current per-operation times
+        confidence (float): [optional] the interval's confidence level
+        resamples (int): [optional] number of bootstrap resamples
+        seed (int): [optional] seed, so that reports are reproducible
+
+    Returns (ratio of medians, low end, high end).
+    """
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        cur = statistics.median(rng.choices(current, k=len(current)))
+        ratios.append(cur / base)
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (resamples - 1))]
+    high = ratios[int(round((1 - tail) * (resamples - 1)))]
+    return (statistics.median(current) / statistics.median(baseline), low, high)
+
+def compare(baseline: dict, current: dict, threshold: float = 0.05,
+            confidence: float = 0.95) -> dict:
+    """Compare two sets of suite results.
+
+    Args:
+        baseline (dict): results from `benchmarks.suite.run()` to compare with
+        current (dict): results to check
+        threshold (float): [optional] the smallest slowdown (as a fraction)
+            worth flagging
+        confidence (float): [optional] confidence level of the intervals
+
+    Returns a report: {"regressions": [names], "improvements": [names],
+    "benchmarks": {name: {...}}}. Benchmarks found in only one set of
+    results are reported as "new" or "missing".
+
+    Raises ValueError if the results are from different suite or corpus
+    versions, which measure different things.
+    """
+    for key in ("suite_version", "corpus_version"):
+        if baseline.get(key) != current.get(key):
+            raise ValueError("can't compare results with different {}s ({} vs {})".format(
+                key.replace("_", " "), baseline.get(key), current.get(key)))
+    report = {"regressions": [], "improvements": [], "benchmarks": {}}
+    names = sorted(set(baseline["results"]) | set(current["results"]))
+    for name in names:
+        if name not in current["results"]:
+            report["benchmarks"][name] = {"verdict": "missing"}
+            continue
+        if name not in baseline["results"]:
+            report["benchmarks"][name] = {"verdict": "new"}
+            continue
+        base = baseline["results"][name]["samples_us"]
+        cur = current["results"][name]["samples_us"]
+        (ratio, low, high) = ratio_interval(base, cur, confidence)
+        if low > 1 + threshold:
+            verdict = "regression"
+            report["regressions"].append(name)
+        elif high < 1 / (1 + threshold):
+            verdict = "improvement"
+            report["improvements"].append(name)
+        else:
+            verdict = "unchanged"
+        report["benchmarks"][name] = {
+            "verdict": verdict,
+            "baseline_median_us": statistics.median(base),
+            "current_median_us": statistics.median(cur),
+            "ratio": ratio,
+            "ci_low": low,
+            "ci_high": high,
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("command", choices=("save", "check"))
+    parser.add_argument("name", help="baseline name")
+    parser.add_argument("--results", default=None,
+                        help="suite results to use, instead of running the suite")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--hands", type=int, default=10)
+    parser.add_argument("--only", nargs="*", default=None)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as results:
+            current = json.load(results)
+    else:
+        current = suite.run(args.repeat, args.hands, args.only)
+
+    if args.command == "save":
+        print(json.dumps({"saved": save(args.name, current, args.store)}, indent=2))
+        return
+    report = compare(load(args.name, args.store), current, args.threshold, args.confidence)
+    print(json.dumps(report, indent=2))
+    if report["regressions"]:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
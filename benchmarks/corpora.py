@@ -0,0 +1,140 @@
+"""Fixed, versioned hand corpora for benchmarks.
+
+Usage:
+    python -m benchmarks.corpora --write VERSION [--hands N] [--seed SEED]
+
+Benchmarks should time the same hands from release to release, so the
+corpora are generated once and stored as JSON under
+`benchmarks/corpora/v<VERSION>/`, one file per corpus:
+
+    random         10 cards dealt at random
+    meld_dense     10 cards of which at least 9 are in complete 3- or 4-card
+                   melds
+    worst_overlap  a 3x3 grid of cards (three ranks in a row, in three suits:
+                   every card is in both a set and a run) plus one card
+                   extending a run or set - the hands with the most
+                   conflicting melds
+    adversarial    the hardest hands for MeldDetector that a local search
+                   could find (written by `benchmarks.adversarial`)
+
+Each file holds {"name", "version", "description", "seed", "hands"}, with
+each hand a list of card indices (see `pylgrum.card.Card.index`). A stored
+version is never rewritten: to change a corpus, write a new version and
+move CORPUS_VERSION on to it.
+"""
+
+import argparse
+import json
+import os
+import random
+
+from pylgrum.meld_solver import ALL_MELDS, mask_indices
+
+CORPUS_VERSION = 1
+"""The version of the corpora benchmarks use by default."""
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+
+def random_hand(rng: random.Random) -> list:
+    """Return 10 random card indices."""
+    return sorted(rng.sample(range(52), 10))
+
+SHORT_MELDS = tuple(meld for meld in ALL_MELDS if bin(meld).count("1") <= 4)
+
+def meld_dense_hand(rng: random.Random) -> list:
+    """Return 10 card indices, at least 9 of them in non-overlapping melds.
+
+    The melds are of 3 or 4 cards, as in most winning hands. (Longer runs
+    contain so many overlapping shorter runs that MeldDetector can take
+    minutes over a single hand.)
+    """
+    while True:
+        hand = 0
+        for meld in rng.sample(SHORT_MELDS, len(SHORT_MELDS)):
+            if not meld & hand and bin(hand | meld).count("1") <= 10:
+                hand |= meld
+            if bin(hand).count("1") >= 9:
+                break
+        if bin(hand).count("1") >= 9:
+            break
+    while bin(hand).count("1") < 10:
+        hand |= 1 << rng.choice([index for index in range(52) if not hand >> index & 1])
+    return mask_indices(hand)
+
+def worst_overlap_hand(rng: random.Random) -> list:
+    """Return a 3x3 grid of cards plus one that extends a meld."""
+    suits = rng.sample(range(4), 3)
+    low = rng.randrange(0, 11)
+    grid = [suit * 13 + rank for suit in suits for rank in range(low, low + 3)]
+    extras = [suit * 13 + rank for suit in suits for rank in (low - 1, low + 3)
+              if 0 <= rank < 13]
+    (fourth_suit,) = set(range(4)) - set(suits)
+    extras += [fourth_suit * 13 + rank for rank in range(low, low + 3)]
+    return sorted(grid + [rng.choice(extras)])
+
+GENERATORS = {
+    "random": (random_hand, "10 cards dealt at random"),
+    "meld_dense": (meld_dense_hand,
+                   "10 cards of which at least 9 are in complete 3- or 4-card melds"),
+    "worst_overlap": (worst_overlap_hand,
+                      "a 3x3 grid of ranks and suits plus one card extending "
+                      "a meld: every card is in several conflicting melds"),
+}
+
+def load(name: str, version: int = CORPUS_VERSION) -> list:
+    """Return the hands (lists of card indices) of a stored corpus."""
+    path = os.path.join(CORPUS_DIR, "v{}".format(version), "{}.json".format(name))
+    with open(path) as corpus:
+        return json.load(corpus)["hands"]
+
+def write_corpus(version: int, name: str, description: str, seed: int,
+                 hands: list, **extra) -> str:
+    """Store one corpus; return its path.
+
+    Args:
+        version (int): the corpus version to add it to
+        name (str): the corpus name
+        description (str): what the hands are
+        seed (int): the seed they were generated with
+        hands (list): the hands, as lists of card indices
+        **extra: [optional] further fields to store (e.g. per-hand scores)
+
+    Raises FileExistsError if that version already has a corpus of that name.
+    """
+    directory = os.path.join(CORPUS_DIR, "v{}".format(version))
+    path = os.path.join(directory, "{}.json".format(name))
+    if os.path.exists(path):
+        raise FileExistsError("corpus version {} already has {}".format(version, name))
+    os.makedirs(directory, exist_ok=True)
+    corpus = {
+        "name": name,
+        "version": version,
+        "description": description,
+        "seed": seed,
+        "hands": hands,
+    }
+    corpus.update(extra)
+    with open(path, "w") as out:
+        json.dump(corpus, out, separators=(",", ":"))
+        out.write("\n")
+    return path
+
+def write(version: int, hands: int, seed: int) -> list:
+    """Generate and store every generated corpus as a new version; return the paths."""
+    paths = []
+    for (name, (generator, description)) in sorted(GENERATORS.items()):
+        rng = random.Random("{}-{}".format(seed, name))
+        paths.append(write_corpus(version, name, description, seed,
+                                  [generator(rng) for _ in range(hands)]))
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--write", type=int, required=True, metavar="VERSION")
+    parser.add_argument("--hands", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(write(args.write, args.hands, args.seed), indent=2))
+
+if __name__ == '__main__':
+    main()
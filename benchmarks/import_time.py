@@ -0,0 +1,76 @@
+"""Measure the cold-start import time of pylgrum modules.
+
+Usage:
+    python -m benchmarks.import_time [--repeat R] [--modules NAME ...]
+
+Each module is imported R times, each time in a fresh interpreter started
+with `-X importtime`, and the report gives the minimum and median time the
+import took (including everything it imported in turn), in milliseconds,
+and which other pylgrum modules it pulled in. Module imports before the
+target's - the interpreter's own start-up - aren't counted.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = (
+    "pylgrum",
+    "pylgrum.card",
+    "pylgrum.meld_solver",
+    "pylgrum.scoring",
+    "pylgrum.game",
+    "pylgrum.server",
+    "pylgrum.server.game_manager",
+)
+
+def _parents(module: str) -> set:
+    """A module and the packages containing it: each is a top-level import."""
+    parts = module.split(".")
+    return {".".join(parts[:i]) for i in range(1, len(parts) + 1)}
+
+def _import_once(module: str) -> tuple:
+    """Import a module in a fresh interpreter; return (microseconds, pylgrum modules)."""
+    code = ("import json, sys; before = set(sys.modules); import {}; "
+            "print(json.dumps(sorted(m for m in set(sys.modules) - before "
+            "if m.startswith('pylgrum'))))").format(module)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    parents = _parents(module)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        (_, cumulative, name) = line[len("import time:"):].split("|")
+        # nested imports are indented; the import's own parts are not
+        if name.startswith("  ") or name.strip() not in parents:
+            continue
+        total += int(cumulative)
+    return (total, json.loads(result.stdout))
+
+def measure(modules: tuple = MODULES, repeat: int = 7) -> dict:
+    """Return {module: {"min_ms", "median_ms", "imports"}}."""
+    results = {}
+    for module in modules:
+        times = []
+        for _ in range(repeat):
+            (microseconds, imported) = _import_once(module)
+            times.append(microseconds / 1000)
+        results[module] = {
+            "min_ms": min(times),
+            "median_ms": statistics.median(times),
+            "imports": imported,
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--modules", nargs="*", default=list(MODULES))
+    args = parser.parse_args()
+    print(json.dumps(measure(tuple(args.modules), args.repeat), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark the layoff solver on adversarial hands.
+
+Usage:
+    python -m benchmarks.layoff [--cases N] [--seed SEED]
+
+The hands are built to make layoffs as hard as possible: the knocker holds
+two open-ended runs and a 3-card set, and the defender holds as many as
+possible of the cards that could be laid off on them (both ends of each run,
+two deep, and the set's fourth card), together with cards of the same ranks
+that would let them meld those cards instead.
+
+The solver is compared with brute force: trying every subset of the
+defender's hand as the laid-off cards.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from pylgrum.layoff import best_layoffs, layoff_options
+from pylgrum.meld_solver import cache_clear, mask_indices, optimal_melds
+
+def adversarial_case(rng: random.Random) -> tuple:
+    """Return (defender hand, knocker melds) as bitmasks."""
+    (run_suit_1, run_suit_2) = rng.sample(range(4), 2)
+    runs = []
+    for suit in (run_suit_1, run_suit_2):
+        low = rng.randrange(2, 9) # room for two cards either side
+        runs.append(sum(1 << (suit * 13 + rank) for rank in range(low, low + 3)))
+    taken = runs[0] | runs[1]
+    ranks = [rank for rank in range(13)
+             if not any(taken >> (suit * 13 + rank) & 1 for suit in range(4))]
+    set_rank = rng.choice(ranks)
+    set_suits = rng.sample(range(4), 3)
+    a_set = sum(1 << (suit * 13 + set_rank) for suit in set_suits)
+    melds = (runs[0], runs[1], a_set)
+    taken |= a_set
+
+    targets = [suit * 13 + set_rank for suit in range(4) if suit not in set_suits]
+    for run in runs:
+        indices = mask_indices(run)
+        targets += [indices[0] - 2, indices[0] - 1, indices[-1] + 1, indices[-1] + 2]
+    partners = [suit * 13 + target % 13 for target in targets for suit in range(4)
+                if suit * 13 + target % 13 not in targets]
+    hand = 0
+    for index in targets + rng.sample(partners, len(partners)):
+        if not (taken | hand) >> index & 1 and bin(hand).count("1") < 10:
+            hand |= 1 << index
+    others = [index for index in range(52) if not (taken | hand) >> index & 1]
+    for index in rng.sample(others, 10 - bin(hand).count("1")):
+        hand |= 1 << index
+    return (hand, melds)
+
+def brute_force(hand: int, melds: tuple) -> int:
+    """Minimum deadwood over every layable subset of hand."""
+    layable = set()
+    for choice in _all_choices(hand, melds):
+        layable.add(choice)
+    cards = mask_indices(hand)
+    best = None
+    for subset in range(1 << len(cards)):
+        layoffs = sum(1 << cards[i] for i in range(len(cards)) if subset >> i & 1)
+        if layoffs in layable:
+            deadwood = optimal_melds(hand & ~layoffs)[0]
+            best = deadwood if best is None else min(best, deadwood)
+    return best
+
+def _all_choices(hand: int, melds: tuple):
+    choices = {0}
+    for meld in melds:
+        choices = {choice | option for choice in choices
+                   for option in layoff_options(meld, hand)}
+    return choices
+
+def run(cases: int, seed: int = None) -> dict:
+    """Time the solver and brute force on adversarial cases."""
+    rng = random.Random(seed)
+    hands = [adversarial_case(rng) for _ in range(cases)]
+
+    cache_clear()
+    start = time.perf_counter()
+    results = [best_layoffs(hand, melds) for (hand, melds) in hands]
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for (hand, melds) in hands:
+        best_layoffs(hand, melds)
+    warm = time.perf_counter() - start
+
+    cache_clear()
+    start = time.perf_counter()
+    expected = [brute_force(hand, melds) for (hand, melds) in hands]
+    brute = time.perf_counter() - start
+
+    assert [result.deadwood for result in results] == expected
+    combinations = [len(_all_choices(hand, melds)) for (hand, melds) in hands]
+    return {
+        "cases": cases,
+        "solver_us_cold": cold / cases * 1e6,
+        "solver_us_warm": warm / cases * 1e6,
+        "brute_force_us": brute / cases * 1e6,
+        "mean_cards_laid_off": sum(bin(r.layoffs).count("1") for r in results) / cases,
+        "max_layoff_combinations": max(combinations),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--cases", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.cases, args.seed), indent=2))
+
+if __name__ == '__main__':
+    main()
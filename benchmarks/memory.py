@@ -0,0 +1,140 @@
+"""Measure the memory held by a GameManager's contestants and live games.
+
+Usage:
+    python -m benchmarks.memory [--contestants N] [--games M] [--turns T]
+                                [--seed SEED] [--top K] [--frames F]
+
+Registers N contestants with a GameManager, starts M games between the
+first 2M of them, and plays each game (through the GameManager, drawing or
+taking the discard and discarding a random card) for a random number of
+turns, up to T. Memory is traced with tracemalloc, and snapshots taken
+after each stage give:
+
+    bytes_per_contestant  growth from registering the contestants, over N
+    bytes_per_game        growth from starting the games, over M
+    bytes_per_game_played growth from starting and playing them, over M
+    top_sites             the K allocation sites (file:line, or with
+                          --frames the F innermost frames, outermost first)
+                          that grew most over the whole run
+
+One warm-up game is played before the first snapshot, so caches filled on
+first use (e.g. the shared Card instances) aren't charged to the first
+contestant or game. With the same arguments, runs are repeatable, so the
+figures can be tracked as Card, CardStack, HandWithMelds and Game shrink.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import tracemalloc
+
+from pylgrum.server.game_manager import GameManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAX_TURNS = 25
+"""The most turns a game can be played for without running out the draw pile."""
+
+def play_turn(manager: GameManager, game_id: str, rng: random.Random) -> None:
+    """Play one turn of a game, for whichever contestant's turn it is."""
+    game = manager.games[game_id]
+    player = game.current_player
+    manager.acquire_card(game_id, player.contestant_id, rng.choice(("draw", "discard")))
+    card = rng.choice(player.hand.cards)
+    manager.discard_card(game_id, player.contestant_id, card.suit.name, card.rank.name)
+
+def _snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+def _growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> int:
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+def _site(stat: tracemalloc.StatisticDiff) -> dict:
+    frames = ["{}:{}".format(os.path.relpath(frame.filename, ROOT)
+                             if frame.filename.startswith(ROOT) else frame.filename,
+                             frame.lineno)
+              for frame in stat.traceback]
+    return {"site": frames[0] if len(frames) == 1 else frames,
+            "size_bytes": stat.size_diff, "count": stat.count_diff}
+
+def measure(contestants: int, games: int, turns: int = MAX_TURNS,
+            seed: int = 1, top: int = 10, frames: int = 1) -> dict:
+    """Run the harness; return its report.
+
+    Args:
+        contestants (int): contestants to register
+        games (int): games to start (needs at least two contestants each)
+        turns (int): [optional] most turns to play in each game
+        seed (int): [optional] seed for the decks and the moves played
+        top (int): [optional] number of allocation sites to report
+        frames (int): [optional] stack frames to tell allocation sites apart by
+    """
+    if games * 2 > contestants:
+        raise ValueError("{} games need at least {} contestants".format(games, games * 2))
+    if not 0 <= turns <= MAX_TURNS:
+        raise ValueError("turns must be from 0 to {}".format(MAX_TURNS))
+    random.seed(seed) # Game shuffles its deck with the random module
+    rng = random.Random(seed)
+
+    warm_up = GameManager()
+    ids = [warm_up.add_contestant().id for _ in range(2)]
+    game_id = warm_up.create_game(*ids)["id"]
+    for _ in range(2):
+        play_turn(warm_up, game_id, rng)
+    del warm_up
+
+    tracemalloc.start(frames)
+    try:
+        start = _snapshot()
+        manager = GameManager()
+        ids = [manager.add_contestant().id for _ in range(contestants)]
+        registered = _snapshot()
+        game_ids = [manager.create_game(ids[2 * i], ids[2 * i + 1])["id"]
+                    for i in range(games)]
+        started = _snapshot()
+        played = 0
+        for game_id in game_ids:
+            for _ in range(rng.randint(0, turns)):
+                play_turn(manager, game_id, rng)
+                played += 1
+        end = _snapshot()
+        (_, peak) = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    key = "lineno" if frames == 1 else "traceback"
+    sites = [stat for stat in end.compare_to(start, key) if stat.size_diff > 0]
+    return {
+        "contestants": contestants,
+        "games": games,
+        "turns_played": played,
+        "seed": seed,
+        "bytes_per_contestant": _growth(start, registered) / contestants if contestants else None,
+        "bytes_per_game": _growth(registered, started) / games if games else None,
+        "bytes_per_game_played": _growth(registered, end) / games if games else None,
+        "total_bytes": _growth(start, end),
+        "peak_bytes": peak,
+        "top_sites": [_site(stat) for stat in sites[:top]],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--contestants", type=int, default=2000)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.contestants, args.games, args.turns,
+                             args.seed, args.top, args.frames), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark root-parallel search in a SearchPool.
+
+Usage:
+    python -m benchmarks.parallel_search [--workers W] [--budget SECONDS]
+                                         [--decisions N] [--seed SEED]
+
+For random 11-card hands, each decision (choosing a discard) is searched
+in this process and then in a SearchPool. The overhead of a pool decision is
+measured with a budget of zero, when each worker does only its first pass:
+the time beyond what one in-process first pass takes is the cost of sending
+the state out and the results back.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from pylgrum.parallel_search import SearchPool
+from pylgrum.search import SearchState, finish_actions, search
+
+def decision(rng: random.Random) -> tuple:
+    """Return (state, actions) for choosing a discard from a random hand."""
+    cards = rng.sample(range(52), 16)
+    hand = sum(1 << index for index in cards[:11])
+    seen = sum(1 << index for index in cards[11:])
+    return (SearchState(hand, -1, seen, 0, 52 - 20 - 1 - 5), finish_actions(hand))
+
+def _time(decisions: list, choose) -> tuple:
+    samples = 0
+    start = time.perf_counter()
+    for (state, actions) in decisions:
+        samples += choose(state, actions)["samples"]
+    return ((time.perf_counter() - start) / len(decisions), samples / len(decisions))
+
+def run(workers: int, budget: float, decisions: int, seed: int = None) -> dict:
+    """Time searches in this process and in a pool of workers."""
+    rng = random.Random(seed)
+    cases = [decision(rng) for _ in range(decisions)]
+
+    def local(state, actions, budget):
+        return search(state, actions, budget=budget, rng=rng)[1]
+
+    (local_first_pass, _) = _time(cases, lambda s, a: local(s, a, 0))
+    (local_seconds, local_samples) = _time(cases, lambda s, a: local(s, a, budget))
+    with SearchPool(workers, seed=seed) as pool:
+        pool.search(*cases[0], budget=0) # make sure every worker is running
+        (pool_first_pass, _) = _time(cases, lambda s, a: pool.search(s, a, budget=0)[1])
+        (pool_seconds, pool_samples) = _time(
+            cases, lambda s, a: pool.search(s, a, budget=budget)[1])
+        workers = pool.workers
+    return {
+        "workers": workers,
+        "budget_ms": budget * 1e3,
+        "decisions": decisions,
+        "overhead_ms": (pool_first_pass - local_first_pass) * 1e3,
+        "local_ms_per_decision": local_seconds * 1e3,
+        "pool_ms_per_decision": pool_seconds * 1e3,
+        "local_samples_per_decision": local_samples,
+        "pool_samples_per_decision": pool_samples,
+        "sample_speedup": pool_samples / local_samples if local_samples else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--budget", type=float, default=0.05)
+    parser.add_argument("--decisions", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.workers, args.budget, args.decisions, args.seed), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark write-ahead log throughput and recovery time.
+
+Usage:
+    python -m benchmarks.persistence [--games N] [--threads T] [--ops K]
+
+Log throughput is measured as logged operations per second with T threads
+each registering K contestants, with and without a commit delay (a small
+delay lets more committers share each fsync).
+
+Recovery time is measured for a snapshot holding N live games plus a log
+tail of K operations.
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+
+from pylgrum.server.game_manager import GameManager
+from pylgrum.server.persistence import PersistentGameManager
+
+def log_throughput(threads: int, ops: int, commit_delay: float) -> dict:
+    """Time concurrent logged operations, and count the fsyncs they needed."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = PersistentGameManager(directory, commit_delay=commit_delay)
+        def worker():
+            for _ in range(ops):
+                manager.add_contestant()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        fsyncs = manager._wal.fsync_count # pylint: disable=protected-access
+        manager.close()
+    total = threads * ops
+    return {
+        "threads": threads,
+        "commit_delay": commit_delay,
+        "ops": total,
+        "seconds": elapsed,
+        "ops_per_second": total / elapsed,
+        "ops_per_fsync": total / max(fsyncs, 1),
+    }
+
+def recovery(games: int, tail_ops: int) -> dict:
+    """Time recovery from a snapshot of many live games plus a log tail."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = PersistentGameManager(directory)
+        # build the bulk of the state without logging it: it goes straight
+        #  into the snapshot
+        for _ in range(games):
+            challenger = GameManager.add_contestant(manager)
+            opponent = GameManager.add_contestant(manager)
+            GameManager.create_game(manager, challenger.id, opponent.id)
+        start = time.perf_counter()
+        manager.snapshot()
+        snapshot_seconds = time.perf_counter() - start
+        for _ in range(tail_ops):
+            manager.add_contestant()
+        manager.close()
+
+        start = time.perf_counter()
+        recovered = PersistentGameManager(directory)
+        recovery_seconds = time.perf_counter() - start
+        assert len(recovered.games) == games
+        recovered.close()
+    return {
+        "games": games,
+        "tail_ops": tail_ops,
+        "snapshot_seconds": snapshot_seconds,
+        "recovery_seconds": recovery_seconds,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "log_throughput": [
+            log_throughput(1, args.ops, 0.0),
+            log_throughput(args.threads, args.ops, 0.0),
+            log_throughput(args.threads, args.ops, 0.002),
+        ],
+        "recovery": recovery(args.games, args.ops),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
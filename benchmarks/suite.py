@@ -0,0 +1,272 @@
+"""Time every hot path in the core package.
+
+Usage:
+    python -m benchmarks.suite [--repeat R] [--hands N] [--only NAME ...]
+                               [--corpus-version V] [--slow] [--out FILE]
+
+Each benchmark times one operation - Card comparison and hashing, CardStack
+add/find/remove/shuffle, Meld construction and add, HandWithMelds deadwood,
+meld detection (by MeldDetector and by the meld_solver, from a cold cache),
+and whole headless games - over the fixed hand corpora in
+`benchmarks.corpora`, so results can be compared from release to release.
+The adversarial corpus holds the worst hands for meld detection, so its
+results are the tail latency; MeldDetector is so slow on it that it is only
+timed with --slow. Each is run R times; per-operation times are reported
+as the minimum (the best estimate of the cost) and the median.
+
+Results are printed (or written to FILE) as JSON:
+
+    {"suite_version": ..., "corpus_version": ..., "python": ..., "platform": ...,
+     "results": {name: {"ops": ..., "repeat": ..., "min_us": ..., "median_us": ...,
+                        "samples_us": [per-op time of each repetition, ...]}}}
+
+To compare results with a stored baseline, see `benchmarks.compare`.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import time
+
+from benchmarks.corpora import CORPUS_VERSION, load
+from pylgrum.card import Card
+from pylgrum.deck import Deck
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.hand_melds import HandWithMelds
+from pylgrum.meld import Meld
+from pylgrum.meld_detector import MeldDetector
+from pylgrum.meld_solver import ALL_MELDS, cache_clear, mask_to_cards, optimal_melds
+from pylgrum.stack import CardStack
+
+SUITE_VERSION = 1
+"""Bumped whenever a benchmark changes what it measures."""
+
+CORPORA = ("random", "meld_dense", "worst_overlap", "adversarial")
+
+BENCHMARKS = {}
+SLOW_BENCHMARKS = set()
+
+def benchmark(name: str, slow: bool = False):
+    """Register a benchmark.
+
+    The decorated function is called as `function(corpora, hands)`, where
+    corpora maps corpus name to a list of hands (each a list of Cards) and
+    slow benchmarks use only `hands` of them, and returns (setup, body, ops):
+    each repetition times `body(setup())`, which performs ops operations.
+
+    Slow benchmarks are only run when asked for (see run()).
+    """
+    def register(function):
+        BENCHMARKS[name] = function
+        if slow:
+            SLOW_BENCHMARKS.add(name)
+        return function
+    return register
+
+def _nothing():
+    return None
+
+@benchmark("card.compare")
+def card_compare(corpora, hands):
+    pairs = [(a, b) for hand in corpora["random"] for a in hand for b in hand]
+    def body(_):
+        for (a, b) in pairs:
+            a < b # pylint: disable=pointless-statement
+            a == b # pylint: disable=pointless-statement
+    return (_nothing, body, 2 * len(pairs))
+
+@benchmark("card.hash")
+def card_hash(corpora, hands):
+    cards = [card for hand in corpora["random"] for card in hand]
+    def body(_):
+        for card in cards:
+            hash(card)
+    return (_nothing, body, len(cards))
+
+@benchmark("stack.add")
+def stack_add(corpora, hands):
+    cards = Deck().cards
+    def body(stack):
+        for card in cards:
+            stack.add(card)
+    return (CardStack, body, len(cards))
+
+def _full_stack() -> CardStack:
+    stack = CardStack()
+    stack.add(Deck().cards)
+    return stack
+
+@benchmark("stack.find")
+def stack_find(corpora, hands):
+    cards = list(reversed(Deck().cards))
+    stack = _full_stack()
+    def body(_):
+        for card in cards:
+            stack.find(card)
+    return (_nothing, body, len(cards))
+
+@benchmark("stack.remove")
+def stack_remove(corpora, hands):
+    positions = [random.Random(size).randrange(size) for size in range(52, 0, -1)]
+    def body(stack):
+        for position in positions:
+            stack.remove(position)
+    return (_full_stack, body, len(positions))
+
+@benchmark("stack.shuffle")
+def stack_shuffle(corpora, hands):
+    stack = _full_stack()
+    def body(_):
+        for _ in range(100):
+            stack.shuffle()
+    return (_nothing, body, 100)
+
+@benchmark("meld.construct")
+def meld_construct(corpora, hands):
+    melds = [mask_to_cards(meld) for meld in ALL_MELDS]
+    def body(_):
+        for cards in melds:
+            Meld(*cards)
+    return (_nothing, body, len(melds))
+
+@benchmark("meld.add")
+def meld_add(corpora, hands):
+    melds = [mask_to_cards(meld) for meld in ALL_MELDS]
+    def body(_):
+        for cards in melds:
+            meld = Meld(cards[0])
+            for card in cards[1:]:
+                meld.add(card)
+    return (_nothing, body, sum(len(cards) - 1 for cards in melds))
+
+def _arranged_hand(cards: list) -> HandWithMelds:
+    """A HandWithMelds holding cards, arranged into their optimal melds."""
+    hand = HandWithMelds()
+    hand.add(cards)
+    (_, melds) = optimal_melds(sum(1 << card.index for card in cards))
+    for meld in melds:
+        hand.create_meld(*mask_to_cards(meld))
+    return hand
+
+def _deadwood_benchmark(corpus: str):
+    def deadwood(corpora, hands):
+        arranged = [_arranged_hand(cards) for cards in corpora[corpus]]
+        def body(_):
+            for hand in arranged:
+                hand.deadwood_value # pylint: disable=pointless-statement
+        return (_nothing, body, len(arranged))
+    return deadwood
+
+def _detector_benchmark(corpus: str):
+    def detect(corpora, hands):
+        def setup():
+            return [MeldDetector(*cards) for cards in corpora[corpus][:hands]]
+        def body(detectors):
+            for detector in detectors:
+                detector.detect_optimal_melds()
+        return (setup, body, len(corpora[corpus][:hands]))
+    return detect
+
+def _solver_benchmark(corpus: str):
+    def solve(corpora, hands):
+        masks = [sum(1 << card.index for card in cards) for cards in corpora[corpus]]
+        def body(_):
+            for mask in masks:
+                optimal_melds(mask)
+        return (cache_clear, body, len(masks))
+    return solve
+
+for _corpus in CORPORA:
+    benchmark("hand_with_melds.deadwood_value." + _corpus)(_deadwood_benchmark(_corpus))
+    # MeldDetector takes minutes over each of the adversarial hands
+    benchmark("meld_detector.detect_optimal_melds." + _corpus,
+              slow=_corpus == "adversarial")(_detector_benchmark(_corpus))
+    benchmark("meld_solver.optimal_melds." + _corpus)(_solver_benchmark(_corpus))
+
+@benchmark("game.headless")
+def game_headless(corpora, hands):
+    games = max(1, hands // 2)
+    def body(_):
+        random.seed(0)
+        for _ in range(games):
+            Game(GreedyPlayer(), GreedyPlayer()).play()
+    return (_nothing, body, games)
+
+def _measure(setup, body, ops: int, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        gc.disable() # as timeit does: collections add noise to the trials
+        try:
+            start = time.perf_counter()
+            body(state)
+            times.append((time.perf_counter() - start) / ops * 1e6)
+        finally:
+            gc.enable()
+    return {
+        "ops": ops,
+        "repeat": repeat,
+        "min_us": min(times),
+        "median_us": statistics.median(times),
+        "samples_us": times,
+    }
+
+def run(repeat: int = 5, hands: int = 10, only: list = None,
+        corpus_version: int = CORPUS_VERSION, slow: bool = False) -> dict:
+    """Run the benchmarks (those named in only, or all); return the results.
+
+    Args:
+        repeat (int): [optional] times to run each benchmark
+        hands (int): [optional] corpus hands used by the slowest benchmarks
+            (meld detection, and twice as many as the number of games played)
+        only (list): [optional] names (or name prefixes) of benchmarks to run
+        corpus_version (int): [optional] the corpora to use
+        slow (bool): [optional] also run the slow benchmarks (meld
+            detection on the adversarial corpus, hardest hands first)
+    """
+    corpora = {
+        name: [[Card.from_index(index) for index in hand]
+               for hand in load(name, corpus_version)]
+        for name in CORPORA
+    }
+    results = {}
+    for (name, function) in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        if name in SLOW_BENCHMARKS and not slow:
+            continue
+        (setup, body, ops) = function(corpora, hands)
+        results[name] = _measure(setup, body, ops, repeat)
+    return {
+        "suite_version": SUITE_VERSION,
+        "corpus_version": corpus_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--hands", type=int, default=10)
+    parser.add_argument("--only", nargs="*", default=None)
+    parser.add_argument("--corpus-version", type=int, default=CORPUS_VERSION)
+    parser.add_argument("--slow", action="store_true",
+                        help="also run the slow benchmarks")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    results = run(args.repeat, args.hands, args.only, args.corpus_version, args.slow)
+    if args.out:
+        with open(args.out, "w") as out:
+            json.dump(results, out, indent=2)
+            out.write("\n")
+    else:
+        print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -22,9 +22,75 @@ Classes in core `pylgrum` package:
     Game: A sequence of Moves between two Players
     Player: has a Hand, and implements hooks for the two phases of
         a Move
+    GreedyPlayer: a fast machine Player that always minimizes its deadwood
+    SearchPlayer: a machine Player that searches for moves within a time budget
     Move: a stateful message passed between Game and Player that exchanges a
         Card and allows a Player to signal the end of the Game.
 
+Other modules in core `pylgrum` package:
+    batch_game: K games stepped in lockstep, for training machine players
+    danger: per-card risk that a discard completes an opponent's meld
+    draw_evaluator: expected deadwood of drawing versus taking the discard
+    knowledge: incremental tracking of what a player knows about the cards
+    layoff: a defender's best layoffs and melds after a knock
+    meld_solver: fast optimal-meld search over bitmask-encoded hands
+    metrics: opt-in call counts and latency histograms for key operations
+    opstats: opt-in counts of calls to meld-handling internals, per game
+    parallel_search: root-parallel search in persistent worker processes
+    profile: cProfile and sampled-stack profiles of a batch of bot games
+    scoring: hand scoring under configurable rules, and matches to 100
+    selfplay: self-play training data generator, writing .npy shards
+    search: anytime information-set search used by SearchPlayer
+    solver_fuzz: differential fuzzing of meld solvers against MeldDetector
+    turn_trace: per-phase turn timings in a ring buffer, dumpable as traces
+
+Importing `pylgrum` (or any one of its modules) imports nothing else: the
+classes, sub-packages and modules above are imported when first used, e.g.
+on `pylgrum.Card` or `pylgrum.server.GameManager` after a bare
+`import pylgrum` (on python >=3.7; see PEP 562). This keeps short-lived
+processes that only need, say, `pylgrum.scoring` from paying for the server
+or the text UI.
+
 Note: this package uses PEP-484 style type annotations, and thus needs
 python >=3.5.
 """
+
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "Card": "pylgrum.card",
+    "CardStack": "pylgrum.stack",
+    "Deck": "pylgrum.deck",
+    "Meld": "pylgrum.meld",
+    "Hand": "pylgrum.hand",
+    "HandWithMelds": "pylgrum.hand_melds",
+    "MeldDetector": "pylgrum.meld_detector",
+    "Game": "pylgrum.game",
+    "Player": "pylgrum.player",
+    "GreedyPlayer": "pylgrum.greedy_player",
+    "SearchPlayer": "pylgrum.search_player",
+    "Move": "pylgrum.move",
+}
+"""Class name -> the module it is imported from on first access."""
+
+_LAZY_SUBMODULES = frozenset((
+    "batch_game", "card", "danger", "deck", "draw_evaluator", "errors", "game",
+    "greedy_player", "hand", "hand_melds", "knowledge", "layoff", "meld",
+    "meld_detector", "meld_solver", "metrics", "move", "opstats", "parallel_search",
+    "player", "profile", "scoring", "search", "search_player", "selfplay",
+    "server", "solver_fuzz", "stack", "tui", "turn_trace",
+))
+"""Sub-packages and modules imported on first attribute access. Optional
+components (those needing extra dependencies) belong here too: they are only
+imported, and their dependencies only needed, when they are used."""
+
+def __getattr__(name: str):
+    """Import a class, sub-package or module on first access (PEP 562)."""
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
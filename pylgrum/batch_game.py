@@ -0,0 +1,214 @@
+"""Play many games in lockstep, for training machine players.
+
+Stepping Game objects one decision at a time spends most of its time on
+Python overhead: Move objects, player callbacks, listeners and Card objects.
+A BatchGame instead holds K games "struct-of-arrays" style - one list per
+piece of state, with one entry per game, and cards as bitmasks of card
+indices (see `pylgrum.meld_solver`) - and step() applies one action to every
+game at once.
+
+Each game follows the same rules as Game (with Move and MoveState): player1
+(player 0 here) moves first; a turn is a NEW-state decision to draw or take
+the discard, then an IN_PROGRESS-state decision of what to discard and
+whether to knock; and a game ends when someone knocks or when the draw pile
+is down to Game.DRAW_PILE_MINIMUM cards. As with Game, a card taken from the
+discard pile may be thrown straight back. Knocking is only legal when
+`pylgrum.scoring` would accept the knock, and the game's reward is its
+score.
+
+Actions are ints (the same as `pylgrum.parallel_search.encode_action()` for
+discards):
+
+    0-51     discard the card with that index
+    52-103   discard card (action - 52) and knock
+    DRAW     (104) draw from the draw pile
+    TAKE     (105) take the discard
+
+The legal actions of a game are given as a bitmask with bit `action` set
+for each legal action.
+
+(numpy isn't a dependency of pylgrum, so the "arrays" are lists, and each
+step loops over the games in Python - but without any per-game objects.)
+"""
+
+import random
+
+from pylgrum.errors import IllegalMoveError
+from pylgrum.game import Game
+from pylgrum.meld_solver import CARD_POINTS, deadwood_value
+from pylgrum.move import MoveState
+from pylgrum.scoring import DEFAULT_RULES, NO_WINNER_RESULT, ScoringRules, score_hand
+
+DRAW = 104
+TAKE = 105
+NUM_ACTIONS = 106
+
+_START_ACTIONS = 1 << DRAW | 1 << TAKE
+MAX_CARD_POINTS = max(CARD_POINTS)
+
+class BatchGame():
+    """K games of gin rummy, advanced together.
+
+    Attributes (lists with one entry per game):
+        hands (list): two lists - hands[player][game] is that player's
+            hand as a bitmask
+        draw_piles (list): each game's draw pile, as card indices, top last
+        discard_piles (list): each game's discard pile, as card indices,
+            top last
+        current (list): whose turn it is (0 or 1)
+        state (list): MoveState of the current move: NEW while waiting for
+            DRAW or TAKE, IN_PROGRESS while waiting for a discard, and
+            COMPLETE once the game is over
+        acquired (list): index of the card acquired this turn, or -1
+        num_moves (list): the number of moves completed
+        results (list): the game's HandResult once it is over, else None
+        rewards (list): points won by player 0 (negative if player 1 won)
+    """
+
+    def __init__(self, games: int, seed: int = None,
+                 rules: ScoringRules = DEFAULT_RULES, decks: list = None) -> None:
+        """Shuffle and deal K games.
+
+        Args:
+            games (int): the number of games (K)
+            seed (int): [optional] seed for shuffling
+            rules (ScoringRules): [optional] rules for knocking and scoring
+            decks (list): [optional] K decks to deal instead of shuffling,
+                each a list of 52 card indices with the top card last
+        """
+        self.games = games
+        self.rules = rules
+        self._rng = random.Random(seed)
+        self.hands = [[0] * games, [0] * games]
+        self.draw_piles = [None] * games
+        self.discard_piles = [None] * games
+        self.current = [0] * games
+        self.state = [MoveState.NEW] * games
+        self.acquired = [-1] * games
+        self.num_moves = [0] * games
+        self.results = [None] * games
+        self.rewards = [0] * games
+        for game in range(games):
+            self.reset(game, None if decks is None else decks[game])
+
+    def reset(self, game: int, deck: list = None) -> None:
+        """Deal a new game in place of game number `game`.
+
+        Args:
+            game (int): which game
+            deck (list): [optional] the deck to deal, top card last; shuffled
+                if not given
+        """
+        if deck is None:
+            deck = list(range(52))
+            self._rng.shuffle(deck)
+        else:
+            deck = list(deck)
+        hands = [0, 0]
+        for _ in range(10):
+            hands[0] |= 1 << deck.pop()
+            hands[1] |= 1 << deck.pop()
+        self.hands[0][game] = hands[0]
+        self.hands[1][game] = hands[1]
+        self.discard_piles[game] = [deck.pop()]
+        self.draw_piles[game] = deck
+        self.current[game] = 0
+        self.state[game] = MoveState.NEW
+        self.acquired[game] = -1
+        self.num_moves[game] = 0
+        self.results[game] = None
+        self.rewards[game] = 0
+
+    @property
+    def is_over(self) -> list:
+        """For each game, True once it is over."""
+        return [state == MoveState.COMPLETE for state in self.state]
+
+    def legal_actions(self) -> list:
+        """Return each game's legal actions, as a bitmask (0 once it's over)."""
+        knock_limit = self.rules.knock_limit
+        legal = []
+        for (game, state) in enumerate(self.state):
+            if state == MoveState.NEW:
+                legal.append(_START_ACTIONS if self.discard_piles[game]
+                             else 1 << DRAW)
+            elif state == MoveState.IN_PROGRESS:
+                hand = self.hands[self.current[game]][game]
+                actions = hand
+                # discarding a card lowers deadwood by at most its points,
+                # so most hands can be ruled out with one lookup
+                deadwood = deadwood_value(hand)
+                if deadwood <= knock_limit + MAX_CARD_POINTS:
+                    remaining = hand
+                    while remaining:
+                        low_bit = remaining & -remaining
+                        remaining ^= low_bit
+                        index = low_bit.bit_length() - 1
+                        if (deadwood - CARD_POINTS[index] <= knock_limit
+                                and deadwood_value(hand ^ low_bit) <= knock_limit):
+                            actions |= low_bit << 52
+                legal.append(actions)
+            else:
+                legal.append(0)
+        return legal
+
+    def step(self, actions: list, legal: list = None) -> list:
+        """Apply one action to every game.
+
+        Args:
+            actions (list): an action for each game; ignored (and may be
+                None) for games that are over
+            legal (list): [optional] legal_actions(), if already known
+
+        Returns rewards: for each game, the points player 0 won if the game
+        ended with this action, otherwise 0.
+
+        Raises IllegalMoveError, before changing any game, if any action is
+        illegal.
+        """
+        if legal is None:
+            legal = self.legal_actions()
+        for (game, action) in enumerate(actions):
+            if legal[game] and (action is None or not 0 <= action < NUM_ACTIONS
+                                or not legal[game] >> action & 1):
+                raise IllegalMoveError("Action {} is illegal in game {}".format(action, game))
+        rewards = [0] * self.games
+        for (game, action) in enumerate(actions):
+            state = self.state[game]
+            if state == MoveState.NEW:
+                self._start(game, action)
+            elif state == MoveState.IN_PROGRESS:
+                rewards[game] = self._finish(game, action)
+        return rewards
+
+    def _start(self, game: int, action: int) -> None:
+        """Draw or take the discard (Game.acquire_card)."""
+        if action == DRAW:
+            card = self.draw_piles[game].pop()
+        else:
+            card = self.discard_piles[game].pop()
+        self.hands[self.current[game]][game] |= 1 << card
+        self.acquired[game] = card
+        self.state[game] = MoveState.IN_PROGRESS
+
+    def _finish(self, game: int, action: int) -> int:
+        """Discard, knock or pass the turn (Game.finalize_move, next_turn)."""
+        mover = self.current[game]
+        card = action % 52
+        self.hands[mover][game] ^= 1 << card
+        self.discard_piles[game].append(card)
+        self.acquired[game] = -1
+        if action >= 52:
+            result = score_hand(self.hands[mover][game], self.hands[1 - mover][game],
+                                card, self.rules)
+            self.results[game] = result
+            self.rewards[game] = result.points if mover == 0 else -result.points
+            self.state[game] = MoveState.COMPLETE
+            return self.rewards[game]
+        self.num_moves[game] += 1
+        self.current[game] = 1 - mover
+        self.state[game] = MoveState.NEW
+        if len(self.draw_piles[game]) <= Game.DRAW_PILE_MINIMUM:
+            self.results[game] = NO_WINNER_RESULT
+            self.state[game] = MoveState.COMPLETE
+        return 0
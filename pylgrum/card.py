@@ -54,6 +54,37 @@ class Card:
         self.suit: Suit = suit
         self.rank: Rank = rank
 
+    @property
+    def index(self) -> int:
+        """A compact number (0-51) identifying the card.
+
+        Cards are numbered in the same order they compare in: by suit, and
+        then by rank within the suit. Each suit's cards are thus numbered
+        consecutively, e.g. the Ace through King of Diamonds are 0-12.
+        """
+        return Card.index_for(self.rank, self.suit)
+
+    @staticmethod
+    def index_for(rank: Rank, suit: Suit) -> int:
+        """Return the index of the card with the given rank and suit."""
+        return (suit.value - 1) * 13 + rank.value - 1
+
+    @classmethod
+    def from_index(cls, index: int) -> 'Card':
+        """Return the Card with the given index (see the `index` property).
+
+        Args:
+            index (int): a number from 0 to 51
+
+        Cards returned by this method are shared, so they must not be
+        modified.
+        """
+        return _CARDS_BY_INDEX[index]
+
+    def __reduce__(self):
+        """Pickle cards by index, so unpickled cards are the shared instances."""
+        return (Card.from_index, (self.index,))
+
     @classmethod
     def from_text(cls, *card_strings):
         """Return a new Card from a string XY, where X indicates rank and Y suit.
@@ -229,3 +260,7 @@ class Card:
         suit_str = self.suit.name[0] + self.suit.name[1:].lower() + 's'
         return "{} of {}".format(rank_str, suit_str)
 
+_CARDS_BY_INDEX = [
+    Card(rank=Rank(index % 13 + 1), suit=Suit(index // 13 + 1))
+    for index in range(52)
+]
@@ -0,0 +1,177 @@
+"""How dangerous each card is to discard.
+
+A discard is dangerous if it lets the opponent complete a meld. A
+DangerTable estimates that for every card, from one player's point of view
+(a KnowledgeTracker): a card is more dangerous the more of its meld partners
+the opponent might hold. The opponent certainly holds cards they took from
+the discard pile; any unseen card might be in their hand; and an unseen card
+is less likely to be there if it would have melded with a card the opponent
+passed up or threw away.
+
+Only 3-card melds are considered (any longer meld contains one). Each card
+is in at most six of them, so when the tracker reports that a card has moved,
+only the few melds containing it need updating. Each card's score is kept as
+counts of the melds it could complete, grouped by how many of its partners
+are unseen, so the table can be evaluated for the current odds of an unseen
+card being in the opponent's hand without being rebuilt.
+"""
+
+from itertools import combinations
+
+from pylgrum.knowledge import KnowledgeChange, KnowledgeTracker
+from pylgrum.meld_solver import mask_indices
+
+def _triples() -> tuple:
+    """Return every 3-card meld, as a tuple of card indices."""
+    triples = []
+    for suit in range(4):
+        for start in range(11):
+            base = suit * 13 + start
+            triples.append((base, base + 1, base + 2))
+    for rank in range(13):
+        triples.extend(combinations([suit * 13 + rank for suit in range(4)], 3))
+    return tuple(triples)
+
+TRIPLES = _triples()
+"""Every 3-card run and set, as a tuple of card indices."""
+
+TRIPLES_BY_CARD = tuple(
+    tuple(number for (number, triple) in enumerate(TRIPLES) if index in triple)
+    for index in range(52)
+)
+"""For each card index, the positions in TRIPLES of the melds that use it."""
+
+PASSED_DISCOUNT = 0.25
+"""How much less likely the opponent is to hold an unseen card that would
+have melded with a card they passed up or threw away."""
+
+# what a card's state means for the opponent's chance of using it in a meld
+BLOCKED = 0   # held by us, or in the discard pile
+OPPONENT = 1  # known to be in the opponent's hand
+UNSEEN = 2
+UNLIKELY = 3  # unseen, but would have melded with a card the opponent passed
+
+class DangerTable():
+    """Per-card discard danger for one player, updated as the game goes on.
+
+    Attributes:
+        knowledge (KnowledgeTracker): the player's knowledge of the cards
+    """
+
+    def __init__(self, knowledge: KnowledgeTracker) -> None:
+        """Create a table that follows a KnowledgeTracker's changes.
+
+        Args:
+            knowledge (KnowledgeTracker): the player's knowledge of the cards
+        """
+        self.knowledge = knowledge
+        self._built_for = None # the game the table was built for
+        knowledge.add_listener(self._changed)
+
+    def _build(self) -> None:
+        """Set up every card's state and counts from the tracker."""
+        known = self.knowledge
+        known.start()
+        blocked = known.own | known.discard_pile
+        passed = known.opponent_discarded | known.opponent_declined
+        unlikely = 0
+        for index in mask_indices(passed):
+            for number in TRIPLES_BY_CARD[index]:
+                for partner in TRIPLES[number]:
+                    unlikely |= 1 << partner
+        self._state = []
+        for index in range(52):
+            if blocked >> index & 1:
+                self._state.append(BLOCKED)
+            elif known.opponent_known >> index & 1:
+                self._state.append(OPPONENT)
+            elif unlikely >> index & 1:
+                self._state.append(UNLIKELY)
+            else:
+                self._state.append(UNSEEN)
+        # per meld: how many of its cards are in each state
+        self._meld_counts = [[0, 0, 0, 0] for _ in TRIPLES]
+        for (number, triple) in enumerate(TRIPLES):
+            for index in triple:
+                self._meld_counts[number][self._state[index]] += 1
+        # per card: completable melds, by (unseen partners * 3 + unlikely partners)
+        self._counts = [[0] * 9 for _ in range(52)]
+        for (number, triple) in enumerate(TRIPLES):
+            for index in triple:
+                self._count(number, index, 1)
+        self._built_for = known.game
+
+    def _count(self, number: int, index: int, delta: int) -> None:
+        """Add (or remove) meld number's contribution to a card's counts."""
+        counts = self._meld_counts[number]
+        state = self._state[index]
+        if counts[BLOCKED] - (state == BLOCKED):
+            return # some partner is out of the opponent's reach
+        unseen = counts[UNSEEN] - (state == UNSEEN)
+        unlikely = counts[UNLIKELY] - (state == UNLIKELY)
+        self._counts[index][unseen * 3 + unlikely] += delta
+
+    def _set_state(self, index: int, state: int) -> None:
+        """Move a card to a new state, updating only the melds it is in."""
+        if self._state[index] == state:
+            return
+        melds = TRIPLES_BY_CARD[index]
+        for number in melds:
+            for partner in TRIPLES[number]:
+                self._count(number, partner, -1)
+        for number in melds:
+            self._meld_counts[number][self._state[index]] -= 1
+            self._meld_counts[number][state] += 1
+        self._state[index] = state
+        for number in melds:
+            for partner in TRIPLES[number]:
+                self._count(number, partner, 1)
+
+    def _passed(self, index: int) -> None:
+        """The opponent passed up or threw away a card: discount its partners."""
+        for number in TRIPLES_BY_CARD[index]:
+            for partner in TRIPLES[number]:
+                if self._state[partner] == UNSEEN:
+                    self._set_state(partner, UNLIKELY)
+
+    def _changed(self, knowledge: KnowledgeTracker, change: KnowledgeChange,
+                 index: int) -> None:
+        """Update from a knowledge change (KnowledgeTracker listener)."""
+        if self._built_for is not knowledge.game:
+            self._build() # already reflects this change
+            return
+        if change == KnowledgeChange.OPPONENT_TOOK:
+            self._set_state(index, OPPONENT)
+        elif change == KnowledgeChange.OPPONENT_DREW:
+            self._passed(index)
+        else:
+            self._set_state(index, BLOCKED)
+            if change == KnowledgeChange.OPPONENT_DISCARDED:
+                self._passed(index)
+
+    def _weights(self) -> list:
+        """Weight of each count, given the odds an unseen card is the opponent's."""
+        known = self.knowledge
+        unseen_cards = bin(known.unknown).count("1")
+        unseen = known.opponent_unknown_count / unseen_cards if unseen_cards else 0.0
+        unlikely = unseen * PASSED_DISCOUNT
+        return [unseen ** u * unlikely ** p for u in range(3) for p in range(3)]
+
+    def danger(self, index: int) -> float:
+        """Return the danger of discarding a card.
+
+        The score is the expected number of 3-card melds the card would
+        complete for the opponent (treating their cards as independent).
+        """
+        if self._built_for is not self.knowledge.game:
+            self._build()
+        return sum(count * weight
+                   for (count, weight) in zip(self._counts[index], self._weights()))
+
+    def table(self) -> list:
+        """Return the danger of discarding each card, by card index."""
+        if self._built_for is not self.knowledge.game:
+            self._build()
+        weights = self._weights()
+        return [sum(count * weight for (count, weight) in zip(counts, weights))
+                for counts in self._counts]
@@ -7,8 +7,11 @@ class Deck(CardStack):
     """A deck has 52 cards in 4 suits (no jokers)."""
 
     def __init__(self):
-        """Create a new Deck."""
+        """Create a new Deck.
+
+        Decks are made of the shared Card instances from Card.from_index().
+        """
         super().__init__()
         for rank in list(Rank):
             for suit in list(Suit):
-                self.add(Card(rank=rank, suit=suit))
+                self.add(Card.from_index(Card.index_for(rank, suit)))
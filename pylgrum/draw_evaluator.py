@@ -0,0 +1,92 @@
+"""Expected value of drawing, compared with taking the discard.
+
+At the start of a turn a player chooses between the card showing on the
+discard pile, whose effect on their hand they can work out exactly, and an
+unknown card from the draw pile. Judging the draw means working out the best
+hand after each card that might be drawn and discarding - up to 31 of them.
+
+evaluate_draw() does all of those at once, sharing the work between them.
+Most cards that might be drawn don't complete a meld with the cards in hand;
+for all of those, the best result is either to throw the new card straight
+back or to keep it as deadwood in place of the least useful card in hand, and
+both are worked out once for the whole batch. Only cards that complete a
+meld need a full meld search each.
+
+Cards are represented as bitmasks of card indices (see `pylgrum.meld_solver`).
+"""
+
+from collections import namedtuple
+
+from pylgrum.meld_solver import (ALL_MELDS, CARD_POINTS, best_discard,
+                                 deadwood_value, mask_indices)
+
+DrawEvaluation = namedtuple('DrawEvaluation', [
+    'take', 'draw_expected', 'draw_distribution', 'by_card'
+])
+DrawEvaluation.__doc__ = """Deadwood after taking the discard versus after drawing.
+
+All values are the deadwood left after making the best discard.
+
+Fields:
+    take (int): deadwood after taking the discard (None if there isn't one)
+    draw_expected (float): mean deadwood after drawing, over the cards that
+        might be drawn
+    draw_distribution (dict): deadwood value -> probability, after drawing
+    by_card (dict): card index -> deadwood after drawing that card
+"""
+
+def meld_completing_cards(hand: int) -> int:
+    """Return the cards that would complete a meld with cards in hand.
+
+    Args:
+        hand (int): the cards held, as a bitmask
+    """
+    completing = 0
+    for meld in ALL_MELDS:
+        missing = meld & ~hand
+        if missing and not missing & (missing - 1): # exactly one card
+            completing |= missing
+    return completing
+
+def evaluate_draw(hand: int, top: int, unknown: int) -> DrawEvaluation:
+    """Compare taking the discard with drawing a card.
+
+    Args:
+        hand (int): the 10 cards held at the start of the turn
+        top (int): index of the card showing on the discard pile, or -1
+        unknown (int): the cards that might be drawn; each is assumed
+            equally likely
+
+    Returns a DrawEvaluation.
+    """
+    take = None
+    if top >= 0:
+        top_bit = 1 << top
+        (take, _) = best_discard(hand | top_bit, keep=top_bit)
+
+    # shared by every drawn card that can't be melded: either discard it
+    # again, or keep it in place of whichever card costs least to lose
+    kept_deadwood = deadwood_value(hand)
+    replaced_deadwood = min(deadwood_value(hand ^ (1 << index))
+                            for index in mask_indices(hand))
+    completing = meld_completing_cards(hand)
+
+    by_card = {}
+    counts = {}
+    for index in mask_indices(unknown):
+        if completing >> index & 1:
+            (deadwood, _) = best_discard(hand | 1 << index)
+        else:
+            deadwood = min(kept_deadwood, replaced_deadwood + CARD_POINTS[index])
+        by_card[index] = deadwood
+        counts[deadwood] = counts.get(deadwood, 0) + 1
+
+    if not by_card:
+        return DrawEvaluation(take, None, {}, by_card)
+    total = len(by_card)
+    return DrawEvaluation(
+        take,
+        sum(by_card.values()) / total,
+        {deadwood: count / total for (deadwood, count) in sorted(counts.items())},
+        by_card,
+    )
@@ -1,5 +1,8 @@
 """Controller for game of gin rummy."""
 
+from enum import Enum
+
+from pylgrum.metrics import instrumented
 from pylgrum.player import Player
 from pylgrum.move import Move, CardSource, MoveState
 from pylgrum.deck import Deck
@@ -7,6 +10,14 @@ from pylgrum.card import Card
 from pylgrum.stack import CardStack
 from pylgrum.errors import IllegalMoveError, PylgrumInternalError, CardNotFoundError
 
+class GameEvent(Enum):
+    """Identifies the kind of state change a Game reports to its listeners."""
+    CARD_ACQUIRED = 1
+    MOVE_FINALIZED = 2
+    KNOCKED = 3
+    TURN_PASSED = 4
+    DRAW_PILE_EXHAUSTED = 5
+
 class Game():
     """Base class for a game of gin rummy.
 
@@ -30,9 +41,22 @@ class Game():
 
     Most interactive usage is probably best served by the asynchronous mode,
     though synchronous mode might be useful for e.g. machine-driven training.
+
+    If nobody has knocked by the time the draw pile is down to
+    DRAW_PILE_MINIMUM cards, the game ends with no winner.
     """
 
-    def __init__(self, player1: Player, player2: Player, game_id: str = None) -> None:
+    DRAW_PILE_MINIMUM = 2
+
+    tracer = None
+    """A `pylgrum.turn_trace.TurnTracer` timing the phases of each turn
+    played by play(), or None. Set it on a game, or on Game for all games."""
+
+    def __init__(self,
+                 player1: Player,
+                 player2: Player,
+                 game_id: str = None,
+                 deck: CardStack = None) -> None:
         """Create a new game between two players.
 
         Shuffles and deals a deck, and starts play.
@@ -41,6 +65,8 @@ class Game():
             player1 (Player): the player initiating the game
             player2 (Player): the player being challenged
             game_id (str): [optional] an ID used to track this game
+            deck (CardStack): [optional] the cards to deal, top card first
+                to player1; used as-is, without shuffling
 
         If not provided, game_id will be None.
         """
@@ -50,11 +76,18 @@ class Game():
 
         self.game_id = game_id
 
+        self.version = 0
+        """Incremented every time the game announces a state change."""
+        self._listeners = []
+
         self.player1.join_game(self)
         self.player2.join_game(self)
 
-        self._deck = Deck()
-        self._deck.shuffle()
+        if deck is None:
+            self._deck = Deck()
+            self._deck.shuffle()
+        else:
+            self._deck = deck
 
         self._discards = CardStack()
 
@@ -69,12 +102,58 @@ class Game():
         self._num_moves = 0
 
         self._knocked = False
+        self._exhausted = False
+
+    def __getstate__(self) -> dict:
+        """Listeners and tracers are process-local, so they are not pickled with the game."""
+        state = self.__dict__.copy()
+        state['_listeners'] = []
+        state.pop('tracer', None)
+        return state
+
+    def add_listener(self, listener) -> None:
+        """Register a callable to be told about state changes.
+
+        Args:
+            listener (callable): called as `listener(game, event)` after each
+                change, where event is a GameEvent
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """Stop telling a previously registered listener about state changes.
+
+        Args:
+            listener (callable): a callable passed to add_listener()
+        """
+        self._listeners.remove(listener)
+
+    def _announce(self, event: GameEvent) -> None:
+        """Bump the game version and notify listeners of a state change."""
+        self.version += 1
+        for listener in self._listeners:
+            listener(self, event)
 
     @property
     def current_player(self):
         """The player whose turn it currently is."""
         return self._current_player
 
+    @property
+    def num_moves(self) -> int:
+        """The number of moves completed so far."""
+        return self._num_moves
+
+    @property
+    def is_over(self) -> bool:
+        """True once a player has knocked or the draw pile has run out."""
+        return self._knocked or self._exhausted
+
+    @property
+    def draw_pile_exhausted(self) -> bool:
+        """True if the game ended because the draw pile ran out."""
+        return self._exhausted
+
     @property
     def visible_discard(self):
         """The card currently showing on the top of the discard pile."""
@@ -99,6 +178,7 @@ class Game():
         Side effects:
          * switches _current_player pointer
          * increment move counter
+         * ends the game if the draw pile is down to DRAW_PILE_MINIMUM
         """
         self._num_moves += 1
 
@@ -108,6 +188,11 @@ class Game():
             self._current_player = self.player1
         else:
             raise PylgrumInternalError("No current_player?!")
+        self._announce(GameEvent.TURN_PASSED)
+
+        if self._deck.size() <= Game.DRAW_PILE_MINIMUM:
+            self._exhausted = True
+            self._announce(GameEvent.DRAW_PILE_EXHAUSTED)
 
     def pre_turn_hook(self):
         """Called before each move. For sub-class use."""
@@ -115,6 +200,9 @@ class Game():
     def post_turn_hook(self):
         """Called after each move. For sub-class use."""
 
+    def game_over_hook(self):
+        """Called when play() ends the game. For sub-class use."""
+
     def start_new_move(self):
         """Called at the start of a turn.
 
@@ -130,6 +218,7 @@ class Game():
                 return
         self.current_move = Move(self._discards.peek())
 
+    @instrumented("pylgrum_game_acquire_card", "Game.acquire_card() latency")
     def acquire_card(self) -> None:
         """Add card from the selected source to the hand.
 
@@ -150,7 +239,9 @@ class Game():
         elif self.current_move.card_source == CardSource.DISCARD_STACK:
             self.current_move.acquired = self._draw_discard()
         self.current_player.receive_card(self.current_move.acquired)
+        self._announce(GameEvent.CARD_ACQUIRED)
 
+    @instrumented("pylgrum_game_finalize_move", "Game.finalize_move() latency")
     def finalize_move(self) -> None:
         """Complete a move by processing the specified discard.
 
@@ -176,39 +267,76 @@ class Game():
             self.current_player.hand.remove(discard_idx)
             self._discards.add(self.current_move.discarded)
 
+        if self.current_move.knocking is True:
+            self._knocked = True
+            self._announce(GameEvent.KNOCKED)
+        else:
+            self._announce(GameEvent.MOVE_FINALIZED)
+
     def _do_turn(self):
+        tracer = self.tracer
+        if tracer is None:
+            self._play_turn(None, None)
+            return
+        slot = tracer.begin_turn(self)
+        ended = False
+        try:
+            self._play_turn(tracer, slot)
+            ended = True
+        finally:
+            if not ended:
+                tracer.abort_turn(slot)
+
+    def _play_turn(self, tracer, slot):
         self.pre_turn_hook()
+        if tracer is not None:
+            tracer.stamp(slot, 0)
         self.start_new_move()
+        if tracer is not None:
+            tracer.stamp(slot, 1)
         self._current_player.turn_start(self.current_move)
+        if tracer is not None:
+            tracer.stamp(slot, 2)
         self.acquire_card()
+        if tracer is not None:
+            tracer.stamp(slot, 3)
 
         self._current_player.turn_finish(self.current_move)
+        if tracer is not None:
+            tracer.stamp(slot, 4)
         self.finalize_move()
+        if tracer is not None:
+            tracer.stamp(slot, 5)
 
         if self.current_move.knocking is True:
-            #### game is ending
-            # FIXME: validate meld legitimacy
-            # FIXME: check for super-gin
-            # FIXME: deal with deadwood in non-gin knock scenario
-            self._knocked = True
-            print("{} wins".format(self._current_player))
-            return
+            if tracer is not None:
+                tracer.end_turn(slot, self, knocked=True)
+            return # game is ending
 
         assert self.current_move.state == MoveState.COMPLETE
         self.post_turn_hook()
+        if tracer is not None:
+            tracer.stamp(slot, 6)
+            tracer.end_turn(slot, self)
 
     def play(self) -> None:
-        """Play a game by alternating moves until one player knocks."""
+        """Play a game by alternating moves until one player knocks.
+
+        The game also ends if the draw pile runs out. Either way,
+        game_over_hook() is called at the end. (To score the game, see
+        `pylgrum.scoring`.)
+        """
         while True:
             self.start_new_move()
             self._do_turn()
             if self.current_move.knocking is True:
-                print("{} has knocked to end the game".
-                      format(self._current_player))
-                # FIXME - add validity checking & scoring
                 break
             self.next_turn()
+            if self._exhausted:
+                break
+        self.game_over_hook()
 
+    @instrumented("pylgrum_game_status_for", "Game.status_for() latency")
     def status_for(self, player) -> dict:
         """Return a game status structure for the specified player.
 
@@ -217,10 +345,12 @@ class Game():
         game_id: UUID of the game
         desription: string describing game
         current_player: UUID of player taking current turn
+        is_over: True once the game has ended (by a knock, or the draw pile
+            running down)
         [visible_discard:]
          - suit: string form of suit enum
          - card: string form of card enum
-        [new_card:]
+        [new_card:] (the card the player has just taken, until they discard)
          - suit: string form of suit enum
          - card: string form of card enum
         hand: list of suit,card objects
@@ -242,6 +372,7 @@ class Game():
                 self.player2.contestant_id,
             ),
             "current_player": self._current_player.contestant_id,
+            "is_over": self.is_over,
         }
         try:
             visible_discard = self.visible_discard
@@ -255,9 +386,11 @@ class Game():
                 'suit': visible_discard.suit.name,
                 'card': visible_discard.rank.name
             }
-        ## only the curent player can see the acquired card
+        ## only the curent player can see the acquired card, and only until
+        ##  they discard (the move then stays current into the next turn)
         if self.current_player == player:
             if (self.current_move is not None and
+                    self.current_move.state == MoveState.IN_PROGRESS and
                     self.current_move.acquired is not None):
                 r_val['new_card'] = {
                     'suit': self.current_move.acquired.suit.name,
@@ -0,0 +1,62 @@
+"""A fast, greedy machine player."""
+
+from pylgrum.card import Card
+from pylgrum.move import Move, CardSource
+from pylgrum.player import Player
+from pylgrum.meld_solver import best_discard, cards_to_mask, deadwood_value
+
+class GreedyPlayer(Player):
+    """Machine player that always makes the move that most reduces deadwood.
+
+    A GreedyPlayer:
+     * takes the discard if and only if doing so (and then discarding
+       optimally) leaves less deadwood than the hand has now
+     * discards the card that leaves the least deadwood, preferring to get rid
+       of higher-value cards when there is a tie
+     * knocks as soon as its deadwood is low enough to
+
+    It looks only at its own hand, so it makes a simple reference opponent
+    (e.g. for benchmarks and for testing other players). Melds are found with
+    `pylgrum.meld_solver`, which finds the same optimal melds as MeldDetector
+    but is fast enough for thousands of decisions per second.
+    """
+
+    def __init__(self, contestant_id: str = None, knock_limit: int = 10) -> None:
+        """Create a GreedyPlayer.
+
+        Args:
+            contestant_id (str): [optional] see Player
+            knock_limit (int): [optional] knock when deadwood is at or below
+                this value (10 is the most the rules allow)
+        """
+        super().__init__(contestant_id=contestant_id)
+        self.knock_limit = knock_limit
+
+    def _hand_mask(self) -> int:
+        return cards_to_mask(self.hand.cards)
+
+    def turn_start(self, move: Move) -> None:
+        """Take the discard if it improves the hand, otherwise draw.
+
+        This implements the abstract base method (hook).
+        """
+        hand = self._hand_mask()
+        discard = 1 << move.available_discard.index
+        (deadwood_with_discard, _) = best_discard(hand | discard, keep=discard)
+        if deadwood_with_discard < deadwood_value(hand):
+            move.choose_card_from_discard()
+        else:
+            move.choose_card_from_draw()
+
+    def turn_finish(self, move: Move) -> None:
+        """Discard the card that leaves the least deadwood; knock if possible.
+
+        This implements the abstract base method (hook).
+        """
+        keep = 0
+        if move.card_source == CardSource.DISCARD_STACK:
+            keep = 1 << move.acquired.index # can't throw back what was taken
+        (deadwood, discard) = best_discard(self._hand_mask(), keep=keep)
+        if deadwood <= self.knock_limit:
+            move.knocking = True
+        move.discard(Card.from_index(discard))
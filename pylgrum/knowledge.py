@@ -0,0 +1,172 @@
+"""What one player knows about where the cards are.
+
+Machine players need to know which cards they have seen: which are in
+their hand, which are in the discard pile, and which the opponent is known
+to hold (because they took them from the discard pile). A KnowledgeTracker
+keeps that up to date by listening to the Game, doing a constant amount of
+work for each event, and holds each set as a bitmask of card indices (see
+`Card.index` and `pylgrum.meld_solver`).
+
+Classes:
+
+    KnowledgeChange: the kinds of change a tracker reports to its listeners
+    KnowledgeTracker: card knowledge from one player's point of view
+"""
+
+from enum import Enum
+
+from pylgrum.game import GameEvent
+from pylgrum.move import CardSource
+from pylgrum.meld_solver import cards_to_mask
+
+ALL_CARDS = (1 << 52) - 1
+
+class KnowledgeChange(Enum):
+    """Identifies what a KnowledgeTracker just learned."""
+    OWN_ACQUIRED = 1        # a card was added to the player's hand
+    OWN_DISCARDED = 2       # the player discarded a card
+    OPPONENT_TOOK = 3       # the opponent took a (known) card from the discard pile
+    OPPONENT_DREW = 4       # the opponent drew, passing up the card showing
+    OPPONENT_DISCARDED = 5  # the opponent discarded a card
+
+class KnowledgeTracker():
+    """Tracks what a player knows about every card, as bitmasks.
+
+    Attributes:
+        player (Player): the player whose knowledge this is
+        game (Game): the game being watched
+        own (int): the player's hand
+        opponent_known (int): cards the opponent took from the discard pile
+            and hasn't discarded since
+        opponent_discarded (int): every card the opponent has discarded
+        opponent_declined (int): cards the opponent saw showing on the
+            discard pile and chose not to take
+        discard_pile (int): the cards in the discard pile
+        top (int): index of the card showing on the discard pile, or -1 if
+            none is (e.g. it has just been taken)
+        draw_pile_size (int): number of cards left in the draw pile
+        started (bool): True once the tracker has seen the dealt hands
+    """
+
+    def __init__(self, player: 'Player') -> None:
+        """Create a tracker for a player. See watch()."""
+        self.player = player
+        self._listeners = []
+        self._reset()
+
+    def _reset(self) -> None:
+        self.game = None
+        self.started = False
+        self.own = 0
+        self.opponent_known = 0
+        self.opponent_discarded = 0
+        self.opponent_declined = 0
+        self.discard_pile = 0
+        self.top = -1
+        self.draw_pile_size = 52 - 21 # both hands and the up-card are dealt
+
+    def watch(self, game: 'Game') -> None:
+        """Start tracking a game, forgetting anything known about a previous one.
+
+        Call this when the player joins the game (i.e. before the deal).
+        """
+        if self.game is not None:
+            self.game.remove_listener(self.observe)
+        self._reset()
+        self.game = game
+        game.add_listener(self.observe)
+
+    def start(self) -> None:
+        """Pick up the dealt hand and the up-card.
+
+        This happens automatically at the first game event, but a player
+        making the first move of the game must call it themselves. Calling it
+        again has no effect.
+        """
+        if self.started:
+            return
+        self.started = True
+        self.own = cards_to_mask(self.player.hand.cards)
+        if self.game.current_move is not None:
+            up_card = self.game.current_move.available_discard
+        else:
+            up_card = self.game.visible_discard
+        self.top = up_card.index
+        self.discard_pile = 1 << self.top
+
+    def add_listener(self, listener) -> None:
+        """Register a callable to be told about each change.
+
+        Args:
+            listener (callable): called as `listener(tracker, change, index)`
+                after each change, where change is a KnowledgeChange and index
+                is the card involved
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """Stop telling a previously registered listener about changes."""
+        self._listeners.remove(listener)
+
+    def _announce(self, change: KnowledgeChange, index: int) -> None:
+        for listener in self._listeners:
+            listener(self, change, index)
+
+    def observe(self, game: 'Game', event: GameEvent) -> None:
+        """Update from a game event (Game listener)."""
+        if not self.started:
+            self.start()
+        move = game.current_move
+        mine = game.current_player is self.player
+        if event == GameEvent.CARD_ACQUIRED:
+            if move.card_source == CardSource.DRAW_STACK:
+                self.draw_pile_size -= 1
+                if mine:
+                    self.own |= 1 << move.acquired.index
+                    self._announce(KnowledgeChange.OWN_ACQUIRED, move.acquired.index)
+                else:
+                    declined = move.available_discard.index
+                    self.opponent_declined |= 1 << declined
+                    self._announce(KnowledgeChange.OPPONENT_DREW, declined)
+            else:
+                index = move.acquired.index
+                self.discard_pile &= ~(1 << index)
+                self.top = -1
+                if mine:
+                    self.own |= 1 << index
+                    self._announce(KnowledgeChange.OWN_ACQUIRED, index)
+                else:
+                    self.opponent_known |= 1 << index
+                    self._announce(KnowledgeChange.OPPONENT_TOOK, index)
+        elif event in (GameEvent.MOVE_FINALIZED, GameEvent.KNOCKED):
+            index = move.discarded.index
+            self.discard_pile |= 1 << index
+            self.top = index
+            if mine:
+                self.own &= ~(1 << index)
+                self._announce(KnowledgeChange.OWN_DISCARDED, index)
+            else:
+                self.opponent_known &= ~(1 << index)
+                self.opponent_discarded |= 1 << index
+                self._announce(KnowledgeChange.OPPONENT_DISCARDED, index)
+
+    @property
+    def dead(self) -> int:
+        """Cards buried in the discard pile, out of play for good."""
+        if self.top < 0:
+            return self.discard_pile
+        return self.discard_pile & ~(1 << self.top)
+
+    @property
+    def unknown(self) -> int:
+        """Cards that could be in the opponent's hand or the draw pile."""
+        return ALL_CARDS & ~(self.own | self.opponent_known | self.discard_pile)
+
+    @property
+    def opponent_unknown_count(self) -> int:
+        """How many of the opponent's 10 cards are not known (between turns)."""
+        return 10 - bin(self.opponent_known).count("1")
+
+    def is_live(self, index: int) -> bool:
+        """True if the card could still end up in either player's hand."""
+        return not self.dead >> index & 1
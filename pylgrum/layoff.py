@@ -0,0 +1,109 @@
+"""Find a defending player's best layoffs after their opponent knocks.
+
+When a player knocks without gin, their opponent (the defender) may "lay
+off" cards onto the knocker's melds: the fourth card of a 3-card set, or
+cards extending a run at either end (a 3-4-5 run can take the 6, and then
+the 7). Laid-off cards don't count as deadwood.
+
+Layoffs interact with the defender's own melds: a card can't be in a meld
+and be laid off too, so the best layoffs and the best melds have to be
+chosen together. layoff_options() lists, for each of the knocker's melds,
+every way the defender could lay off onto it - for a run, how far to extend
+it at each end. best_layoffs() tries every combination of those (there are
+only ever a handful) and, for each, finds the defender's best melds among
+the remaining cards with the cached solver in `pylgrum.meld_solver`. So the
+result is exact, and each combination costs one cached lookup.
+
+Functions:
+
+    layoff_options: the ways cards in a hand could be laid off on a meld
+    best_layoffs: jointly optimal layoffs and melds, as bitmasks
+    solve_layoffs: the same, for Cards and Melds (as used by MeldDetector)
+"""
+
+from collections import namedtuple
+from itertools import product
+
+from pylgrum.meld import Meld
+from pylgrum.meld_solver import cards_to_mask, mask_indices, mask_to_cards, optimal_melds
+
+LayoffResult = namedtuple('LayoffResult', ['deadwood', 'layoffs', 'melds'])
+LayoffResult.__doc__ = """The defender's best result after a knock.
+
+Fields:
+    deadwood (int): the defender's deadwood value after laying off
+    layoffs: the cards laid off (a bitmask from best_layoffs(), a list of
+        Cards from solve_layoffs())
+    melds (tuple): the defender's own melds (bitmasks, or Melds)
+"""
+
+def layoff_options(meld: int, hand: int) -> list:
+    """Return every set of cards from hand that could be laid off on meld.
+
+    Args:
+        meld (int): a complete meld, as a bitmask
+        hand (int): the defender's cards, as a bitmask
+
+    Returns a list of bitmasks, always including 0 (no layoffs).
+    """
+    indices = mask_indices(meld)
+    if len({index // 13 for index in indices}) > 1:
+        # a set: only the one missing card (if any) can be added
+        rank = indices[0] % 13
+        missing = [suit * 13 + rank for suit in range(4)
+                   if not meld >> (suit * 13 + rank) & 1]
+        if missing and hand >> missing[0] & 1:
+            return [0, 1 << missing[0]]
+        return [0]
+    # a run: extend down from its lowest card and up from its highest
+    suit_base = indices[0] - indices[0] % 13
+    below = [0]
+    index = indices[0] - 1
+    while index >= suit_base and hand >> index & 1:
+        below.append(below[-1] | 1 << index)
+        index -= 1
+    above = [0]
+    index = indices[-1] + 1
+    while index < suit_base + 13 and hand >> index & 1:
+        above.append(above[-1] | 1 << index)
+        index += 1
+    return [low | high for (low, high) in product(below, above)]
+
+def best_layoffs(hand: int, knocker_melds: tuple) -> LayoffResult:
+    """Find the layoffs and melds that leave the defender least deadwood.
+
+    Args:
+        hand (int): the defender's cards, as a bitmask
+        knocker_melds (tuple): the knocker's melds, as bitmasks
+
+    Returns a LayoffResult of bitmasks. When several choices tie, the one
+    laying off fewest cards is returned.
+    """
+    best = None
+    for choice in product(*(layoff_options(meld, hand) for meld in knocker_melds)):
+        layoffs = 0
+        for cards in choice:
+            layoffs |= cards
+        (deadwood, melds) = optimal_melds(hand & ~layoffs)
+        candidate = (deadwood, bin(layoffs).count("1"), layoffs, melds)
+        if best is None or candidate[:2] < best[:2]:
+            best = candidate
+    return LayoffResult(best[0], best[2], best[3])
+
+def solve_layoffs(hand, knocker_melds) -> LayoffResult:
+    """Find the defender's best layoffs and melds, given Cards and Melds.
+
+    Args:
+        hand (iterable): the defender's Cards (e.g. `Hand.cards`)
+        knocker_melds (iterable): the knocker's complete Melds (e.g.
+            `MeldDetector.optimal_hand.melds`)
+
+    Returns a LayoffResult holding a list of Cards and a tuple of Melds.
+    """
+    result = best_layoffs(cards_to_mask(hand),
+                          tuple(cards_to_mask(meld.cards) for meld in knocker_melds))
+    return LayoffResult(
+        result.deadwood,
+        mask_to_cards(result.layoffs),
+        tuple(Meld(*mask_to_cards(meld)) for meld in result.melds)
+    )
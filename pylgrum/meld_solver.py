@@ -0,0 +1,221 @@
+"""Fast optimal-meld search over sets of cards encoded as bitmasks.
+
+MeldDetector builds Meld and HandWithMelds objects for every candidate
+arrangement it considers, which is the right shape for showing a hand to a
+person, but far too slow for a machine player that needs to evaluate many
+hypothetical hands per decision. This module finds the same optimal melds
+using integers.
+
+A set of cards is represented as an int with bit `card.index` set for each
+card in the set (see `Card.index`). Since each suit's cards are numbered
+consecutively, a run is a contiguous block of bits within one suit.
+
+Functions:
+
+    cards_to_mask / mask_to_cards: convert between Cards and bitmasks
+    optimal_melds: minimum deadwood value and the melds that achieve it
+    deadwood_value: just the minimum deadwood value
+    best_discard: the discard that leaves the least deadwood
+    canonical_mask / canonical_suits / restore_suits: relabel suits to and
+        from a hand's canonical form
+    cache_clear / cache_info: manage the caches of solved hands
+"""
+
+from functools import lru_cache
+from itertools import combinations
+
+from pylgrum.card import Card
+
+CARD_POINTS = tuple(min(index % 13 + 1, 10) for index in range(52))
+"""Deadwood point value of each card, by card index."""
+
+def _all_melds() -> tuple:
+    """Return the bitmask of every possible complete meld in a deck."""
+    melds = []
+    for suit in range(4):
+        for start in range(13):
+            for length in range(3, 14 - start):
+                melds.append(((1 << length) - 1) << (suit * 13 + start))
+    for rank in range(13):
+        same_rank = [suit * 13 + rank for suit in range(4)]
+        for size in (3, 4):
+            for combo in combinations(same_rank, size):
+                melds.append(sum(1 << index for index in combo))
+    return tuple(melds)
+
+ALL_MELDS = _all_melds()
+"""Bitmask of every complete meld (run or set) that exists in a deck."""
+
+MELDS_BY_CARD = tuple(
+    tuple(meld for meld in ALL_MELDS if meld >> index & 1)
+    for index in range(52)
+)
+"""For each card index, the bitmasks of the complete melds using that card."""
+
+def cards_to_mask(cards) -> int:
+    """Return the bitmask for an iterable of Cards."""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.index
+    return mask
+
+def mask_to_cards(mask: int) -> list:
+    """Return the (shared) Cards in a bitmask, in card order."""
+    return [Card.from_index(index) for index in mask_indices(mask)]
+
+def mask_indices(mask: int) -> list:
+    """Return the card indices set in a bitmask, lowest first."""
+    indices = []
+    while mask:
+        low_bit = mask & -mask
+        indices.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return indices
+
+def mask_points(mask: int) -> int:
+    """Return the total point value of the cards in a bitmask."""
+    return sum(CARD_POINTS[index] for index in mask_indices(mask))
+
+SUIT_MASK = (1 << 13) - 1
+"""The bits of one suit's cards, shifted down to the lowest 13 bits."""
+
+def canonical_mask(mask: int) -> int:
+    """Return the canonical relabelling of a hand's suits.
+
+    Which suit is which makes no difference to melds or deadwood, so a hand
+    and the (up to 24) hands made by permuting its suits share one canonical
+    form: the one with the suits' cards reordered so that, read as 13-bit
+    numbers, suit 0's are the largest and suit 3's the smallest.
+    """
+    (first, second, third, fourth) = (
+        mask & SUIT_MASK, mask >> 13 & SUIT_MASK, mask >> 26 & SUIT_MASK, mask >> 39)
+    # a sorting network: quicker than sorted() for four items
+    if first < second:
+        (first, second) = (second, first)
+    if third < fourth:
+        (third, fourth) = (fourth, third)
+    if first < third:
+        (first, third) = (third, first)
+    if second < fourth:
+        (second, fourth) = (fourth, second)
+    if second < third:
+        (second, third) = (third, second)
+    return first | second << 13 | third << 26 | fourth << 39
+
+def canonical_suits(mask: int) -> tuple:
+    """Return (canonical_mask(mask), order), to translate results back.
+
+    order[i] is the suit of mask whose cards are suit i of the canonical
+    mask; `restore_suits(canonical, order)` gives back mask, and likewise
+    translates anything found for the canonical mask (e.g. its melds).
+    """
+    words = (mask & SUIT_MASK, mask >> 13 & SUIT_MASK, mask >> 26 & SUIT_MASK, mask >> 39)
+    order = tuple(sorted(range(4), key=words.__getitem__, reverse=True))
+    return (words[order[0]] | words[order[1]] << 13 | words[order[2]] << 26
+            | words[order[3]] << 39, order)
+
+def restore_suits(mask: int, order: tuple) -> int:
+    """Undo canonical_suits(): move suit i's cards of mask to suit order[i]."""
+    restored = 0
+    for (suit, original) in enumerate(order):
+        restored |= (mask >> (13 * suit) & SUIT_MASK) << (13 * original)
+    return restored
+
+@lru_cache(maxsize=1 << 18)
+def _deadwood(mask: int) -> int:
+    """Minimum deadwood of a mask (see optimal_melds() for the search).
+
+    Called with canonical masks, and recursively with their sub-hands as
+    they are: canonicalizing every sub-hand costs more than it saves.
+    """
+    if mask == 0:
+        return 0
+    low_bit = mask & -mask
+    index = low_bit.bit_length() - 1
+    best = _deadwood(mask ^ low_bit) + CARD_POINTS[index]
+    for meld in MELDS_BY_CARD[index]:
+        if meld & mask == meld:
+            rest = _deadwood(mask ^ meld)
+            if rest < best:
+                best = rest
+    return best
+
+@lru_cache(maxsize=1 << 16)
+def _canonical_melds(mask: int) -> tuple:
+    """optimal_melds() of a canonical mask.
+
+    Walks back down the search, at each step taking a choice that keeps the
+    cached minimum deadwood; like the search, it prefers leaving the lowest
+    card as deadwood.
+    """
+    deadwood = _deadwood(mask)
+    (remaining, remaining_deadwood) = (mask, deadwood)
+    melds = ()
+    while remaining:
+        low_bit = remaining & -remaining
+        index = low_bit.bit_length() - 1
+        if _deadwood(remaining ^ low_bit) + CARD_POINTS[index] == remaining_deadwood:
+            remaining ^= low_bit
+            remaining_deadwood -= CARD_POINTS[index]
+            continue
+        for meld in MELDS_BY_CARD[index]:
+            if (meld & remaining == meld
+                    and _deadwood(remaining ^ meld) == remaining_deadwood):
+                remaining ^= meld
+                melds += (meld,)
+                break
+    return (deadwood, melds)
+
+def optimal_melds(mask: int) -> tuple:
+    """Find the arrangement of melds that leaves the least deadwood.
+
+    Args:
+        mask (int): the cards to arrange, as a bitmask
+
+    Returns (deadwood value, tuple of meld bitmasks). When several
+    arrangements tie, which one is returned is unspecified.
+
+    The search considers the lowest card in the hand: either it is deadwood,
+    or it is in one of the (few) complete melds that contain it and fit in the
+    hand. Each choice leaves a smaller hand to solve the same way, and results
+    are cached by hand, so hands sharing sub-hands share the work. Hands are
+    first relabelled into canonical form (see canonical_mask()), so the up
+    to 24 hands differing only by a relabelling of suits share one cache
+    entry, and the melds found are relabelled back.
+    """
+    (canonical, order) = canonical_suits(mask)
+    (deadwood, melds) = _canonical_melds(canonical)
+    if order == (0, 1, 2, 3):
+        return (deadwood, melds)
+    return (deadwood, tuple(restore_suits(meld, order) for meld in melds))
+
+def deadwood_value(mask: int) -> int:
+    """Return the minimum deadwood value of the cards in a bitmask."""
+    return _deadwood(canonical_mask(mask))
+
+def cache_clear() -> None:
+    """Empty the caches of solved hands (e.g. to time solving from scratch)."""
+    _deadwood.cache_clear()
+    _canonical_melds.cache_clear()
+
+def cache_info() -> dict:
+    """Return the lru_cache statistics of the caches of solved hands, by name."""
+    return {"deadwood": _deadwood.cache_info(), "melds": _canonical_melds.cache_info()}
+
+def best_discard(mask: int, keep: int = 0) -> tuple:
+    """Choose the discard that leaves the least deadwood.
+
+    Args:
+        mask (int): the hand (usually 11 cards), as a bitmask
+        keep (int): [optional] bitmask of cards that may not be discarded
+            (e.g. a card just taken from the discard pile)
+
+    Returns (deadwood value after discarding, index of the card to discard).
+    Ties are broken in favor of discarding the card worth more points.
+    """
+    best = None
+    for index in mask_indices(mask & ~keep):
+        candidate = (deadwood_value(mask ^ (1 << index)), -CARD_POINTS[index], index)
+        if best is None or candidate < best:
+            best = candidate
+    return (best[0], best[2])
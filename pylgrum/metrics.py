@@ -0,0 +1,178 @@
+"""Call counts and latency histograms for key pylgrum operations.
+
+Functions decorated with `instrumented()` record how often they are called,
+how often they raise, and how long they take, in fixed-bucket histograms held
+by a MetricsRegistry. The registry can render everything it holds in the
+Prometheus / OpenMetrics text exposition format.
+
+Recording is off by default. While it is off, an instrumented call costs one
+extra function call and one attribute check. Turn it on with:
+
+    from pylgrum.metrics import REGISTRY
+    REGISTRY.enable()
+
+Classes:
+
+    Histogram: a latency histogram with fixed bucket boundaries
+    MetricsRegistry: a named collection of Histograms
+"""
+
+import bisect
+import functools
+import threading
+import time
+
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005,
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0
+)
+"""Default histogram bucket upper bounds, in seconds."""
+
+class Histogram():
+    """Counts observations into buckets with fixed upper bounds.
+
+    Attributes:
+        name (str): metric name, used in the exposition format
+        help (str): one-line description of the metric
+        bounds (tuple): ascending bucket upper bounds
+        counts (list): observations per bucket (not cumulative); the final
+            entry counts observations above the last bound
+        total (float): sum of all observations
+        count (int): number of observations
+        errors (int): number of calls that raised an exception
+    """
+
+    def __init__(self, name: str, help_text: str = "", bounds: tuple = DEFAULT_BUCKETS) -> None:
+        """Create an empty histogram.
+
+        Args:
+            name (str): metric name
+            help_text (str): [optional] one-line description of the metric
+            bounds (tuple): [optional] ascending bucket upper bounds
+        """
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard all observations."""
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, value: float, error: bool = False) -> None:
+        """Record one observation.
+
+        Args:
+            value (float): the observed value (e.g. a latency in seconds)
+            error (bool): [optional] True if the observed call raised
+        """
+        idx = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.total += value
+            self.count += 1
+            if error:
+                self.errors += 1
+
+    def exposition(self, openmetrics: bool = False) -> str:
+        """Render the histogram in the Prometheus text format.
+
+        Args:
+            openmetrics (bool): [optional] follow OpenMetrics, where a
+                counter family's name omits the "_total" of its sample
+        """
+        lines = [
+            "# HELP {}_seconds {}".format(self.name, self.help),
+            "# TYPE {}_seconds histogram".format(self.name),
+        ]
+        cumulative = 0
+        for (bound, count) in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append('{}_seconds_bucket{{le="{}"}} {}'.format(self.name, bound, cumulative))
+        lines.append('{}_seconds_bucket{{le="+Inf"}} {}'.format(self.name, self.count))
+        lines.append("{}_seconds_sum {}".format(self.name, self.total))
+        lines.append("{}_seconds_count {}".format(self.name, self.count))
+        family = "{}_errors{}".format(self.name, "" if openmetrics else "_total")
+        lines.append("# HELP {} Calls that raised an exception".format(family))
+        lines.append("# TYPE {} counter".format(family))
+        lines.append("{}_errors_total {}".format(self.name, self.errors))
+        return "\n".join(lines)
+
+class MetricsRegistry():
+    """A collection of named Histograms that can be switched on and off."""
+
+    def __init__(self) -> None:
+        """Create an empty, disabled registry."""
+        self.enabled = False
+        self.histograms = {}
+
+    def histogram(self, name: str, help_text: str = "") -> Histogram:
+        """Return the named histogram, creating it if necessary."""
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help_text)
+        return self.histograms[name]
+
+    def enable(self) -> None:
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording (already-recorded values are kept)."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def exposition(self, openmetrics: bool = False) -> str:
+        """Render all histograms in the Prometheus text exposition format.
+
+        Args:
+            openmetrics (bool): [optional] render in the OpenMetrics format
+                (counter family names, and the "# EOF" trailer) rather than
+                the Prometheus 0.0.4 text format
+        """
+        text = "\n".join(h.exposition(openmetrics)
+                         for (_, h) in sorted(self.histograms.items()))
+        if openmetrics:
+            text += "\n# EOF"
+        return text + "\n"
+
+REGISTRY = MetricsRegistry()
+"""The registry used by pylgrum's own instrumented functions."""
+
+def instrumented(name: str, help_text: str = "", registry: MetricsRegistry = REGISTRY):
+    """Decorator that records calls to a function in a latency histogram.
+
+    Args:
+        name (str): metric name (conventionally starting with "pylgrum_")
+        help_text (str): [optional] one-line description of the metric
+        registry (MetricsRegistry): [optional] where to record; defaults to
+            the module's REGISTRY
+    """
+    histogram = registry.histogram(name, help_text)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except:
+                histogram.observe(time.perf_counter() - start, error=True)
+                raise
+            histogram.observe(time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,174 @@
+"""Opt-in counts of calls to meld-handling internals.
+
+When a game is slow, counting how often the expensive internals run - meld
+construction, validity checks, hand rebuilding during meld detection -
+shows where the time goes. An OpCounters counts calls to a list of methods,
+both for the whole process and for each Game they happen within.
+
+Counting is off by default, and then costs nothing at all: the counted
+methods are only wrapped while counting is enabled, and are put back as
+they were when it is disabled. Turn it on with:
+
+    from pylgrum.opstats import COUNTERS
+    COUNTERS.enable()
+    ...
+    COUNTERS.totals()           # Counter: "Meld.__init__" -> calls, ...
+    COUNTERS.for_game(game)     # the same, for calls made during game's
+                                #  turns and other Game operations
+
+Counts are collections.Counter objects, so counts from several games (or
+processes) can be added together.
+
+Classes:
+
+    OpCounters: counts calls to a set of methods while enabled
+"""
+
+from collections import Counter
+import functools
+import threading
+import weakref
+
+from pylgrum.game import Game
+from pylgrum.hand_melds import HandWithMelds
+from pylgrum.meld import Meld
+from pylgrum.meld_detector import MeldDetector
+
+COUNTED = (
+    (Meld, "__init__"),
+    (Meld, "_update_validity"),
+    (Meld, "add"),
+    (Meld, "remove"),
+    (HandWithMelds, "create_meld"),
+    (HandWithMelds, "remove_meld"),
+    (HandWithMelds, "add_to_meld"),
+    (HandWithMelds, "remove_from_meld"),
+    (HandWithMelds, "melds_with_overused_cards"),
+    (HandWithMelds, "melds_with_no_overused_cards"),
+    (HandWithMelds, "melds_using_card"),
+    (HandWithMelds, "deadwood"),
+    (HandWithMelds, "is_valid"),
+    (HandWithMelds, "deadwood_value"),
+    (MeldDetector, "detect_optimal_melds"),
+    (MeldDetector, "_detect_all_melds"),
+    (MeldDetector, "_find_runs"),
+    (MeldDetector, "_find_complete_sets"),
+    (MeldDetector, "_solve_hand_for_melds_in_order"),
+)
+"""The (class, attribute) pairs counted by default."""
+
+GAME_OPERATIONS = ("play", "_do_turn", "start_new_move", "acquire_card",
+                   "finalize_move", "next_turn", "status_for")
+"""Game methods during which counted calls are credited to the game."""
+
+class OpCounters():
+    """Counts calls to methods, per process and per game, while enabled.
+
+    Enabling patches the counted classes, so only one OpCounters (usually
+    COUNTERS) can be enabled at a time.
+
+    Attributes:
+        enabled (bool): True while counting
+    """
+
+    _active = None
+    """The enabled OpCounters, if any."""
+
+    def __init__(self, counted: tuple = COUNTED) -> None:
+        """Create a disabled set of counters.
+
+        Args:
+            counted (tuple): [optional] (class, attribute name) pairs to
+                count; the attribute may be a method or a property
+        """
+        self.enabled = False
+        self._counted = tuple(counted)
+        self._originals = {}
+        self._lock = threading.Lock()
+        self._local = threading.local() # the game being played, per thread
+        self._totals = Counter()
+        self._games = weakref.WeakKeyDictionary()
+
+    def _count(self, name: str) -> None:
+        game = getattr(self._local, "game", None)
+        with self._lock:
+            self._totals[name] += 1
+            if game is not None:
+                self._games.setdefault(game, Counter())[name] += 1
+
+    def _counting(self, name: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._count(name)
+            return func(*args, **kwargs)
+        return wrapper
+
+    def _in_game(self, func):
+        @functools.wraps(func)
+        def wrapper(game, *args, **kwargs):
+            outer = getattr(self._local, "game", None)
+            self._local.game = game
+            try:
+                return func(game, *args, **kwargs)
+            finally:
+                self._local.game = outer
+        return wrapper
+
+    def _wrap(self, cls: type, attribute: str, wrap) -> None:
+        original = cls.__dict__[attribute]
+        self._originals[(cls, attribute)] = original
+        if isinstance(original, property):
+            setattr(cls, attribute, property(wrap(original.fget), original.fset,
+                                             original.fdel, original.__doc__))
+        else:
+            setattr(cls, attribute, wrap(original))
+
+    def enable(self) -> None:
+        """Start counting (wrapping the counted methods).
+
+        Raises RuntimeError if another OpCounters is enabled.
+        """
+        if self.enabled:
+            return
+        if OpCounters._active is not None:
+            raise RuntimeError("another OpCounters is already enabled")
+        OpCounters._active = self
+        for (cls, attribute) in self._counted:
+            name = "{}.{}".format(cls.__name__, attribute)
+            self._wrap(cls, attribute,
+                       lambda func, name=name: self._counting(name, func))
+        for attribute in GAME_OPERATIONS:
+            self._wrap(Game, attribute, self._in_game)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop counting, restoring the original methods (counts are kept)."""
+        if not self.enabled:
+            return
+        for ((cls, attribute), original) in self._originals.items():
+            setattr(cls, attribute, original)
+        self._originals = {}
+        self.enabled = False
+        OpCounters._active = None
+
+    def reset(self, game: Game = None) -> None:
+        """Discard the counts for one game, or (by default) all counts."""
+        with self._lock:
+            if game is not None:
+                self._games.pop(game, None)
+            else:
+                self._totals = Counter()
+                self._games = weakref.WeakKeyDictionary()
+
+    def totals(self) -> Counter:
+        """Return the counts of calls made in this process."""
+        with self._lock:
+            return Counter(self._totals)
+
+    def for_game(self, game: Game) -> Counter:
+        """Return the counts of calls made during a game's operations."""
+        with self._lock:
+            return Counter(self._games.get(game, ()))
+
+COUNTERS = OpCounters()
+"""The counters for pylgrum's own meld-handling internals."""
@@ -0,0 +1,180 @@
+"""Run each search on several processes at once (root parallelization).
+
+A search in one process is limited by the GIL to one core. A SearchPool
+keeps worker processes running, and for each decision every worker runs its
+own independent search (see `pylgrum.search.search()`) over the same
+actions, with its own random worlds, for the whole budget. The workers'
+per-action statistics (worlds evaluated in, and total value) are then
+summed, and the action with the most evidence behind it is played. So a
+decision gets as many sampled worlds as all the workers manage together, in
+the time one would take.
+
+The workers outlive each decision, so they keep their meld-solver caches and
+a decision costs only one small message to each worker and one back. The
+message is a tuple of ints: the SearchState fields, the search settings and
+the actions, encoded with encode_action() - never a pickled Game.
+
+Classes:
+
+    SearchPool: a set of persistent worker processes that search together
+
+Functions:
+
+    encode_action / decode_action: actions as small ints
+    merged_choice: pick an action from the workers' summed statistics
+"""
+
+import multiprocessing
+import random
+import time
+
+from pylgrum.move import CardSource
+from pylgrum.search import KNOCK_LIMIT, SearchState, search
+
+DRAW = -1
+TAKE = -2
+
+def encode_action(action) -> int:
+    """Encode a start or finish action (see `pylgrum.search`) as an int.
+
+    Drawing is DRAW and taking the discard is TAKE; a finish action is the
+    index of the discard, plus 52 if knocking.
+    """
+    if action == CardSource.DRAW_STACK:
+        return DRAW
+    if action == CardSource.DISCARD_STACK:
+        return TAKE
+    (index, knock) = action
+    return index + 52 * knock
+
+def decode_action(code: int):
+    """Reverse encode_action()."""
+    if code == DRAW:
+        return CardSource.DRAW_STACK
+    if code == TAKE:
+        return CardSource.DISCARD_STACK
+    return (code % 52, code >= 52)
+
+def merged_choice(visits: list, values: list) -> int:
+    """Return the index of the action to play, from summed search statistics.
+
+    Args:
+        visits (list): for each action, the worlds it was evaluated in
+        values (list): for each action, the total of its values in them
+
+    The search keeps evaluating the better actions in more worlds, so the
+    action evaluated most often wins. Actions evaluated equally often were
+    evaluated in the same worlds, so between them the higher total value
+    wins; a remaining tie goes to the earlier action.
+    """
+    return max(range(len(visits)), key=lambda i: (visits[i], values[i], -i))
+
+def _worker(connection) -> None:
+    """Serve search requests until told to stop (with None)."""
+    connection.send(None) # ready
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        (hand, top, seen, opponent_known, draw_pile_size,
+         budget, knock_limit, seed, samples_per_pass) = job[:9]
+        state = SearchState(hand, top, seen, opponent_known, draw_pile_size)
+        actions = [decode_action(code) for code in job[9:]]
+        (_, stats) = search(state, actions, budget=budget, knock_limit=knock_limit,
+                               rng=random.Random(seed), samples_per_pass=samples_per_pass)
+        connection.send((stats["samples"], stats["nodes"], stats["depth"],
+                         tuple(stats["visits"]), tuple(stats["values"])))
+    connection.close()
+
+class SearchPool():
+    """Persistent worker processes that share each search.
+
+    Use as a context manager, or call close() when done:
+
+        with SearchPool(4) as pool:
+            player = SearchPlayer(pool=pool)
+            ...
+
+    Attributes:
+        workers (int): the number of worker processes
+    """
+
+    def __init__(self, workers: int = None, seed: int = None) -> None:
+        """Start the worker processes, and wait until they are ready.
+
+        Args:
+            workers (int): [optional] number of processes; defaults to the
+                number of CPUs
+            seed (int): [optional] seed for the workers' sampling
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self._rng = random.Random(seed)
+        self._processes = []
+        self._connections = []
+        for _ in range(self.workers):
+            (ours, theirs) = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(theirs,), daemon=True)
+            process.start()
+            theirs.close()
+            self._processes.append(process)
+            self._connections.append(ours)
+        for connection in self._connections:
+            connection.recv()
+
+    def __enter__(self) -> 'SearchPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        self._connections = []
+
+    def search(self, state: SearchState, actions: list, budget: float = 0.05,
+               knock_limit: int = KNOCK_LIMIT, samples_per_pass: int = 4) -> tuple:
+        """Choose the best of actions, searching in every worker.
+
+        Args are as for `pylgrum.search.search()`. Each worker searches for
+        the whole budget.
+
+        The workers' visits and values are summed, and the action is chosen
+        from the totals by merged_choice().
+
+        Returns (best action, statistics dict): as for search(), with
+        samples, nodes, visits and values totalled over the workers, the
+        deepest depth any worker reached, and "workers", the number of
+        workers.
+        """
+        if not self._connections:
+            raise RuntimeError("SearchPool has been closed")
+        start = time.perf_counter()
+        stats = {"samples": 0, "nodes": 0, "depth": 0, "workers": self.workers,
+                 "visits": [0] * len(actions), "values": [0] * len(actions)}
+        if len(actions) > 1:
+            codes = [encode_action(action) for action in actions]
+            for connection in self._connections:
+                connection.send(tuple(state) + (budget, knock_limit, self._rng.getrandbits(32),
+                                                samples_per_pass) + tuple(codes))
+            for connection in self._connections:
+                (samples, nodes, depth, visits, values) = connection.recv()
+                stats["samples"] += samples
+                stats["nodes"] += nodes
+                stats["depth"] = max(stats["depth"], depth)
+                for i in range(len(codes)):
+                    stats["visits"][i] += visits[i]
+                    stats["values"][i] += values[i]
+            actions = [actions[merged_choice(stats["visits"], stats["values"])]]
+        seconds = time.perf_counter() - start
+        stats["seconds"] = seconds
+        stats["nodes_per_second"] = stats["nodes"] / seconds if seconds else 0.0
+        return (actions[0], stats)
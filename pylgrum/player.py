@@ -34,6 +34,10 @@ class Player():
             raise PylgrumError("Can't join game with None value")
         self.game = game
 
+    def reset_hand(self) -> None:
+        """Empty the hand (keeping its type), e.g. before a new game."""
+        self.hand = type(self.hand)()
+
     def receive_card(self, card: Card) -> None:
         """Add a card to the hand."""
         self.hand.add(card)
@@ -0,0 +1,262 @@
+"""Profile a batch of bot games, the same way every time.
+
+Usage:
+    python -m pylgrum.profile [--games N] [--seed SEED] [--focus FOCUS]
+                              [--out DIRECTORY] [--interval SECONDS] [--top K]
+
+Plays N games between greedy bots twice with the same seed - once under
+cProfile, and once under a sampling profiler that records the call stack
+every interval - and writes to DIRECTORY (by default `profile-out`):
+
+    profile.prof      the cProfile statistics, for pstats, snakeviz etc.
+    stacks.collapsed  the sampled stacks in collapsed ("folded") form, one
+                      "outer;...;inner count" line per distinct stack, for
+                      flamegraph.pl, speedscope or inferno
+    summary.txt       the top K functions by own time and by cumulative time
+
+and prints a JSON summary with the top K functions by own time.
+
+FOCUS picks what is profiled:
+
+    all     headless games (`Game.play()`), each scored; everything reported
+    meld    the same games, reporting only meld detection: functions in
+            meld, hand_melds, meld_detector, meld_solver and layoff, and
+            stacks passing through them
+    server  games played by bots through a GameManager (as the HTTP API
+            does), reporting only `pylgrum.server` functions and stacks
+
+The meld_solver cache is cleared before each pass, so results are
+comparable between runs. The sampler is a thread, so it can only take a
+sample when the game thread releases the GIL (every 5ms by default, see
+`sys.setswitchinterval()`), whatever the interval.
+
+Classes:
+
+    StackSampler: a sampling profiler producing collapsed stacks
+
+Functions:
+
+    play_games: the profiled workload
+    profile_games: profile the workload and write the output files
+"""
+
+import argparse
+import cProfile
+from collections import Counter
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+
+from pylgrum.card import Card
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.meld_solver import best_discard, cache_clear, cards_to_mask, deadwood_value
+from pylgrum.scoring import score_game
+from pylgrum.server.game_manager import GameManager
+
+FOCUS = {
+    "all": None,
+    "meld": ("pylgrum/meld.py", "pylgrum/hand_melds.py", "pylgrum/meld_detector.py",
+             "pylgrum/meld_solver.py", "pylgrum/layoff.py"),
+    "server": ("pylgrum/server/",),
+}
+"""Focus name -> the source paths reported (None: everything)."""
+
+def _in_focus(filename: str, focus: str) -> bool:
+    paths = FOCUS[focus]
+    if paths is None:
+        return True
+    filename = filename.replace(os.sep, "/")
+    return any(path in filename for path in paths)
+
+class StackSampler():
+    """Samples one thread's call stack at intervals, from another thread.
+
+    Attributes:
+        interval (float): seconds between samples
+        stacks (Counter): collapsed stack ("outer;...;inner") -> samples
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        """Create a sampler (not yet started).
+
+        Args:
+            interval (float): [optional] seconds between samples
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    @staticmethod
+    def _label(frame) -> str:
+        return "{}:{}".format(frame.f_globals.get("__name__", "?"), frame.f_code.co_name)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target) # pylint: disable=protected-access
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self) -> None:
+        """Start sampling the calling thread."""
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self, modules: tuple = None) -> str:
+        """Return the samples in collapsed form, one line per stack.
+
+        Args:
+            modules (tuple): [optional] only include stacks with a frame in
+                one of these modules (or their submodules)
+        """
+        lines = []
+        for (stack, count) in sorted(self.stacks.items()):
+            if modules is not None and not any(
+                    frame.split(":")[0].startswith(modules) for frame in stack.split(";")):
+                continue
+            lines.append("{} {}\n".format(stack, count))
+        return "".join(lines)
+
+def _module_names(focus: str) -> tuple:
+    """The module names of a focus's paths, e.g. "pylgrum.server"."""
+    paths = FOCUS[focus]
+    if paths is None:
+        return None
+    return tuple(path.rstrip("/").replace(".py", "").replace("/", ".") for path in paths)
+
+def _server_turn(manager: GameManager, game: Game) -> None:
+    """Play one greedy turn of a game through the GameManager."""
+    player = game.current_player
+    hand = cards_to_mask(player.hand.cards)
+    discard = 1 << game.visible_discard.index
+    take = best_discard(hand | discard, keep=discard)[0] < deadwood_value(hand)
+    manager.acquire_card(game.game_id, player.contestant_id, "discard" if take else "draw")
+    (deadwood, card) = best_discard(cards_to_mask(player.hand.cards),
+                                    keep=discard if take else 0)
+    card = Card.from_index(card)
+    manager.status_for(game.game_id, player.contestant_id)
+    manager.discard_card(game.game_id, player.contestant_id, card.suit.name, card.rank.name,
+                         knock=deadwood <= 10)
+
+def play_games(games: int, seed: int = 0, server: bool = False) -> None:
+    """Play bot games: the workload profiled.
+
+    Args:
+        games (int): number of games to play
+        seed (int): [optional] seed for the decks
+        server (bool): [optional] play through a GameManager rather than
+            with `Game.play()`
+    """
+    random.seed(seed)
+    if not server:
+        for _ in range(games):
+            game = Game(GreedyPlayer(), GreedyPlayer())
+            game.play()
+            score_game(game)
+        return
+    manager = GameManager()
+    for _ in range(games):
+        challenger = manager.add_contestant()
+        opponent = manager.add_contestant()
+        game = manager.games[manager.create_game(challenger.id, opponent.id)["id"]]
+        while not game.is_over:
+            _server_turn(manager, game)
+        for contestant in (challenger, opponent):
+            manager.status_for(game.game_id, contestant.id)
+
+def _top_functions(stats: pstats.Stats, focus: str, top: int) -> list:
+    rows = []
+    for ((filename, line, function), (_, calls, own, cumulative, _)) in stats.stats.items():
+        if _in_focus(filename, focus):
+            rows.append({"function": "{}:{}({})".format(filename, line, function),
+                         "calls": calls, "own_seconds": own, "cumulative_seconds": cumulative})
+    rows.sort(key=lambda row: row["own_seconds"], reverse=True)
+    return rows[:top]
+
+def profile_games(games: int, out: str, seed: int = 0, focus: str = "all",
+                  interval: float = 0.001, top: int = 25) -> dict:
+    """Profile play_games() and write the output files; return the summary.
+
+    Args:
+        games (int): number of games to play in each pass
+        out (str): directory to write to (created if need be)
+        seed (int): [optional] seed for the decks
+        focus (str): [optional] a key of FOCUS
+        interval (float): [optional] seconds between stack samples
+        top (int): [optional] number of functions to summarize
+    """
+    if focus not in FOCUS:
+        raise ValueError("unknown focus {!r}".format(focus))
+    os.makedirs(out, exist_ok=True)
+    server = focus == "server"
+
+    cache_clear()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.runcall(play_games, games, seed, server)
+    profiled_seconds = time.perf_counter() - started
+    paths = {name: os.path.join(out, name)
+             for name in ("profile.prof", "stacks.collapsed", "summary.txt")}
+    profiler.dump_stats(paths["profile.prof"])
+
+    cache_clear()
+    sampler = StackSampler(interval)
+    sampler.start()
+    try:
+        play_games(games, seed, server)
+    finally:
+        sampler.stop()
+    with open(paths["stacks.collapsed"], "w") as collapsed:
+        collapsed.write(sampler.collapsed(_module_names(focus)))
+
+    text = io.StringIO()
+    stats = pstats.Stats(paths["profile.prof"], stream=text)
+    restriction = () if FOCUS[focus] is None else (
+        "|".join(path.replace(".", r"\.") for path in FOCUS[focus]),)
+    for order in ("tottime", "cumulative"):
+        stats.sort_stats(order).print_stats(*restriction, top)
+    with open(paths["summary.txt"], "w") as summary:
+        summary.write(text.getvalue())
+
+    return {
+        "games": games,
+        "seed": seed,
+        "focus": focus,
+        "profiled_seconds": profiled_seconds,
+        "samples": sum(sampler.stacks.values()),
+        "files": paths,
+        "top": _top_functions(stats, focus, top),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--focus", choices=sorted(FOCUS), default="all")
+    parser.add_argument("--out", default="profile-out")
+    parser.add_argument("--interval", type=float, default=0.001)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+    print(json.dumps(profile_games(args.games, args.out, args.seed, args.focus,
+                                   args.interval, args.top), indent=2))
+
+if __name__ == '__main__':
+    main()
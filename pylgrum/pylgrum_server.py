@@ -0,0 +1,8 @@
+"""Flask entry point for the pylgrum HTTP API.
+
+Run with e.g.: FLASK_APP=pylgrum/pylgrum_server.py flask run
+"""
+
+from pylgrum.server.api import create_app
+
+app = create_app() # pylint: disable=invalid-name
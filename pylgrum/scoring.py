@@ -0,0 +1,323 @@
+"""Score finished hands, and play matches of successive hands.
+
+A hand ends when a player knocks (or when the draw pile runs out, which
+scores nothing). The knocker lays down their melds; the defender lays down
+theirs and, unless the knocker went gin, lays off what they can onto the
+knocker's melds (see `pylgrum.layoff`). Then:
+
+ * knock: the knocker wins the difference in deadwood
+ * undercut: if the defender's deadwood is no more than the knocker's, the
+   defender wins the difference plus an undercut bonus
+ * gin: a knocker with no deadwood wins the defender's deadwood plus a gin
+   bonus, and can't be undercut
+ * big gin: as gin, with a bigger bonus, when all 11 cards the knocker held
+   before discarding form melds
+
+A match is a series of hands, played until one player's total reaches a
+target. The winner then gets a game bonus, a "box" bonus for every hand they
+won, and (if the loser won no hands at all) has their total multiplied.
+
+Each finished hand can be kept as a HandRecord, which holds only bitmasks of
+card indices (see `pylgrum.meld_solver`) so it can be archived as JSON, and
+score_hands() scores any number of them in one call.
+
+Classes:
+
+    ScoringRules: the point values and limits to score with
+    HandOutcome: how a hand ended
+    Match: plays hands between two players until one reaches the target
+
+Functions:
+
+    score_hand: score a knock, given both players' cards
+    hand_record: a HandRecord for a finished Game
+    score_game: score a finished Game
+    score_hands: score many HandRecords at once
+"""
+
+from collections import namedtuple
+from enum import Enum
+import os
+
+from pylgrum.errors import IllegalMoveError, PylgrumError
+from pylgrum.layoff import best_layoffs
+from pylgrum.meld_solver import cards_to_mask, optimal_melds
+
+# Game, Player and multiprocessing are imported where they are used, so that
+#  processes which only score hands don't import the game engine.
+
+class ScoringRules():
+    """The point values and limits used to score hands and matches.
+
+    The defaults are the common rules; pass keyword arguments to vary them.
+
+    Attributes:
+        knock_limit (int): the most deadwood a player may knock with
+        gin_bonus (int): bonus for going gin
+        big_gin_bonus (int): bonus for big gin (instead of gin_bonus)
+        undercut_bonus (int): bonus to a defender who undercuts the knocker
+        layoffs_on_gin (bool): whether the defender may lay off on gin
+        match_target (int): a match ends when a player's total reaches this
+        game_bonus (int): bonus to the winner of a match
+        box_bonus (int): bonus to each player, at the end of a match, for
+            every hand they won
+        shutout_multiplier (int): the winner's final total is multiplied by
+            this if the loser won no hands
+    """
+
+    def __init__(self, knock_limit: int = 10, gin_bonus: int = 25,
+                 big_gin_bonus: int = 31, undercut_bonus: int = 25,
+                 layoffs_on_gin: bool = False, match_target: int = 100,
+                 game_bonus: int = 100, box_bonus: int = 25,
+                 shutout_multiplier: int = 2) -> None:
+        """Create a set of rules; every argument is [optional]."""
+        self.knock_limit = knock_limit
+        self.gin_bonus = gin_bonus
+        self.big_gin_bonus = big_gin_bonus
+        self.undercut_bonus = undercut_bonus
+        self.layoffs_on_gin = layoffs_on_gin
+        self.match_target = match_target
+        self.game_bonus = game_bonus
+        self.box_bonus = box_bonus
+        self.shutout_multiplier = shutout_multiplier
+
+DEFAULT_RULES = ScoringRules()
+
+class HandOutcome(Enum):
+    """How a hand ended."""
+    NO_WINNER = 0 # the draw pile ran out
+    KNOCK = 1
+    UNDERCUT = 2
+    GIN = 3
+    BIG_GIN = 4
+
+HandResult = namedtuple('HandResult', [
+    'outcome', 'points', 'knocker_deadwood', 'defender_deadwood', 'layoffs'
+])
+HandResult.__doc__ = """The score of one hand.
+
+Fields:
+    outcome (HandOutcome): how the hand ended
+    points (int): points won by the knocker; negative if the defender won
+        (an undercut)
+    knocker_deadwood (int): the knocker's deadwood value
+    defender_deadwood (int): the defender's deadwood value, after layoffs
+    layoffs (int): the cards the defender laid off, as a bitmask
+"""
+
+NO_WINNER_RESULT = HandResult(HandOutcome.NO_WINNER, 0, 0, 0, 0)
+
+HandRecord = namedtuple('HandRecord', ['knocker', 'defender', 'discard'])
+HandRecord.__doc__ = """Everything needed to score a finished hand.
+
+Fields:
+    knocker (int): the knocker's 10 cards after discarding, as a bitmask
+        (0 if nobody knocked)
+    defender (int): the defender's 10 cards, as a bitmask
+    discard (int): index of the knocker's final discard (-1 if not known)
+"""
+
+def score_hand(knocker: int, defender: int, discard: int = -1,
+               rules: ScoringRules = DEFAULT_RULES) -> HandResult:
+    """Score a knock.
+
+    Args:
+        knocker (int): the knocker's cards after discarding, as a bitmask
+        defender (int): the defender's cards, as a bitmask
+        discard (int): [optional] index of the knocker's final discard; only
+            needed to recognize big gin
+        rules (ScoringRules): [optional] the rules to score by
+
+    The knocker's melds are the ones found by `meld_solver.optimal_melds()`.
+
+    Raises IllegalMoveError if the knocker has too much deadwood to knock.
+    """
+    (knocker_deadwood, knocker_melds) = optimal_melds(knocker)
+    if knocker_deadwood > rules.knock_limit:
+        raise IllegalMoveError("Can't knock with {} deadwood (the limit is {})".format(
+            knocker_deadwood, rules.knock_limit))
+    if knocker_deadwood == 0:
+        big_gin = discard >= 0 and optimal_melds(knocker | 1 << discard)[0] == 0
+        if rules.layoffs_on_gin:
+            (defender_deadwood, layoffs, _) = best_layoffs(defender, knocker_melds)
+        else:
+            (defender_deadwood, layoffs) = (optimal_melds(defender)[0], 0)
+        if big_gin:
+            return HandResult(HandOutcome.BIG_GIN, defender_deadwood + rules.big_gin_bonus,
+                              0, defender_deadwood, layoffs)
+        return HandResult(HandOutcome.GIN, defender_deadwood + rules.gin_bonus,
+                          0, defender_deadwood, layoffs)
+    (defender_deadwood, layoffs, _) = best_layoffs(defender, knocker_melds)
+    if defender_deadwood <= knocker_deadwood:
+        return HandResult(HandOutcome.UNDERCUT,
+                          -(knocker_deadwood - defender_deadwood + rules.undercut_bonus),
+                          knocker_deadwood, defender_deadwood, layoffs)
+    return HandResult(HandOutcome.KNOCK, defender_deadwood - knocker_deadwood,
+                      knocker_deadwood, defender_deadwood, layoffs)
+
+def _check_over(game: 'Game') -> None:
+    if not game.is_over:
+        raise PylgrumError("Can't score a game that is still in progress")
+
+def hand_record(game: 'Game') -> HandRecord:
+    """Return the HandRecord for a finished game.
+
+    Raises PylgrumError if the game isn't over.
+    """
+    _check_over(game)
+    if game.draw_pile_exhausted:
+        return HandRecord(0, 0, -1)
+    knocker = game.current_player
+    defender = game.player2 if knocker is game.player1 else game.player1
+    return HandRecord(cards_to_mask(knocker.hand.cards),
+                      cards_to_mask(defender.hand.cards),
+                      game.current_move.discarded.index)
+
+def _score_record(record, rules: ScoringRules) -> HandResult:
+    (knocker, defender, discard) = record
+    if not knocker:
+        return NO_WINNER_RESULT
+    return score_hand(knocker, defender, discard, rules)
+
+def score_game(game: 'Game', rules: ScoringRules = DEFAULT_RULES) -> HandResult:
+    """Score a finished game.
+
+    Args:
+        game (Game): a game in which a player has knocked, or the draw pile
+            has run out
+        rules (ScoringRules): [optional] the rules to score by
+
+    Raises PylgrumError if the game isn't over, and IllegalMoveError if the
+    knock wasn't legal.
+    """
+    return _score_record(hand_record(game), rules)
+
+def _score_chunk(args: tuple) -> list:
+    (records, rules) = args
+    return [_score_record(record, rules) for record in records]
+
+def score_hands(records, rules: ScoringRules = DEFAULT_RULES,
+                workers: int = 1, chunk_size: int = 4096) -> list:
+    """Score many finished hands, e.g. to rebuild standings from an archive.
+
+    Args:
+        records (iterable): HandRecords, or any (knocker, defender, discard)
+            sequences (such as HandRecords read back from JSON)
+        rules (ScoringRules): [optional] the rules to score by
+        workers (int): [optional] number of processes to score in; None
+            means one per CPU. With 1, hands are scored in this process.
+        chunk_size (int): [optional] records sent to a worker at a time
+
+    Returns a list of HandResults, in the order of records. Each worker
+    scores its records with one warm meld-search cache, so large batches
+    are much cheaper per hand than scoring hands one at a time.
+
+    Raises IllegalMoveError if any record has an illegal knock.
+    """
+    records = list(records)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(records) <= chunk_size:
+        return _score_chunk((records, rules))
+    chunks = [(records[start:start + chunk_size], rules)
+              for start in range(0, len(records), chunk_size)]
+    import multiprocessing # pylint: disable=import-outside-toplevel
+    with multiprocessing.Pool(workers) as pool:
+        return [result for chunk in pool.map(_score_chunk, chunks) for result in chunk]
+
+MatchResult = namedtuple('MatchResult', ['winner', 'totals', 'final', 'hands'])
+MatchResult.__doc__ = """The result of a match.
+
+Fields:
+    winner (Player): the player who reached the target first
+    totals (dict): Player -> points won in hands
+    final (dict): Player -> final score, including the end-of-match bonuses
+    hands (list): (Game, HandResult) for every hand played
+"""
+
+class Match():
+    """A series of hands between two players, played until one wins.
+
+    The first hand is started by player1. After that, the loser of each hand
+    starts the next one (the winner "deals"); if the draw pile runs out, the
+    same player starts again.
+
+    Attributes:
+        player1 (Player): the player who starts the first hand
+        player2 (Player): their opponent
+        rules (ScoringRules): the rules the match is scored by
+        totals (dict): Player -> points won so far
+        hands (list): (Game, HandResult) for every hand played so far
+    """
+
+    def __init__(self, player1: 'Player', player2: 'Player',
+                 rules: ScoringRules = DEFAULT_RULES, game_type: type = None) -> None:
+        """Create a match between two players.
+
+        Args:
+            player1 (Player): the player who starts the first hand
+            player2 (Player): their opponent
+            rules (ScoringRules): [optional] the rules to score by
+            game_type (type): [optional] the Game (sub-)class to play each
+                hand with (by default, Game); it's created as
+                `game_type(first, second)`
+        """
+        if game_type is None:
+            from pylgrum.game import Game # pylint: disable=import-outside-toplevel
+            game_type = Game
+        self.player1 = player1
+        self.player2 = player2
+        self.rules = rules
+        self._game_type = game_type
+        self.totals = {player1: 0, player2: 0}
+        self.hands = []
+        self._first = player1
+
+    @property
+    def winner(self):
+        """The player who has reached the target, or None."""
+        for player in (self.player1, self.player2):
+            if self.totals[player] >= self.rules.match_target:
+                return player
+        return None
+
+    def play_hand(self) -> HandResult:
+        """Deal and play one hand, and add its score to the totals."""
+        first = self._first
+        second = self.player2 if first is self.player1 else self.player1
+        first.reset_hand()
+        second.reset_hand()
+        game = self._game_type(first, second)
+        game.play()
+        result = score_game(game, self.rules)
+        self.hands.append((game, result))
+        if result.outcome != HandOutcome.NO_WINNER:
+            knocker = game.current_player
+            defender = second if knocker is first else first
+            (hand_winner, hand_loser) = ((knocker, defender) if result.points > 0
+                                         else (defender, knocker))
+            self.totals[hand_winner] += abs(result.points)
+            self._first = hand_loser
+        return result
+
+    def _hands_won(self, player: 'Player') -> int:
+        won = 0
+        for (game, result) in self.hands:
+            if result.outcome != HandOutcome.NO_WINNER:
+                knocker_won = result.points > 0
+                won += (game.current_player is player) == knocker_won
+        return won
+
+    def play(self) -> MatchResult:
+        """Play hands until a player reaches the target; return the result."""
+        while self.winner is None:
+            self.play_hand()
+        winner = self.winner
+        loser = self.player2 if winner is self.player1 else self.player1
+        final = {}
+        for player in (winner, loser):
+            final[player] = (self.totals[player]
+                             + self.rules.box_bonus * self._hands_won(player))
+        final[winner] += self.rules.game_bonus
+        if self._hands_won(loser) == 0:
+            final[winner] *= self.rules.shutout_multiplier
+        return MatchResult(winner, dict(self.totals), final, list(self.hands))
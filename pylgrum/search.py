@@ -0,0 +1,328 @@
+"""Information-set search for machine players.
+
+A player can't see its opponent's hand or the draw pile, so the search
+samples them: each "world" deals the cards the player hasn't seen at random
+between the opponent's hand and the draw pile, consistent with what the
+player does know. Each candidate action is tried in the same worlds, and the
+rest of the game is rolled out with the greedy policy of GreedyPlayer. The
+action with the best average outcome wins.
+
+The search is anytime. It works in passes: each pass rolls out further than
+the one before (iterative deepening), samples twice as many worlds, and
+considers only the better half of the actions from the pass before. When
+the time budget runs out, the decision is taken from the last pass that was
+completed. So a short budget gives a quick, shallow answer and a longer one
+gives a better-informed answer.
+
+Everything here is a pure function of a SearchState (a tuple of ints) and a
+random number generator, so searches can be run in other processes.
+
+Classes:
+
+    SearchState: what a player knows, in bitmask form
+
+Functions:
+
+    start_actions / finish_actions: the legal actions at each half of a turn
+    sample_world: deal the unseen cards at random
+    search: choose the best action within a time budget
+"""
+
+from collections import namedtuple
+import math
+import random
+import time
+
+from pylgrum.game import Game
+from pylgrum.move import CardSource
+from pylgrum.meld_solver import CARD_POINTS, best_discard, deadwood_value
+
+KNOCK_LIMIT = 10
+"""The most deadwood a player may hold when knocking."""
+
+GIN_BONUS = 25
+UNDERCUT_BONUS = 25
+
+HORIZONS = (1, 2, 4, 8, 16, 32)
+"""Rollout lengths (in turns) of successive search passes; 32 turns is
+longer than any game can last, so the last horizon plays games out."""
+
+CONFIDENCE = 2.0
+"""Standard errors by which an action must beat the default to replace it."""
+
+ALL_CARDS = (1 << 52) - 1
+
+SearchState = namedtuple('SearchState', [
+    'hand', 'top', 'seen', 'opponent_known', 'draw_pile_size'
+])
+SearchState.__doc__ = """What the searching player knows, as bitmasks of card indices.
+
+Fields:
+    hand (int): the player's own cards
+    top (int): index of the card showing on the discard pile, or -1 if it
+        can't be taken (e.g. the player has already taken it)
+    seen (int): other cards known to be out of play (the rest of the
+        discard pile)
+    opponent_known (int): cards known to be in the opponent's hand (ones they
+        took from the discard pile and haven't discarded again)
+    draw_pile_size (int): number of cards left in the draw pile
+"""
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+def start_actions(state: SearchState) -> list:
+    """Return the ways a player can start their turn: draw or take the discard.
+
+    Actions are CardSource values, with GreedyPlayer's choice first.
+    """
+    if state.top < 0:
+        return [CardSource.DRAW_STACK]
+    top_bit = 1 << state.top
+    (deadwood, _) = best_discard(state.hand | top_bit, keep=top_bit)
+    if deadwood < deadwood_value(state.hand):
+        return [CardSource.DISCARD_STACK, CardSource.DRAW_STACK]
+    return [CardSource.DRAW_STACK, CardSource.DISCARD_STACK]
+
+def finish_actions(hand: int, keep: int = 0, danger: list = None) -> list:
+    """Return the ways a player holding hand (11 cards) can end their turn.
+
+    Each action is a tuple of (index of card to discard, knock?). Knocking
+    is only offered where it is allowed. Actions are in the order GreedyPlayer
+    would prefer them; given a danger table, discards that leave the same
+    deadwood are ordered safest first.
+
+    Args:
+        hand (int): the player's cards
+        keep (int): [optional] bitmask of cards that may not be discarded
+        danger (list): [optional] danger of discarding each card, by index
+            (see `pylgrum.danger.DangerTable.table()`)
+    """
+    actions = []
+    discardable = hand & ~keep
+    while discardable:
+        low_bit = discardable & -discardable
+        discardable ^= low_bit
+        index = low_bit.bit_length() - 1
+        deadwood = deadwood_value(hand ^ low_bit)
+        risk = 0 if danger is None else danger[index]
+        if deadwood <= KNOCK_LIMIT:
+            actions.append(((deadwood, risk, -CARD_POINTS[index], False), (index, True)))
+        actions.append(((deadwood, risk, -CARD_POINTS[index], True), (index, False)))
+    return [action for (_, action) in sorted(actions)]
+
+def sample_world(state: SearchState, rng: random.Random) -> tuple:
+    """Deal the cards the player hasn't seen, at random.
+
+    Returns (opponent's hand as a bitmask, draw pile as a list of card
+    indices with the top card last).
+    """
+    top_bit = 0 if state.top < 0 else 1 << state.top
+    unseen = ALL_CARDS & ~(state.hand | state.seen | state.opponent_known | top_bit)
+    unseen_cards = [index for index in range(52) if unseen >> index & 1]
+    rng.shuffle(unseen_cards)
+    dealt = 10 - _popcount(state.opponent_known)
+    opponent = state.opponent_known
+    for index in unseen_cards[:dealt]:
+        opponent |= 1 << index
+    return (opponent, unseen_cards[dealt:dealt + state.draw_pile_size])
+
+def knock_value(knocker: int, defender: int) -> int:
+    """Points won by the knocker (negative if they are undercut).
+
+    Layoffs are not taken into account.
+    """
+    knocker_deadwood = deadwood_value(knocker)
+    defender_deadwood = deadwood_value(defender)
+    if knocker_deadwood == 0:
+        return defender_deadwood + GIN_BONUS
+    if knocker_deadwood < defender_deadwood:
+        return defender_deadwood - knocker_deadwood
+    return -(knocker_deadwood - defender_deadwood + UNDERCUT_BONUS)
+
+def greedy_turn(hand: int, top: int, pile: list, knock_limit: int) -> tuple:
+    """Play one turn as GreedyPlayer would.
+
+    Args:
+        hand (int): the 10 cards held at the start of the turn
+        top (int): index of the card showing on the discard pile, or -1
+        pile (list): the draw pile, top card last; drawn from in place
+        knock_limit (int): knock when deadwood is at or below this
+
+    Returns (hand after the turn, index of the discard, knocked?).
+    """
+    if top >= 0:
+        top_bit = 1 << top
+        (deadwood, discard) = best_discard(hand | top_bit, keep=top_bit)
+        if deadwood < deadwood_value(hand):
+            return (hand ^ top_bit ^ (1 << discard), discard, deadwood <= knock_limit)
+    hand |= 1 << pile.pop()
+    (deadwood, discard) = best_discard(hand)
+    return (hand ^ (1 << discard), discard, deadwood <= knock_limit)
+
+def rollout(hands: list, mover: int, top: int, pile: list,
+            horizon: int, knock_limit: int) -> tuple:
+    """Play greedy turns until the game ends or horizon turns have passed.
+
+    Args:
+        hands (list): the two hands; hands[0] is the searching player's.
+            Updated in place.
+        mover (int): 0 or 1, whose turn it is
+        top (int): index of the card showing on the discard pile
+        pile (list): the draw pile, top card last; drawn from in place
+        horizon (int): maximum number of turns to play
+        knock_limit (int): see greedy_turn()
+
+    Returns (value for hands[0], turns played). If the game has not ended
+    at the horizon, the value is the difference in deadwood.
+    """
+    turns = 0
+    while turns < horizon:
+        (hands[mover], top, knocked) = greedy_turn(hands[mover], top, pile, knock_limit)
+        turns += 1
+        if knocked:
+            value = knock_value(hands[mover], hands[1 - mover])
+            return (value if mover == 0 else -value, turns)
+        if len(pile) <= Game.DRAW_PILE_MINIMUM:
+            return (0, turns)
+        mover = 1 - mover
+    return (deadwood_value(hands[1]) - deadwood_value(hands[0]), turns)
+
+def _evaluate(state: SearchState, action, world: tuple,
+              horizon: int, knock_limit: int) -> tuple:
+    """Value (for the searching player) of taking action in world.
+
+    Returns (value, turns played).
+    """
+    (opponent, pile) = world
+    pile = list(pile)
+    if action == CardSource.DISCARD_STACK:
+        # the first half of a turn: finish it greedily
+        top_bit = 1 << state.top
+        (deadwood, discard) = best_discard(state.hand | top_bit, keep=top_bit)
+        hand = state.hand ^ top_bit ^ (1 << discard)
+        knocked = deadwood <= knock_limit
+    elif action == CardSource.DRAW_STACK:
+        (hand, discard, knocked) = greedy_turn(state.hand, -1, pile, knock_limit)
+    else:
+        (discard, knocked) = action
+        hand = state.hand ^ (1 << discard)
+    if knocked:
+        return (knock_value(hand, opponent), 1)
+    if len(pile) <= Game.DRAW_PILE_MINIMUM:
+        return (0, 1)
+    (value, turns) = rollout([hand, opponent], 1, discard, pile, horizon - 1, knock_limit)
+    return (value, turns + 1)
+
+def _next_candidates(actions: list, sums: list, squares: list, worlds: int) -> list:
+    """Choose the actions for the next pass, best first.
+
+    Args:
+        actions (list): this pass's actions; actions[0] is the current choice
+        sums (list): total advantage of each action over actions[0]
+        squares (list): total squared advantage of each action
+        worlds (int): number of worlds each action was evaluated in
+
+    Another action replaces actions[0] only if its advantage is more than
+    CONFIDENCE standard errors above zero. The better half are kept.
+    """
+    means = [total / worlds for total in sums]
+    best = 0
+    for i in range(1, len(actions)):
+        variance = max(squares[i] / worlds - means[i] ** 2, 0) * worlds / max(worlds - 1, 1)
+        if (means[i] > CONFIDENCE * math.sqrt(variance / worlds)
+                and means[i] > means[best]):
+            best = i
+    rest = sorted((i for i in range(len(actions)) if i != best), key=lambda i: -means[i])
+    keep = max(2, (len(actions) + 1) // 2)
+    return [actions[best]] + [actions[i] for i in rest[:keep - 1]]
+
+def search(state: SearchState, actions: list, budget: float = 0.05,
+           knock_limit: int = KNOCK_LIMIT, rng: random.Random = None,
+           samples_per_pass: int = 4, max_samples: int = None) -> tuple:
+    """Choose the best of actions within a time budget.
+
+    Args:
+        state (SearchState): what the searching player knows
+        actions (list): candidate actions, from start_actions() or
+            finish_actions(); the first is played unless search finds
+            a better one
+        budget (float): [optional] seconds to search for
+        knock_limit (int): [optional] knock limit for the rollout policy
+        rng (random.Random): [optional] source of randomness
+        samples_per_pass (int): [optional] worlds sampled in the first pass
+        max_samples (int): [optional] stop after this many worlds, even if
+            there is time left
+
+    The first pass is always completed, however small the budget.
+
+    Returns (best action, statistics dict). The statistics are:
+        samples: number of worlds sampled
+        nodes: number of turns simulated
+        depth: rollout horizon of the last completed pass (0 if there was
+            nothing to decide)
+        seconds: time spent searching
+        nodes_per_second: nodes / seconds
+        visits: for each of actions (in order), the number of worlds it was
+            evaluated in, over the completed passes
+        values: for each of actions, the total of its values in those worlds
+    """
+    if rng is None:
+        rng = random.Random()
+    start = time.perf_counter()
+    deadline = start + budget
+    depth = 0
+    samples = 0
+    nodes = 0
+    pass_number = 0
+    visits = [0] * len(actions)
+    value_sums = [0] * len(actions)
+    candidates = list(range(len(actions))) # indices into actions, best first
+    while len(candidates) > 1:
+        horizon = HORIZONS[min(pass_number, len(HORIZONS) - 1)]
+        worlds = samples_per_pass << pass_number
+        # sums and sums of squares of each candidate's advantage over the first,
+        #  and totals of its values
+        sums = [0] * len(candidates)
+        squares = [0] * len(candidates)
+        totals = [0] * len(candidates)
+        completed = True
+        for _ in range(worlds):
+            if max_samples is not None and samples >= max_samples:
+                completed = False
+                break
+            world = sample_world(state, rng)
+            samples += 1
+            values = []
+            for index in candidates:
+                if pass_number and time.perf_counter() >= deadline:
+                    completed = False
+                    break
+                (value, turns) = _evaluate(state, actions[index], world, horizon, knock_limit)
+                values.append(value)
+                nodes += turns
+            if not completed:
+                break
+            for (i, value) in enumerate(values):
+                sums[i] += value - values[0]
+                squares[i] += (value - values[0]) ** 2
+                totals[i] += value
+        if not completed:
+            break
+        for (i, index) in enumerate(candidates):
+            visits[index] += worlds
+            value_sums[index] += totals[i]
+        candidates = _next_candidates(candidates, sums, squares, worlds)
+        depth = horizon
+        pass_number += 1
+
+    seconds = time.perf_counter() - start
+    return (actions[candidates[0]], {
+        "samples": samples,
+        "nodes": nodes,
+        "depth": depth,
+        "seconds": seconds,
+        "nodes_per_second": nodes / seconds if seconds else 0.0,
+        "visits": visits,
+        "values": value_sums,
+    })
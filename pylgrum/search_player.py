@@ -0,0 +1,125 @@
+"""A machine player that searches for its moves within a time budget."""
+
+import random
+
+from pylgrum.card import Card
+from pylgrum.game import Game
+from pylgrum.danger import DangerTable
+from pylgrum.knowledge import KnowledgeTracker
+from pylgrum.move import Move, CardSource
+from pylgrum.parallel_search import SearchPool
+from pylgrum.player import Player
+from pylgrum.search import SearchState, finish_actions, search, start_actions
+
+class SearchPlayer(Player):
+    """Machine player that picks moves by information-set search.
+
+    At each decision the player samples possible opponent hands and draw
+    piles, tries each of its options in them and plays the rest of the game
+    out greedily (see `pylgrum.search`), for up to `budget` seconds. It plays
+    the move GreedyPlayer would unless the search finds, with confidence,
+    a better one - so a longer budget makes for a stronger player.
+
+    The player learns which cards are unseen from a KnowledgeTracker
+    watching the game it joins.
+
+    Given a SearchPool, the player searches in the pool's worker processes,
+    sampling as many worlds as all of them can within the budget (see
+    `pylgrum.parallel_search`).
+
+    Attributes:
+        budget (float): seconds to spend on each decision
+        knock_limit (int): knock limit used by the rollout policy
+        last_stats (dict): search statistics for the most recent decision
+            (see `pylgrum.search.search()`)
+        knowledge (KnowledgeTracker): what the player knows about the cards
+        danger (DangerTable): how risky each discard is; among discards that
+            leave equal deadwood, the search starts from the safest
+    """
+
+    def __init__(self, contestant_id: str = None, budget: float = 0.05,
+                 knock_limit: int = 10, seed: int = None,
+                 pool: SearchPool = None) -> None:
+        """Create a SearchPlayer.
+
+        Args:
+            contestant_id (str): [optional] see Player
+            budget (float): [optional] seconds to spend on each decision
+            knock_limit (int): [optional] knock limit for simulated players
+            seed (int): [optional] seed for the player's sampling (unless
+                searching in a pool, which has its own seed)
+            pool (SearchPool): [optional] worker processes to search in
+        """
+        super().__init__(contestant_id=contestant_id)
+        self.budget = budget
+        self.knock_limit = knock_limit
+        self.last_stats = None
+        self._rng = random.Random(seed)
+        self._pool = pool
+        self.knowledge = KnowledgeTracker(self)
+        self.danger = DangerTable(self.knowledge)
+
+    def join_game(self, game: Game) -> None:
+        """Join player to a game, and start tracking what it reveals."""
+        super().join_game(game)
+        self.knowledge.watch(game)
+
+    def _state(self, top: int) -> SearchState:
+        """What this player knows, for a search.
+
+        Args:
+            top (int): index of the discard that may be taken, or -1
+        """
+        known = self.knowledge
+        seen = known.discard_pile
+        if top >= 0:
+            seen &= ~(1 << top)
+        return SearchState(
+            hand=known.own,
+            top=top,
+            seen=seen,
+            opponent_known=known.opponent_known,
+            draw_pile_size=known.draw_pile_size,
+        )
+
+    def _search(self, state: SearchState, actions: list):
+        if self._pool is not None:
+            (action, self.last_stats) = self._pool.search(
+                state, actions,
+                budget=self.budget,
+                knock_limit=self.knock_limit
+            )
+            return action
+        (action, self.last_stats) = search(
+            state, actions,
+            budget=self.budget,
+            knock_limit=self.knock_limit,
+            rng=self._rng
+        )
+        return action
+
+    def turn_start(self, move: Move) -> None:
+        """Search for whether to take the discard or draw.
+
+        This implements the abstract base method (hook).
+        """
+        self.knowledge.start()
+        state = self._state(move.available_discard.index)
+        action = self._search(state, start_actions(state))
+        if action == CardSource.DISCARD_STACK:
+            move.choose_card_from_discard()
+        else:
+            move.choose_card_from_draw()
+
+    def turn_finish(self, move: Move) -> None:
+        """Search for the best discard, and whether to knock.
+
+        This implements the abstract base method (hook).
+        """
+        keep = 0
+        if move.card_source == CardSource.DISCARD_STACK:
+            keep = 1 << move.acquired.index # can't throw back what was taken
+        state = self._state(-1)
+        (discard, knock) = self._search(state, finish_actions(state.hand, keep, self.danger.table()))
+        move.knocking = knock
+        move.discard(Card.from_index(discard))
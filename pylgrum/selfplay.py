@@ -0,0 +1,270 @@
+"""Generate training data from self-play games.
+
+Usage:
+    python -m pylgrum.selfplay --out DIRECTORY [--games N] [--workers W]
+                               [--rows-per-shard R] [--seed SEED]
+
+Worker processes play games between GreedyPlayers and record every decision
+either player makes as one fixed-width row of int16 values:
+
+    columns   0-51   the deciding player's hand (1 if held, else 0)
+    columns  52-103  the discard pile
+    columns 104-155  cards the opponent is known to hold (their pickups)
+    column  156      index of the discard that may be taken, or -1
+    column  157      number of moves completed before this one
+    column  158      PHASE_START (draw or take) or PHASE_FINISH (discard)
+    column  159      the action: for PHASE_START, 0 to draw or 1 to take
+                     the discard; for PHASE_FINISH, the index of the card
+                     discarded, plus 52 if the player knocked
+    column  160      the outcome: points won by the deciding player (negative
+                     if lost; 0 if the draw pile ran out), without layoffs
+
+Rows are streamed to `.npy` files ("shards") that numpy can load or
+memory-map (`numpy.load(path, mmap_mode='r')` gives a (rows, 161) array).
+Each worker writes its own shards, starting a new one every R rows and
+buffering only a limited number of rows in memory, so datasets of any size
+can be generated. numpy itself is not needed to write them.
+"""
+
+import argparse
+import array
+import ast
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.knowledge import KnowledgeTracker
+from pylgrum.move import CardSource
+from pylgrum.search import knock_value
+
+ROW_WIDTH = 161
+PHASE_START = 0
+PHASE_FINISH = 1
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128
+"""Bytes before the data in each shard; fixed, so the row count in the header
+can be rewritten in place as rows are added."""
+
+def _npy_header(rows: int) -> bytes:
+    """Return the .npy (format version 1.0) header for a shard of rows."""
+    header = "{{'descr': '<i2', 'fortran_order': False, 'shape': ({}, {}), }}".format(
+        rows, ROW_WIDTH)
+    header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + "\n"
+    return NPY_MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+def read_shard(path: str) -> tuple:
+    """Read a shard without numpy; return (shape, array of int16 values).
+
+    Reads the whole file, so is meant for tests and small shards; use
+    numpy.load() for real work.
+    """
+    with open(path, "rb") as shard:
+        if shard.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError("{} is not a version 1.0 .npy file".format(path))
+        header_len = int.from_bytes(shard.read(2), "little")
+        header = ast.literal_eval(shard.read(header_len).decode("latin1"))
+        values = array.array("h")
+        values.frombytes(shard.read())
+    if sys.byteorder != "little":
+        values.byteswap()
+    return (header["shape"], values)
+
+class ShardWriter():
+    """Streams rows to a series of .npy shard files.
+
+    Attributes:
+        paths (list): the shards written (or being written) so far
+        rows (int): total rows written
+    """
+
+    def __init__(self, directory: str, prefix: str = "shard",
+                 rows_per_shard: int = 1 << 20, buffer_rows: int = 4096) -> None:
+        """Create a writer; shards are named <prefix>-<number>.npy.
+
+        Args:
+            directory (str): where to write shards (must exist)
+            prefix (str): [optional] shard file name prefix
+            rows_per_shard (int): [optional] start a new shard after this many
+            buffer_rows (int): [optional] rows held in memory between writes
+        """
+        self._directory = directory
+        self._prefix = prefix
+        self._rows_per_shard = rows_per_shard
+        self._buffer_rows = buffer_rows
+        self._buffer = array.array("h")
+        self._file = None
+        self._shard_rows = 0
+        self.paths = []
+        self.rows = 0
+
+    def _open_shard(self) -> None:
+        path = os.path.join(self._directory, "{}-{:05d}.npy".format(
+            self._prefix, len(self.paths)))
+        self._file = open(path, "wb")
+        self._file.write(_npy_header(0))
+        self._shard_rows = 0
+        self.paths.append(path)
+
+    def _flush(self) -> None:
+        """Write buffered rows to the current shard, and fix its header."""
+        if not self._buffer:
+            return
+        if sys.byteorder != "little":
+            self._buffer.byteswap()
+        self._buffer.tofile(self._file)
+        self._buffer = array.array("h")
+        self._file.seek(0)
+        self._file.write(_npy_header(self._shard_rows))
+        self._file.seek(0, os.SEEK_END)
+
+    def write(self, row: list) -> None:
+        """Add one row (ROW_WIDTH ints)."""
+        if self._file is None or self._shard_rows == self._rows_per_shard:
+            self.close()
+            self._open_shard()
+        self._buffer.extend(row)
+        self._shard_rows += 1
+        self.rows += 1
+        if len(self._buffer) >= self._buffer_rows * ROW_WIDTH:
+            self._flush()
+
+    def close(self) -> None:
+        """Finish the current shard."""
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+def _bits(mask: int) -> list:
+    return [mask >> index & 1 for index in range(52)]
+
+class RecordingPlayer(GreedyPlayer):
+    """A GreedyPlayer that records each decision it makes as a row.
+
+    Rows are kept until the game ends (when the outcome is known); see
+    `finish_game()`.
+    """
+
+    def __init__(self, contestant_id: str = None) -> None:
+        super().__init__(contestant_id=contestant_id)
+        self.knowledge = KnowledgeTracker(self)
+        self.rows = []
+
+    def join_game(self, game: Game) -> None:
+        """Join player to a game, and start tracking what it reveals."""
+        super().join_game(game)
+        self.knowledge.watch(game)
+        self.rows = []
+
+    def _record(self, phase: int, top: int, action: int) -> None:
+        known = self.knowledge
+        self.rows.append(
+            _bits(known.own) + _bits(known.discard_pile) + _bits(known.opponent_known)
+            + [top, self.game.num_moves, phase, action]
+        )
+
+    def turn_start(self, move) -> None:
+        self.knowledge.start()
+        super().turn_start(move)
+        self._record(PHASE_START, move.available_discard.index,
+                     int(move.card_source == CardSource.DISCARD_STACK))
+
+    def turn_finish(self, move) -> None:
+        super().turn_finish(move)
+        self._record(PHASE_FINISH, -1, move.discarded.index + 52 * move.knocking)
+
+    def finish_game(self, outcome: int) -> list:
+        """Return the game's rows, completed with the outcome for this player."""
+        rows = self.rows
+        for row in rows:
+            row.append(outcome)
+        self.rows = []
+        return rows
+
+def play_game(writer: ShardWriter) -> int:
+    """Play one self-play game, writing its decisions; return the row count."""
+    player1 = RecordingPlayer()
+    player2 = RecordingPlayer()
+    game = Game(player1, player2)
+    game.play()
+    value = 0
+    if not game.draw_pile_exhausted:
+        knocker = game.current_player
+        defender = player2 if knocker is player1 else player1
+        value = knock_value(knocker.knowledge.own, defender.knowledge.own)
+        if knocker is player2:
+            value = -value
+    rows = player1.finish_game(value) + player2.finish_game(-value)
+    for row in rows:
+        writer.write(row)
+    return len(rows)
+
+def _worker(args: tuple) -> dict:
+    """Play games in a worker process; return a summary of what was written."""
+    (directory, worker, games, rows_per_shard, seed) = args
+    random.seed(seed)
+    writer = ShardWriter(directory, "shard-{:03d}".format(worker), rows_per_shard)
+    try:
+        for _ in range(games):
+            play_game(writer)
+    finally:
+        writer.close()
+    return {"paths": writer.paths, "rows": writer.rows}
+
+def generate(directory: str, games: int, workers: int = None,
+             rows_per_shard: int = 1 << 20, seed: int = None) -> dict:
+    """Play self-play games across worker processes, writing shards.
+
+    Args:
+        directory (str): where to write shards (created if necessary)
+        games (int): number of games to play in total
+        workers (int): [optional] number of processes; defaults to the
+            number of CPUs. With 1, games are played in this process.
+        rows_per_shard (int): [optional] rows per shard file
+        seed (int): [optional] seed for reproducible games
+
+    Returns a summary: shard paths, rows and games written, and timings.
+    """
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    seeds = random.Random(seed)
+    jobs = [
+        (directory, worker, games // workers + (worker < games % workers),
+         rows_per_shard, seeds.getrandbits(64))
+        for worker in range(workers)
+    ]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_worker(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_worker, jobs)
+    elapsed = time.perf_counter() - start
+    rows = sum(result["rows"] for result in results)
+    return {
+        "games": games,
+        "rows": rows,
+        "shards": [path for result in results for path in result["paths"]],
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--out", required=True, help="directory for shards")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rows-per-shard", type=int, default=1 << 20)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    print(json.dumps(generate(args.out, args.games, args.workers,
+                              args.rows_per_shard, args.seed), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,46 @@
 Some methods in this subpackage return JSON, in order to simplify wrapping a server in
 a networked API.
 
+Modules beyond the classes below:
+
+    api: HTTP API (Flask) for a GameManager - see create_app()
+    loadgen: load generator that drives the HTTP API and reports latencies
+    persistence: write-ahead log and snapshots for a durable GameManager
+
 Classes:
 
     Contestant: a person or other agent who might play games
     GameManager: coordinates multiple contestants and games
-"""
\ No newline at end of file
+    GameChangeFeed: lets clients wait for a game to change instead of polling
+    ShardedGameManager: spreads games across worker processes by game ID
+
+These classes and modules are imported when first used (on python >=3.7;
+see PEP 562), so `import pylgrum.server` costs nothing, and the Flask API
+is only imported - and Flask only needed - when `pylgrum.server.api` is used.
+"""
+
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "Contestant": "pylgrum.server.contestant",
+    "GameManager": "pylgrum.server.game_manager",
+    "GameChangeFeed": "pylgrum.server.change_feed",
+    "ShardedGameManager": "pylgrum.server.sharding",
+}
+"""Class name -> the module it is imported from on first access."""
+
+_LAZY_SUBMODULES = frozenset((
+    "api", "change_feed", "contestant", "errors", "game_manager", "loadgen",
+    "persistence", "sharding",
+))
+
+def __getattr__(name: str):
+    """Import a class or module on first access (PEP 562)."""
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
@@ -0,0 +1,133 @@
+"""HTTP API for a GameManager, built with Flask.
+
+Endpoints (request and response bodies are JSON):
+
+    GET  /metrics                        call counts and latencies (Prometheus format)
+    GET  /contestants                    list registered contestants
+    POST /contestants                    register one: {"name": ...}
+    POST /games                          start a game:
+                                           {"challenger_id": ..., "opponent_id": ...}
+    GET  /games/<game_id>/status         status for ?contestant_id=...
+                                           add &after_version=N&timeout=S to
+                                           wait for a change (long-poll)
+    POST /games/<game_id>/acquire        {"contestant_id": ..., "source": "draw"|"discard"}
+    POST /games/<game_id>/discard        {"contestant_id": ..., "suit": ...,
+                                           "card": ..., "knock": false}
+
+Game status responses have the form `{"version": N, "status": {...}}`, where
+status is as described in `pylgrum.game.Game.status_for()`. A long-poll that
+times out with no change returns 204 (No Content).
+
+Errors are returned as `{"error": "<message>"}` with status 400 (malformed
+request), 404 (unknown game or contestant) or 409 (move not allowed now, or
+an ID already in use).
+"""
+
+import json
+
+from flask import Flask, Response, jsonify, request
+
+from pylgrum.errors import IllegalMoveError
+from pylgrum.server.game_manager import GameManager
+from pylgrum.server.errors import (ContestantAlreadyPlaying, DuplicateContestant,
+                                   DuplicateGame, InvalidContestant, InvalidGame,
+                                   InvalidRequest)
+
+MAX_LONG_POLL = 30.0 # seconds
+
+def _error_response(status: int):
+    def handler(err):
+        message = getattr(err, 'message', None) or (err.args[0] if err.args else None)
+        return (jsonify({"error": message or type(err).__name__}), status)
+    return handler
+
+def _param(body: dict, name: str):
+    """Return a required parameter from a request body."""
+    try:
+        return body[name]
+    except (KeyError, TypeError):
+        raise InvalidRequest("Missing parameter {}".format(name))
+
+def create_app(manager: GameManager = None) -> Flask:
+    """Create a Flask application serving the given GameManager.
+
+    Args:
+        manager (GameManager): [optional] the manager to serve; a new one is
+            created if not given
+    """
+    app = Flask(__name__)
+    app.config['GAME_MANAGER'] = manager if manager is not None else GameManager()
+
+    app.register_error_handler(InvalidRequest, _error_response(400))
+    app.register_error_handler(InvalidGame, _error_response(404))
+    app.register_error_handler(InvalidContestant, _error_response(404))
+    app.register_error_handler(IllegalMoveError, _error_response(409))
+    app.register_error_handler(ContestantAlreadyPlaying, _error_response(409))
+    app.register_error_handler(DuplicateContestant, _error_response(409))
+    app.register_error_handler(DuplicateGame, _error_response(409))
+
+    def game_manager() -> GameManager:
+        return app.config['GAME_MANAGER']
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(game_manager().metrics_text(), mimetype="text/plain; version=0.0.4")
+
+    @app.route("/contestants", methods=["GET"])
+    def list_contestants():
+        return jsonify(game_manager().list_contestants())
+
+    @app.route("/contestants", methods=["POST"])
+    def add_contestant():
+        body = request.get_json(silent=True) or {}
+        contestant = game_manager().add_contestant(body.get("name"))
+        return Response(str(contestant), status=201, mimetype="application/json")
+
+    @app.route("/games", methods=["POST"])
+    def create_game():
+        body = request.get_json(silent=True)
+        return (jsonify(game_manager().create_game(
+            _param(body, "challenger_id"),
+            _param(body, "opponent_id")
+        )), 201)
+
+    @app.route("/games/<game_id>/status", methods=["GET"])
+    def game_status(game_id):
+        contestant_id = _param(request.args, "contestant_id")
+        try:
+            after_version = int(request.args.get("after_version", -1))
+            timeout = min(float(request.args.get("timeout", 0)), MAX_LONG_POLL)
+        except ValueError:
+            raise InvalidRequest("after_version and timeout must be numbers")
+        payload = game_manager().wait_for_change(
+            game_id, contestant_id, after_version, timeout)
+        if payload is None:
+            return Response(status=204)
+        return Response(payload, mimetype="application/json")
+
+    def status_response(status: dict):
+        version = status.pop("version")
+        return Response(json.dumps({"version": version, "status": status}),
+                        mimetype="application/json")
+
+    @app.route("/games/<game_id>/acquire", methods=["POST"])
+    def acquire_card(game_id):
+        body = request.get_json(silent=True)
+        return status_response(game_manager().acquire_card(
+            game_id,
+            _param(body, "contestant_id"),
+            _param(body, "source")
+        ))
+
+    @app.route("/games/<game_id>/discard", methods=["POST"])
+    def discard_card(game_id):
+        body = request.get_json(silent=True)
+        return status_response(game_manager().discard_card(
+            game_id,
+            _param(body, "contestant_id"),
+            _param(body, "suit"),
+            _param(body, "card"),
+            bool(body.get("knock", False))
+        ))
+
+    return app
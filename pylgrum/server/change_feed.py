@@ -0,0 +1,127 @@
+"""The GameChangeFeed class lets clients wait for game state changes.
+
+Rather than repeatedly polling for game status, a client can ask to be told
+about the next change after a version it has already seen. The feed listens
+to a Game's announcements (see `pylgrum.game.GameEvent`) and wakes any waiting
+clients when the game's version moves past theirs.
+
+Each Player in a game has its own view of that game (they can see their own
+hand, but not their opponent's), so serialized status is cached per view. All
+subscribers waiting on the same view at the same version share a single
+serialized payload.
+"""
+
+import json
+import threading
+import time
+
+from pylgrum.game import Game, GameEvent
+from pylgrum.server.errors import InvalidContestant
+
+class GameChangeFeed():
+    """Fans out state changes for one Game to any number of waiting clients.
+
+    Attributes:
+        lock (RLock): held while the feed reads game state. Callers that
+            modify the game from multiple threads should hold it too, so
+            that subscribers never see a half-applied move.
+    """
+
+    def __init__(self, game: Game) -> None:
+        """Create a feed and start listening to the given game.
+
+        Args:
+            game (Game): the game whose changes should be published
+        """
+        self.lock = threading.RLock()
+        self._changed = threading.Condition(self.lock)
+        self._game = game
+        self._last_event = None
+        self._payloads = {}  # contestant_id -> (version, serialized status)
+        game.add_listener(self._on_game_event)
+
+    @property
+    def version(self) -> int:
+        """The most recent version of the game."""
+        return self._game.version
+
+    @property
+    def last_event(self) -> GameEvent:
+        """The most recently announced GameEvent (None before any changes)."""
+        return self._last_event
+
+    def close(self) -> None:
+        """Stop listening to the game."""
+        self._game.remove_listener(self._on_game_event)
+
+    def _on_game_event(self, game: Game, event: GameEvent) -> None:
+        """Game listener: invalidate cached payloads and wake subscribers."""
+        with self._changed:
+            self._last_event = event
+            self._payloads = {}
+            self._changed.notify_all()
+
+    def payload_for(self, contestant_id: str) -> tuple:
+        """Return (version, serialized status) for one contestant's view.
+
+        Args:
+            contestant_id (str): UUID of one of the game's contestants
+
+        The payload is a JSON string with the game's version and the status
+        structure returned by `Game.status_for()`. It is computed once per
+        version and view, and shared by everyone who asks for it.
+
+        Raises InvalidContestant if the contestant isn't playing this game.
+        """
+        with self.lock:
+            cached = self._payloads.get(contestant_id)
+            if cached is not None:
+                return cached
+            player = self._player_for(contestant_id)
+            version = self._game.version
+            payload = json.dumps({
+                "version": version,
+                "status": self._game.status_for(player)
+            })
+            self._payloads[contestant_id] = (version, payload)
+            return (version, payload)
+
+    def wait_for_change(self,
+                        contestant_id: str,
+                        after_version: int,
+                        timeout: float = None) -> tuple:
+        """Block until the game's version is newer than after_version.
+
+        Args:
+            contestant_id (str): UUID of the contestant whose view is wanted
+            after_version (int): the last version the caller has seen
+            timeout (float): [optional] max seconds to wait (None waits forever)
+
+        Returns (version, serialized status) as soon as the game has moved on,
+        which may be immediately. Returns None if the timeout expires first.
+
+        Raises InvalidContestant if the contestant isn't playing this game.
+        """
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        with self._changed:
+            self._player_for(contestant_id)
+            while self._game.version <= after_version:
+                if timeout is None:
+                    self._changed.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._changed.wait(remaining)
+            return self.payload_for(contestant_id)
+
+    def _player_for(self, contestant_id: str):
+        """Return the game's Player for a contestant.
+
+        Raises InvalidContestant if the contestant isn't playing this game.
+        """
+        for player in (self._game.player1, self._game.player2):
+            if player.contestant_id == contestant_id:
+                return player
+        raise InvalidContestant("Contestant not playing in this game")
@@ -22,16 +22,17 @@ class Contestant():
     """A Contestant is an entity that might play games."""
     _DEFAULT_NAME = "Anon Y. Mouse"
 
-    def __init__(self, name=None):
+    def __init__(self, name=None, contestant_id=None):
         """Create and initialize a Contestant.
 
         Args:
             name (str): [optional] A display-appropriate identifier for the contestant
+            contestant_id (str): [optional] UUID to use instead of generating one
 
         If not defined or specified as None, name is initialized to _DEFAULT_NAME.
         """
         self.current_player = None
-        self.id = str(uuid.uuid4()) #pylint: disable=invalid-name
+        self.id = contestant_id if contestant_id else str(uuid.uuid4()) #pylint: disable=invalid-name
         self.name = name if name else Contestant._DEFAULT_NAME
 
     @property
@@ -6,6 +6,22 @@ class ContestantAlreadyPlaying(PylgrumError):
     """Raised when a Contestant tries to join a Game with one in progress."""
     pass
 
+class DuplicateContestant(PylgrumError):
+    """Raised when adding a Contestant with the ID of an existing one."""
+    pass
+
+class DuplicateGame(PylgrumError):
+    """Raised when creating a game with the ID of an existing one."""
+    pass
+
 class InvalidContestant(PylgrumError):
     """Raised for non-existant or invalid Contestants."""
-    pass
\ No newline at end of file
+    pass
+
+class InvalidGame(PylgrumError):
+    """Raised for non-existant games."""
+    pass
+
+class InvalidRequest(PylgrumError):
+    """Raised for API requests that are malformed or missing parameters."""
+    pass
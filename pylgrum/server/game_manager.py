@@ -2,10 +2,19 @@
 
 import uuid
 
+from pylgrum.card import Card, Rank, Suit
+from pylgrum.stack import CardStack
 from pylgrum.game import Game
+from pylgrum.meld_solver import cards_to_mask, deadwood_value
+from pylgrum.metrics import REGISTRY, instrumented
+from pylgrum.move import MoveState
+from pylgrum.scoring import DEFAULT_RULES
+from pylgrum.errors import CardNotFoundError, IllegalMoveError
+from pylgrum.server.change_feed import GameChangeFeed
 from pylgrum.server.contestant import Contestant
 
-from pylgrum.server.errors import InvalidContestant
+from pylgrum.server.errors import (DuplicateContestant, DuplicateGame, InvalidContestant,
+                                   InvalidGame)
 
 class GameManager():
     """A GameManager handles a pool of Contestants and a number of Games."""
@@ -14,7 +23,10 @@ class GameManager():
         """Initialize a new GameManger."""
         self.contestants = {}
         self.games = {}
+        self.feeds = {}
 
+    @instrumented("pylgrum_game_manager_list_contestants",
+                  "GameManager.list_contestants() latency")
     def list_contestants(self):
         """Return a list of JSON objects representing currently registered contestants."""
         return [
@@ -26,6 +38,17 @@ class GameManager():
             for c in self.contestants.values()
         ]
 
+    @staticmethod
+    def metrics_text(openmetrics: bool = False) -> str:
+        """Return recorded call counts and latencies in Prometheus text format.
+
+        Args:
+            openmetrics (bool): [optional] add the OpenMetrics "# EOF" trailer
+
+        Nothing is recorded unless `pylgrum.metrics.REGISTRY` is enabled.
+        """
+        return REGISTRY.exposition(openmetrics)
+
     def delete_contestants(self):
         """Clears the set of registered contestants.
 
@@ -33,28 +56,45 @@ class GameManager():
         """
         self.contestants = {}
 
-    def add_contestant(self, name=None):
+    @instrumented("pylgrum_game_manager_add_contestant",
+                  "GameManager.add_contestant() latency")
+    def add_contestant(self, name=None, contestant_id=None):
         """Create and return new contestant with given name.
 
         Args:
             name (str): [optional] name of the new contestant
+            contestant_id (str): [optional] UUID for the new contestant
 
         Note: uses default name from Contestant class if no name given.
+
+        Raises DuplicateContestant if contestant_id is already registered.
         """
-        new_contestant = Contestant(name)
+        if contestant_id is not None and contestant_id in self.contestants:
+            raise DuplicateContestant("Contestant {} already exists".format(contestant_id))
+        new_contestant = Contestant(name, contestant_id)
         self.contestants[new_contestant.id] = new_contestant
         return new_contestant
 
-    def create_game(self, challenger_id: str, opponent_id: str):
+    @instrumented("pylgrum_game_manager_create_game",
+                  "GameManager.create_game() latency")
+    def create_game(self,
+                    challenger_id: str,
+                    opponent_id: str,
+                    game_id: str = None,
+                    deck: CardStack = None):
         """Create a game between specified players.
 
         Args:
             challenger_id (str): UUID of player starting the game
             opponent_id (str): UUID of the other player
+            game_id (str): [optional] UUID for the new game
+            deck (CardStack): [optional] pre-arranged deck (see Game)
 
         Raises InvalidContestant unless both players are registered contestants who
-        are not already in a game.
+        are not already in a game, and DuplicateGame if game_id is already in use.
         """
+        if game_id and game_id in self.games:
+            raise DuplicateGame("Game {} already exists".format(game_id))
         if challenger_id not in self.contestants.keys():
             raise InvalidContestant("Invalid challenger")
         if opponent_id not in self.contestants.keys():
@@ -63,10 +103,11 @@ class GameManager():
         player1 = self.contestants[challenger_id]
         player2 = self.contestants[opponent_id]
 
-        new_game_id = str(uuid.uuid4())
-        new_game = Game(player1.join_game(), player2.join_game(), game_id=new_game_id)
+        new_game_id = game_id if game_id else str(uuid.uuid4())
+        new_game = Game(player1.join_game(), player2.join_game(), game_id=new_game_id, deck=deck)
 
         self.games[new_game_id] = new_game
+        self.feeds[new_game_id] = self._new_feed(new_game)
 
         return(
             {
@@ -74,3 +115,153 @@ class GameManager():
                 "id": new_game_id
             }
         )
+
+    def _new_feed(self, game: Game) -> GameChangeFeed:
+        """Return the change feed for a new game, before it is published."""
+        return GameChangeFeed(game)
+
+    def _game_and_player(self, game_id: str, contestant_id: str):
+        """Return the Game and the contestant's Player in it.
+
+        Raises InvalidGame for unknown games, and InvalidContestant if the
+        contestant isn't playing in the game.
+        """
+        try:
+            game = self.games[game_id]
+        except KeyError:
+            raise InvalidGame("No game with id {}".format(game_id))
+        for player in (game.player1, game.player2):
+            if player.contestant_id == contestant_id:
+                return (game, player)
+        raise InvalidContestant("Contestant not playing in this game")
+
+    def _current_player_game(self, game_id: str, contestant_id: str) -> Game:
+        """Return a game in which it is the given contestant's turn.
+
+        Raises IllegalMoveError if it isn't the contestant's turn or the game
+        is already over.
+        """
+        (game, player) = self._game_and_player(game_id, contestant_id)
+        if game.is_over:
+            raise IllegalMoveError("Game is over.")
+        if game.current_player is not player:
+            raise IllegalMoveError("Not this contestant's turn.")
+        return game
+
+    def status_for(self, game_id: str, contestant_id: str) -> dict:
+        """Return the status of a game as seen by one of its contestants.
+
+        Args:
+            game_id (str): UUID of the game
+            contestant_id (str): UUID of the contestant
+
+        The returned structure is that of `Game.status_for()`, plus the
+        game's current version (see wait_for_change()).
+        """
+        (game, player) = self._game_and_player(game_id, contestant_id)
+        with self.feeds[game_id].lock:
+            r_val = game.status_for(player)
+            r_val['version'] = game.version
+        return r_val
+
+    def wait_for_change(self,
+                        game_id: str,
+                        contestant_id: str,
+                        after_version: int,
+                        timeout: float = None) -> str:
+        """Wait for a game to change, then return its status as JSON.
+
+        Args:
+            game_id (str): UUID of the game
+            contestant_id (str): UUID of the contestant
+            after_version (int): the last game version the contestant has seen
+            timeout (float): [optional] max seconds to wait
+
+        Returns None if the timeout expired with no change. See
+        `GameChangeFeed.wait_for_change()`.
+        """
+        self._game_and_player(game_id, contestant_id)
+        result = self.feeds[game_id].wait_for_change(
+            contestant_id, after_version, timeout)
+        if result is None:
+            return None
+        return result[1]
+
+    def acquire_card(self, game_id: str, contestant_id: str, source: str) -> dict:
+        """Start the contestant's turn by taking a card.
+
+        Args:
+            game_id (str): UUID of the game
+            contestant_id (str): UUID of the contestant whose turn it is
+            source (str): "draw" for the draw pile, "discard" for the discard
+
+        Returns the contestant's updated game status.
+
+        Raises IllegalMoveError if it isn't the contestant's turn, a card has
+        already been taken this turn, or the chosen pile is empty.
+        """
+        game = self._current_player_game(game_id, contestant_id)
+        if source not in ("draw", "discard"):
+            raise IllegalMoveError("Unknown card source {}".format(source))
+        with self.feeds[game_id].lock:
+            previous_move = game.current_move
+            game.start_new_move()
+            if source == "draw":
+                game.current_move.choose_card_from_draw()
+            else:
+                game.current_move.choose_card_from_discard()
+            try:
+                game.acquire_card()
+            except CardNotFoundError:
+                # put back the last move, so the player can choose again
+                game.current_move = previous_move
+                raise IllegalMoveError("No card to take from the {} pile.".format(source))
+        return self.status_for(game_id, contestant_id)
+
+    def discard_card(self,
+                     game_id: str,
+                     contestant_id: str,
+                     suit: str,
+                     card: str,
+                     knock: bool = False) -> dict:
+        """Finish the contestant's turn by discarding (and possibly knocking).
+
+        Args:
+            game_id (str): UUID of the game
+            contestant_id (str): UUID of the contestant whose turn it is
+            suit (str): name of the discard's suit, as in game status
+            card (str): name of the discard's rank, as in game status
+            knock (bool): [optional] True to end the game
+
+        Returns the contestant's updated game status.
+
+        Raises IllegalMoveError if it isn't the contestant's turn, no card has
+        been taken yet, the discard isn't in the contestant's hand, or the
+        contestant knocks with more deadwood than `scoring.DEFAULT_RULES`
+        allows.
+        """
+        game = self._current_player_game(game_id, contestant_id)
+        try:
+            discard = Card(rank=Rank[card], suit=Suit[suit])
+        except KeyError:
+            raise IllegalMoveError("No such card: {} of {}".format(card, suit))
+        with self.feeds[game_id].lock:
+            move = game.current_move
+            if move is None or move.state != MoveState.IN_PROGRESS:
+                raise IllegalMoveError("Must take a card before discarding.")
+            try:
+                game.current_player.hand.find(discard)
+            except CardNotFoundError:
+                raise IllegalMoveError("Specified discard not in player's hand.")
+            if knock:
+                deadwood = deadwood_value(
+                    cards_to_mask(game.current_player.hand.cards) & ~(1 << discard.index))
+                if deadwood > DEFAULT_RULES.knock_limit:
+                    raise IllegalMoveError("Can't knock with {} deadwood (the limit is {})."
+                                           .format(deadwood, DEFAULT_RULES.knock_limit))
+            move.discard(discard)
+            move.knocking = knock
+            game.finalize_move()
+            if not game.is_over:
+                game.next_turn()
+        return self.status_for(game_id, contestant_id)
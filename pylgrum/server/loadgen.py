@@ -0,0 +1,195 @@
+"""Load generator for the pylgrum HTTP API (see `pylgrum.server.api`).
+
+Usage:
+    python -m pylgrum.server.loadgen [--url URL | --serve] [--concurrency N]
+                                     [--duration SECONDS] [--seed SEED]
+
+Each of N worker threads repeatedly registers two contestants, starts a game
+between them, and plays both sides of it until it is over: each turn it
+fetches status, takes a card (from the draw or discard pile, at random),
+discards the card that leaves the least deadwood, and knocks whenever it
+may. Latencies are recorded per endpoint, and the report gives request
+counts, errors, p50/p99 latency and requests/second for each. A game played
+to its end makes no failed requests, so any errors reported are real.
+
+With --serve, the API is started in-process on a free localhost port, so a
+run needs nothing but this package (and Flask).
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from pylgrum.card import Card, Rank, Suit
+from pylgrum.meld_solver import best_discard, cards_to_mask
+from pylgrum.scoring import DEFAULT_RULES
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Return the nearest-rank percentile of an already-sorted list.
+
+    Args:
+        sorted_values (list): values in ascending order
+        pct (float): the percentile wanted, from 0 to 100
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))  # ceil
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(latencies: dict, errors: dict, elapsed: float) -> dict:
+    """Build the per-endpoint report.
+
+    Args:
+        latencies (dict): endpoint name -> list of latencies in seconds
+        errors (dict): endpoint name -> count of failed requests
+        elapsed (float): duration of the run in seconds
+    """
+    report = {}
+    for endpoint in sorted(set(latencies) | set(errors)):
+        samples = sorted(latencies.get(endpoint, []))
+        report[endpoint] = {
+            "requests": len(samples),
+            "errors": errors.get(endpoint, 0),
+            "p50_ms": None if not samples else percentile(samples, 50) * 1000,
+            "p99_ms": None if not samples else percentile(samples, 99) * 1000,
+            "requests_per_second": len(samples) / elapsed if elapsed else None,
+        }
+    return report
+
+class _Client():
+    """Issues requests to the API and records their latency."""
+
+    def __init__(self, url: str, recorder: '_Recorder') -> None:
+        parsed = urllib.parse.urlsplit(url)
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._recorder = recorder
+
+    def request(self, endpoint: str, method: str, path: str, body: dict = None):
+        """Send a request; return (HTTP status, decoded JSON body or None)."""
+        conn = http.client.HTTPConnection(self._host, self._port)
+        headers = {"Content-Type": "application/json"}
+        payload = None if body is None else json.dumps(body)
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        finally:
+            conn.close()
+        self._recorder.record(endpoint, time.perf_counter() - start, response.status)
+        return (response.status, json.loads(data) if data else None)
+
+class _Recorder():
+    """Thread-safe collection of latencies and error counts."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint: str, latency: float, status: int) -> None:
+        with self._lock:
+            if status >= 400:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            self.latencies.setdefault(endpoint, []).append(latency)
+
+def _card(card: dict) -> Card:
+    """Return the Card for a card in a status response."""
+    return Card(rank=Rank[card["card"]], suit=Suit[card["suit"]])
+
+def _play_games(client: _Client, deadline: float, rng: random.Random) -> None:
+    """Play games (both sides) until the deadline passes."""
+    while time.monotonic() < deadline:
+        (_, p1) = client.request("POST /contestants", "POST", "/contestants", {"name": "load-1"})
+        (_, p2) = client.request("POST /contestants", "POST", "/contestants", {"name": "load-2"})
+        (status, game) = client.request("POST /games", "POST", "/games", {
+            "challenger_id": p1["id"], "opponent_id": p2["id"]})
+        if status != 201:
+            continue
+        game_path = "/games/{}".format(game["id"])
+        players = [p1["id"], p2["id"]]
+        turn = 0
+        while time.monotonic() < deadline:
+            contestant_id = players[turn % 2]
+            client.request("GET /games/{id}/status", "GET",
+                           "{}/status?contestant_id={}".format(game_path, contestant_id))
+            source = rng.choice(("draw", "discard"))
+            (status, acquired) = client.request(
+                "POST /games/{id}/acquire", "POST", game_path + "/acquire",
+                {"contestant_id": contestant_id, "source": source})
+            if status != 200:
+                break
+            hand = cards_to_mask(_card(card) for card in acquired["status"]["hand"])
+            keep = 1 << _card(acquired["status"]["new_card"]).index if source == "discard" else 0
+            (deadwood, index) = best_discard(hand, keep=keep)
+            discard = Card.from_index(index)
+            (status, discarded) = client.request(
+                "POST /games/{id}/discard", "POST", game_path + "/discard", {
+                    "contestant_id": contestant_id,
+                    "suit": discard.suit.name,
+                    "card": discard.rank.name,
+                    "knock": deadwood <= DEFAULT_RULES.knock_limit})
+            if status != 200 or discarded["status"]["is_over"]:
+                break
+            turn += 1
+
+def run(url: str, concurrency: int, duration: float, seed: int = None) -> dict:
+    """Drive the API at url with concurrent workers; return the report."""
+    recorder = _Recorder()
+    deadline = time.monotonic() + duration
+    seeds = random.Random(seed)
+    workers = [
+        threading.Thread(target=_play_games, args=(
+            _Client(url, recorder), deadline, random.Random(seeds.random())))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "endpoints": summarize(recorder.latencies, recorder.errors, elapsed),
+    }
+
+def serve_in_background():
+    """Start the API on a free localhost port; return (url, server)."""
+    # imported here so the load generator itself does not need Flask
+    from werkzeug.serving import make_server # pylint: disable=import-outside-toplevel
+    from pylgrum.server.api import create_app # pylint: disable=import-outside-toplevel
+
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return ("http://127.0.0.1:{}".format(server.server_port), server)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--serve", action="store_true",
+                        help="start the API in-process instead of using --url")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.serve:
+        (url, server) = serve_in_background()
+    try:
+        print(json.dumps(run(url, args.concurrency, args.duration, args.seed), indent=2))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,461 @@
+"""Durable GameManager state: a write-ahead log plus periodic snapshots.
+
+Every state-changing GameManager operation is appended to a write-ahead log
+(WAL) before the caller gets a result back, and a move is not visible to
+other clients of its game (status or long-poll) until its record is durable.
+Many callers committing at about
+the same time share one fsync ("group commit"): whichever caller gets there
+first flushes everything written so far, and the rest find their records
+already durable.
+
+Periodically, the whole of `GameManager.contestants` and `GameManager.games`
+is written to a snapshot, after which older log segments are deleted.
+Recovery loads the newest snapshot and replays only the log records written
+after it.
+
+On-disk layout (all in one directory):
+
+    wal-<first LSN>.log     log segments, one JSON record per line
+    snapshot-<LSN>.pickle   state including every record up to LSN
+
+Classes:
+
+    WriteAheadLog: append-only, group-committed log of JSON records
+    PersistentGameManager: GameManager that logs, snapshots and recovers
+"""
+
+from contextlib import ExitStack
+import json
+import os
+import pickle
+import threading
+import time
+import uuid
+
+from pylgrum.card import Card
+from pylgrum.deck import Deck
+from pylgrum.stack import CardStack
+from pylgrum.errors import PylgrumInternalError
+from pylgrum.server.change_feed import GameChangeFeed
+from pylgrum.server.game_manager import GameManager
+
+_WAL_PREFIX = "wal-"
+_WAL_SUFFIX = ".log"
+_SNAPSHOT_PREFIX = "snapshot-"
+_SNAPSHOT_SUFFIX = ".pickle"
+
+def _lsn_from_name(name: str, prefix: str, suffix: str) -> int:
+    """Return the LSN embedded in a segment or snapshot file name (or None)."""
+    if name.startswith(prefix) and name.endswith(suffix):
+        try:
+            return int(name[len(prefix):-len(suffix)])
+        except ValueError:
+            pass
+    return None
+
+class WriteAheadLog():
+    """Append-only log of JSON-serializable records with group commit.
+
+    Each record is assigned a log sequence number (LSN), starting at 1. The
+    log is split into segments so that the part covered by a snapshot can be
+    deleted.
+    """
+
+    def __init__(self, directory: str, next_lsn: int = 1, commit_delay: float = 0.0) -> None:
+        """Open a log for appending.
+
+        Args:
+            directory (str): where the log segments live
+            next_lsn (int): [optional] LSN to give the next appended record
+            commit_delay (float): [optional] seconds a committing caller waits
+                for others to join its fsync (trades latency for throughput)
+        """
+        self.directory = directory
+        self.commit_delay = commit_delay
+        self.fsync_count = 0
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._written_lsn = next_lsn - 1
+        self._durable_lsn = next_lsn - 1
+        self._flushing = False
+        self._file = self._open_segment(next_lsn)
+
+    @property
+    def last_lsn(self) -> int:
+        """LSN of the most recently appended record."""
+        return self._written_lsn
+
+    def _open_segment(self, first_lsn: int):
+        # A segment can only already exist under this name if it holds nothing
+        #  but a partially-written record, so it is safe to truncate it.
+        path = os.path.join(self.directory, "{}{:020d}{}".format(
+            _WAL_PREFIX, first_lsn, _WAL_SUFFIX))
+        return open(path, "w", encoding="utf-8")
+
+    def append(self, record: dict) -> int:
+        """Append a record to the log and return its LSN.
+
+        The record is not durable until commit() has been called with its LSN
+        (or a later one).
+        """
+        with self._lock:
+            self._written_lsn += 1
+            self._file.write(json.dumps(record, separators=(',', ':')))
+            self._file.write("\n")
+            return self._written_lsn
+
+    def commit(self, lsn: int = None) -> None:
+        """Block until every record up to the given LSN is on disk.
+
+        Args:
+            lsn (int): [optional] LSN to wait for; defaults to the last one
+
+        If another caller is already flushing, this waits for that flush and
+        then, if needed, leads the next one - so concurrent committers are
+        batched into as few fsyncs as possible.
+        """
+        with self._lock:
+            if lsn is None:
+                lsn = self._written_lsn
+            while self._durable_lsn < lsn:
+                if self._flushing:
+                    self._flushed.wait()
+                    continue
+                self._flushing = True
+                self._lock.release()
+                try:
+                    if self.commit_delay:
+                        time.sleep(self.commit_delay)
+                    with self._lock:
+                        target = self._written_lsn
+                        self._file.flush()
+                        fileno = self._file.fileno()
+                    os.fsync(fileno)
+                finally:
+                    self._lock.acquire()
+                    self._flushing = False
+                self.fsync_count += 1
+                self._durable_lsn = max(self._durable_lsn, target)
+                self._flushed.notify_all()
+
+    def rotate(self) -> int:
+        """Commit the current segment and start a new one.
+
+        Returns the LSN the new segment starts at.
+        """
+        self.commit()
+        with self._lock:
+            while self._flushing:
+                self._flushed.wait()
+            self._file.close()
+            self._file = self._open_segment(self._written_lsn + 1)
+            return self._written_lsn + 1
+
+    def close(self) -> None:
+        """Commit outstanding records and close the log."""
+        self.commit()
+        with self._lock:
+            self._file.close()
+
+    @staticmethod
+    def segments(directory: str) -> list:
+        """Return (first LSN, path) for each log segment, oldest first."""
+        found = []
+        for name in os.listdir(directory):
+            first_lsn = _lsn_from_name(name, _WAL_PREFIX, _WAL_SUFFIX)
+            if first_lsn is not None:
+                found.append((first_lsn, os.path.join(directory, name)))
+        return sorted(found)
+
+    @staticmethod
+    def read(directory: str, after_lsn: int = 0):
+        """Yield (LSN, record) for every logged record after the given LSN.
+
+        A partially-written final record (e.g. from a crash mid-write) is
+        ignored.
+        """
+        segments = WriteAheadLog.segments(directory)
+        for (i, (first_lsn, path)) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= after_lsn + 1:
+                continue # every record in this segment is covered already
+            lsn = first_lsn
+            with open(path, encoding="utf-8") as segment:
+                for line in segment:
+                    if not line.endswith("\n"):
+                        break
+                    if lsn > after_lsn:
+                        yield (lsn, json.loads(line))
+                    lsn += 1
+
+    @staticmethod
+    def drop_segments_before(directory: str, lsn: int) -> None:
+        """Delete segments containing only records older than the given LSN."""
+        segments = WriteAheadLog.segments(directory)
+        for (i, (_, path)) in enumerate(segments[:-1]):
+            if segments[i + 1][0] <= lsn:
+                os.remove(path)
+
+
+class PersistentGameManager(GameManager):
+    """A GameManager whose state survives restarts.
+
+    Creating a PersistentGameManager on a directory that already holds a log
+    recovers the state recorded there.
+
+    Methods that change state (add_contestant, delete_contestants,
+    create_game, acquire_card, discard_card) return only once their log record
+    is durable. Until then, the game they change (or create) is held locked,
+    so nobody reading it through the GameManager or its GameChangeFeed sees
+    the change early. (A new contestant does show up in list_contestants()
+    before it is durable.)
+
+    If a record can't be logged, the operation has already been applied in
+    memory, so memory and log no longer agree: the exception is raised, and
+    every later state-changing operation raises PylgrumInternalError. Open a
+    new PersistentGameManager on the directory to recover the logged state.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 snapshot_interval: int = None,
+                 commit_delay: float = 0.0) -> None:
+        """Open (and if necessary recover) a persistent GameManager.
+
+        Args:
+            directory (str): where the log and snapshots are kept
+            snapshot_interval (int): [optional] take a snapshot after this
+                many logged operations (default: only when snapshot() is called)
+            commit_delay (float): [optional] see WriteAheadLog
+        """
+        super().__init__()
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        self._ops_since_snapshot = 0
+        self._replaying = False
+        self._log_failure = None
+        self._new_feeds = None # while applying a logged operation, see _new_feed()
+        os.makedirs(directory, exist_ok=True)
+        last_lsn = self._recover()
+        self._wal = WriteAheadLog(directory, next_lsn=last_lsn + 1, commit_delay=commit_delay)
+
+    def close(self) -> None:
+        """Flush and close the log."""
+        self._wal.close()
+
+    @staticmethod
+    def _snapshots(directory: str) -> list:
+        """Return (LSN, path) for each snapshot, oldest first."""
+        found = []
+        for name in os.listdir(directory):
+            lsn = _lsn_from_name(name, _SNAPSHOT_PREFIX, _SNAPSHOT_SUFFIX)
+            if lsn is not None:
+                found.append((lsn, os.path.join(directory, name)))
+        return sorted(found)
+
+    def _recover(self) -> int:
+        """Load the latest snapshot and replay the log after it.
+
+        Returns the LSN of the last record recovered.
+        """
+        last_lsn = 0
+        snapshots = PersistentGameManager._snapshots(self.directory)
+        if snapshots:
+            (last_lsn, path) = snapshots[-1]
+            with open(path, "rb") as snapshot:
+                state = pickle.load(snapshot)
+            self.contestants = state["contestants"]
+            self.games = state["games"]
+            self.feeds = {
+                game_id: GameChangeFeed(game) for (game_id, game) in self.games.items()
+            }
+
+        self._replaying = True
+        try:
+            for (lsn, record) in WriteAheadLog.read(self.directory, last_lsn):
+                self._replay(record)
+                last_lsn = lsn
+        finally:
+            self._replaying = False
+        return last_lsn
+
+    def _replay(self, record: dict) -> None:
+        """Re-apply one logged operation."""
+        operation = record["op"]
+        args = record["args"]
+        if operation == "create_game":
+            deck = CardStack()
+            deck.add([Card.from_index(i) for i in args.pop("deck")])
+            self.create_game(deck=deck, **args)
+        elif operation in ("add_contestant", "delete_contestants",
+                           "acquire_card", "discard_card"):
+            getattr(self, operation)(**args)
+        else:
+            raise PylgrumInternalError("Unknown logged operation {}".format(operation))
+
+    def _check_log(self) -> None:
+        """Raise PylgrumInternalError if a record has failed to be logged."""
+        if self._log_failure is not None:
+            raise PylgrumInternalError(
+                "Log write failed ({!r}); reopen the directory to recover".format(
+                    self._log_failure))
+
+    def _logged(self, operation: str, apply, args, game_id: str = None):
+        """Apply an operation and log it, returning once the log is durable.
+
+        Args:
+            operation (str): name of the operation, used to replay it
+            apply (callable): performs the operation and returns its result
+            args (dict or callable): keyword arguments to log for replay, or
+                a callable that builds them from apply()'s result
+            game_id (str): [optional] the game the operation changes, which
+                is kept locked until the record is durable (a game created
+                by the operation is kept locked too, see _new_feed())
+
+        The operation is only logged if it succeeds. Applying and appending
+        happen under one lock, so the log order matches the order operations
+        were applied in; the (slow) commit happens outside that lock, so that
+        concurrent callers can share an fsync, but inside the game's feed
+        lock, so that the game's readers (and long-poll subscribers, who
+        re-acquire it to wake up) only see the operation once it is durable.
+        A feed lock is always either taken before self._lock, or (for a new
+        game) taken before the feed is published, so the two can't deadlock.
+        """
+        if self._replaying:
+            return apply()
+        feed = self.feeds.get(game_id) if game_id is not None else None
+        with ExitStack() as pending:
+            if feed is not None:
+                pending.enter_context(feed.lock)
+            with self._lock:
+                self._check_log()
+                self._new_feeds = []
+                try:
+                    result = apply()
+                finally:
+                    for created in self._new_feeds:
+                        pending.callback(created.lock.release)
+                    self._new_feeds = None
+                if callable(args):
+                    args = args(result)
+                try:
+                    lsn = self._wal.append({"op": operation, "args": args})
+                except Exception as e:
+                    self._log_failure = e
+                    raise
+                self._ops_since_snapshot += 1
+                take_snapshot = (self.snapshot_interval is not None and
+                                 self._ops_since_snapshot >= self.snapshot_interval)
+            try:
+                self._wal.commit(lsn)
+            except Exception as e:
+                self._log_failure = e
+                raise
+        if take_snapshot:
+            self.snapshot()
+        return result
+
+    def _new_feed(self, game):
+        """See `GameManager._new_feed()`: lock a new game's feed before it is
+        published, for _logged() to release once the game is durable."""
+        feed = super()._new_feed(game)
+        if self._new_feeds is not None:
+            feed.lock.acquire()
+            self._new_feeds.append(feed)
+        return feed
+
+    def snapshot(self) -> int:
+        """Write a snapshot of all contestants and games, and prune the log.
+
+        Returns the LSN the snapshot includes.
+        """
+        with self._lock:
+            self._check_log()
+            lsn = self._wal.last_lsn
+            state = pickle.dumps(
+                {"contestants": self.contestants, "games": self.games},
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+            self._wal.rotate()
+            self._ops_since_snapshot = 0
+
+        path = os.path.join(self.directory, "{}{:020d}{}".format(
+            _SNAPSHOT_PREFIX, lsn, _SNAPSHOT_SUFFIX))
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as snapshot:
+            snapshot.write(state)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temp_path, path)
+
+        for (old_lsn, old_path) in PersistentGameManager._snapshots(self.directory):
+            if old_lsn < lsn:
+                os.remove(old_path)
+        WriteAheadLog.drop_segments_before(self.directory, lsn + 1)
+        return lsn
+
+    def add_contestant(self, name=None, contestant_id=None):
+        """See `GameManager.add_contestant()`."""
+        return self._logged(
+            "add_contestant",
+            lambda: super(PersistentGameManager, self).add_contestant(name, contestant_id),
+            lambda new_contestant: {"name": name, "contestant_id": new_contestant.id}
+        )
+
+    def delete_contestants(self):
+        """See `GameManager.delete_contestants()`."""
+        return self._logged("delete_contestants", super().delete_contestants, {})
+
+    def create_game(self,
+                    challenger_id: str,
+                    opponent_id: str,
+                    game_id: str = None,
+                    deck: CardStack = None):
+        """See `GameManager.create_game()`.
+
+        The deck's order is logged, so that replay deals the same cards.
+        """
+        if deck is None:
+            deck = Deck()
+            deck.shuffle()
+        if not game_id:
+            game_id = str(uuid.uuid4())
+        deck_order = [card.index for card in deck.cards]
+        return self._logged(
+            "create_game",
+            lambda: super(PersistentGameManager, self).create_game(
+                challenger_id, opponent_id, game_id, deck),
+            lambda result: {
+                "challenger_id": challenger_id,
+                "opponent_id": opponent_id,
+                "game_id": result["id"],
+                "deck": deck_order
+            },
+            game_id
+        )
+
+    def acquire_card(self, game_id: str, contestant_id: str, source: str) -> dict:
+        """See `GameManager.acquire_card()`."""
+        return self._logged(
+            "acquire_card",
+            lambda: super(PersistentGameManager, self).acquire_card(
+                game_id, contestant_id, source),
+            {"game_id": game_id, "contestant_id": contestant_id, "source": source},
+            game_id
+        )
+
+    def discard_card(self,
+                     game_id: str,
+                     contestant_id: str,
+                     suit: str,
+                     card: str,
+                     knock: bool = False) -> dict:
+        """See `GameManager.discard_card()`."""
+        return self._logged(
+            "discard_card",
+            lambda: super(PersistentGameManager, self).discard_card(
+                game_id, contestant_id, suit, card, knock),
+            {"game_id": game_id, "contestant_id": contestant_id,
+             "suit": suit, "card": card, "knock": knock},
+            game_id
+        )
@@ -0,0 +1,362 @@
+"""Spread games across worker processes, each running its own GameManager.
+
+A single GameManager lives in a single Python process, so CPU-heavy game work
+(e.g. meld detection) for every game is serialized by the GIL. The
+ShardedGameManager in this module is a thin router: it owns the registry of
+Contestants, and forwards per-game calls over a pipe to the worker process
+("shard") that owns the game.
+
+Games are assigned to shards by consistent hashing of the game's ID, so
+changing the number of shards only moves the games whose position on the hash
+ring changes hands (about 1/N of them), rather than reshuffling every game.
+
+Classes:
+
+    HashRing: consistent-hash mapping of keys to shard numbers
+    ShardedGameManager: GameManager-like router for a pool of shard processes
+"""
+
+import bisect
+import hashlib
+import multiprocessing
+import threading
+import uuid
+
+from pylgrum.game import Game
+from pylgrum.server.change_feed import GameChangeFeed
+from pylgrum.server.contestant import Contestant
+from pylgrum.server.game_manager import GameManager
+from pylgrum.server.errors import DuplicateContestant, InvalidContestant, InvalidGame
+
+class HashRing():
+    """Consistent hashing of string keys onto a set of shard numbers.
+
+    Each shard is placed on the ring at several pseudo-random points
+    ("replicas"), which evens out the share of keys each shard receives.
+    """
+
+    def __init__(self, shards, replicas: int = 64) -> None:
+        """Create a ring containing the given shards.
+
+        Args:
+            shards (iterable of int): the shard numbers on the ring
+            replicas (int): [optional] ring points per shard
+        """
+        self.shards = sorted(shards)
+        points = sorted(
+            (HashRing._hash("{}:{}".format(shard, replica)), shard)
+            for shard in self.shards
+            for replica in range(replicas)
+        )
+        self._points = [point for (point, _) in points]
+        self._owners = [shard for (_, shard) in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def shard_for(self, key: str) -> int:
+        """Return the shard number owning the given key."""
+        idx = bisect.bisect(self._points, HashRing._hash(key))
+        if idx == len(self._points):
+            idx = 0
+        return self._owners[idx]
+
+
+class _ShardGameManager(GameManager):
+    """The GameManager run in each shard process.
+
+    The router is the authority on which contestants exist and whether they are
+    free to play, so a shard learns about contestants only as games that
+    involve them are created on (or migrated to) the shard.
+    """
+
+    def game_ids(self) -> list:
+        """Return the IDs of the games held by this shard."""
+        return list(self.games.keys())
+
+    def create_game_between(self, challenger: tuple, opponent: tuple, game_id: str):
+        """Create a game, registering its contestants with this shard.
+
+        Args:
+            challenger (tuple): (id, name) of the contestant starting the game
+            opponent (tuple): (id, name) of the other contestant
+            game_id (str): UUID of the new game
+        """
+        for (contestant_id, name) in (challenger, opponent):
+            self._adopt_contestant(contestant_id, name)
+        return self.create_game(challenger[0], opponent[0], game_id=game_id)
+
+    def _adopt_contestant(self, contestant_id: str, name: str = None) -> Contestant:
+        """Return a shard-local Contestant that is free to join a game."""
+        contestant = self.contestants.get(contestant_id)
+        if contestant is None:
+            contestant = self.add_contestant(name, contestant_id)
+        contestant.current_player = None
+        return contestant
+
+    def export_game(self, game_id: str) -> Game:
+        """Remove a game from this shard and return it (for migration)."""
+        try:
+            game = self.games.pop(game_id)
+        except KeyError:
+            raise InvalidGame("No game with id {}".format(game_id))
+        self.feeds.pop(game_id).close()
+        return game
+
+    def import_game(self, game: Game) -> None:
+        """Take ownership of a game exported by another shard."""
+        for player in (game.player1, game.player2):
+            self._adopt_contestant(player.contestant_id).current_player = player
+        self.games[game.game_id] = game
+        self.feeds[game.game_id] = GameChangeFeed(game)
+
+
+def _shard_main(conn) -> None:
+    """Serve GameManager calls received over a pipe until told to stop."""
+    manager = _ShardGameManager()
+    while True:
+        (method, args, kwargs) = conn.recv()
+        if method is None:
+            break
+        try:
+            result = getattr(manager, method)(*args, **kwargs)
+        except Exception as err: # pylint: disable=broad-except
+            conn.send(("error", type(err), getattr(err, 'message', None) or str(err)))
+        else:
+            conn.send(("ok", result))
+    conn.close()
+
+
+class _Shard():
+    """Router-side handle on one shard process."""
+
+    def __init__(self, context) -> None:
+        (self._conn, child_conn) = context.Pipe()
+        self._lock = threading.Lock()
+        self.process = context.Process(target=_shard_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def call(self, method: str, *args, **kwargs):
+        """Invoke a method on the shard's GameManager and return its result.
+
+        Exceptions raised in the shard are re-raised here.
+        """
+        with self._lock:
+            self._conn.send((method, args, kwargs))
+            response = self._conn.recv()
+        if response[0] == "error":
+            raise response[1](response[2])
+        return response[1]
+
+    def stop(self) -> None:
+        """Shut down the shard process."""
+        with self._lock:
+            self._conn.send((None, (), {}))
+            self._conn.close()
+        self.process.join()
+
+
+class _ResizeGate():
+    """Lets any number of calls run at once, except while shards are resized."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._active = 0
+        self._resizing = False
+
+    def enter(self) -> None:
+        with self._cond:
+            while self._resizing:
+                self._cond.wait()
+            self._active += 1
+
+    def leave(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def start_resize(self) -> None:
+        with self._cond:
+            while self._resizing:
+                self._cond.wait()
+            self._resizing = True
+            while self._active > 0:
+                self._cond.wait()
+
+    def finish_resize(self) -> None:
+        with self._cond:
+            self._resizing = False
+            self._cond.notify_all()
+
+
+class ShardedGameManager():
+    """Routes GameManager operations to a pool of shard processes.
+
+    Contestants live in the router, so registration and the "one game at a
+    time" rule are enforced in one place no matter how many shards there are.
+    Games live in the shards.
+
+    Offers the same contestant and game methods as GameManager, with the
+    exception of wait_for_change(): a long-poll would tie up the pipe to the
+    game's shard for every other game on it.
+    """
+
+    def __init__(self, num_shards: int = 2, replicas: int = 64) -> None:
+        """Start a router and its shard processes.
+
+        Args:
+            num_shards (int): [optional] how many shard processes to start
+            replicas (int): [optional] hash ring points per shard
+        """
+        self.contestants = {}
+        self._replicas = replicas
+        self._context = multiprocessing.get_context()
+        self._lock = threading.Lock()
+        self._gate = _ResizeGate()
+        self._shards = [_Shard(self._context) for _ in range(num_shards)]
+        self._ring = HashRing(range(num_shards), replicas)
+
+    @property
+    def num_shards(self) -> int:
+        """Number of shard processes currently running."""
+        return len(self._shards)
+
+    def shard_for(self, game_id: str) -> int:
+        """Return the number of the shard that owns a game."""
+        return self._ring.shard_for(game_id)
+
+    def close(self) -> None:
+        """Stop all shard processes. In-progress games are lost."""
+        for shard in self._shards:
+            shard.stop()
+        self._shards = []
+
+    def list_contestants(self):
+        """Return a list of JSON objects representing currently registered contestants."""
+        return [
+            {
+                "id": c.id,
+                "name": c.name,
+                "currently_playing": c.is_playing
+            }
+            for c in self.contestants.values()
+        ]
+
+    def delete_contestants(self):
+        """Clears the set of registered contestants."""
+        with self._lock:
+            self.contestants = {}
+
+    def add_contestant(self, name=None, contestant_id=None):
+        """Create and return new contestant with given name.
+
+        Args:
+            name (str): [optional] name of the new contestant
+            contestant_id (str): [optional] UUID for the new contestant
+
+        Raises DuplicateContestant if contestant_id is already registered.
+        """
+        new_contestant = Contestant(name, contestant_id)
+        with self._lock:
+            if new_contestant.id in self.contestants:
+                raise DuplicateContestant("Contestant {} already exists".format(
+                    new_contestant.id))
+            self.contestants[new_contestant.id] = new_contestant
+        return new_contestant
+
+    def create_game(self, challenger_id: str, opponent_id: str, game_id: str = None):
+        """Create a game between specified players, on the shard that owns it.
+
+        See `GameManager.create_game()`. A duplicate game_id is detected by
+        the owning shard, which raises DuplicateGame.
+        """
+        with self._lock:
+            if challenger_id not in self.contestants.keys():
+                raise InvalidContestant("Invalid challenger")
+            if opponent_id not in self.contestants.keys():
+                raise InvalidContestant("Invalid opponent")
+            player1 = self.contestants[challenger_id]
+            player2 = self.contestants[opponent_id]
+            player1.join_game()
+            try:
+                player2.join_game()
+            except:
+                player1.current_player = None
+                raise
+
+        new_game_id = game_id if game_id else str(uuid.uuid4())
+        try:
+            return self._call(
+                new_game_id,
+                "create_game_between",
+                (player1.id, player1.name),
+                (player2.id, player2.name),
+                new_game_id
+            )
+        except:
+            with self._lock:
+                player1.current_player = None
+                player2.current_player = None
+            raise
+
+    def status_for(self, game_id: str, contestant_id: str) -> dict:
+        """See `GameManager.status_for()`."""
+        return self._call(game_id, "status_for", game_id, contestant_id)
+
+    def acquire_card(self, game_id: str, contestant_id: str, source: str) -> dict:
+        """See `GameManager.acquire_card()`."""
+        return self._call(game_id, "acquire_card", game_id, contestant_id, source)
+
+    def discard_card(self,
+                     game_id: str,
+                     contestant_id: str,
+                     suit: str,
+                     card: str,
+                     knock: bool = False) -> dict:
+        """See `GameManager.discard_card()`."""
+        return self._call(game_id, "discard_card", game_id, contestant_id, suit, card, knock)
+
+    def _call(self, game_id: str, method: str, *args):
+        """Forward a call to the shard that owns the given game."""
+        self._gate.enter()
+        try:
+            return self._shards[self._ring.shard_for(game_id)].call(method, *args)
+        finally:
+            self._gate.leave()
+
+    def resize(self, num_shards: int) -> int:
+        """Change the number of shards, migrating only games that change owner.
+
+        Args:
+            num_shards (int): the new number of shard processes (at least 1)
+
+        Calls made while the resize is in progress wait for it to finish.
+
+        Returns the number of games that were migrated.
+        """
+        if num_shards < 1:
+            raise ValueError("Need at least one shard")
+        self._gate.start_resize()
+        try:
+            while len(self._shards) < num_shards:
+                self._shards.append(_Shard(self._context))
+            new_ring = HashRing(range(num_shards), self._replicas)
+
+            migrated = 0
+            for (old_owner, shard) in enumerate(self._shards):
+                for game_id in shard.call("game_ids"):
+                    new_owner = new_ring.shard_for(game_id)
+                    if new_owner != old_owner:
+                        game = shard.call("export_game", game_id)
+                        self._shards[new_owner].call("import_game", game)
+                        migrated += 1
+
+            for shard in self._shards[num_shards:]:
+                shard.stop()
+            self._shards = self._shards[:num_shards]
+            self._ring = new_ring
+        finally:
+            self._gate.finish_resize()
+        return migrated
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("flask")
+
+from pylgrum.server.api import create_app
+from pylgrum.server.game_manager import GameManager
+
+@pytest.fixture
+def client_with_game():
+
+    class GenericContainer():
+        pass
+
+    td = GenericContainer()
+
+    td.gm = GameManager()
+    td.client = create_app(td.gm).test_client()
+    td.p1 = td.client.post("/contestants", json={"name": "p1"}).get_json()
+    td.p2 = td.client.post("/contestants", json={"name": "p2"}).get_json()
+    td.game_id = td.client.post("/games", json={
+        "challenger_id": td.p1["id"], "opponent_id": td.p2["id"]}).get_json()["id"]
+
+    yield td
+
+def test_list_contestants(client_with_game):
+    f = client_with_game # typographical shortcut for the fixture
+    contestants = f.client.get("/contestants").get_json()
+    assert({c["name"] for c in contestants} == {"p1", "p2"})
+
+def test_status(client_with_game):
+    f = client_with_game # typographical shortcut for the fixture
+    r = f.client.get("/games/{}/status?contestant_id={}".format(f.game_id, f.p1["id"]))
+    assert(r.status_code == 200)
+    assert(r.get_json()["version"] == 0)
+    assert(len(r.get_json()["status"]["hand"]) == 10)
+
+def test_long_poll_timeout(client_with_game):
+    f = client_with_game # typographical shortcut for the fixture
+    r = f.client.get("/games/{}/status?contestant_id={}&after_version=0&timeout=0.01".format(
+        f.game_id, f.p1["id"]))
+    assert(r.status_code == 204)
+
+def test_turn(client_with_game):
+    f = client_with_game # typographical shortcut for the fixture
+    path = "/games/{}".format(f.game_id)
+    r = f.client.post(path + "/acquire", json={"contestant_id": f.p1["id"], "source": "draw"})
+    assert(r.status_code == 200)
+    card = r.get_json()["status"]["hand"][0]
+    r = f.client.post(path + "/discard", json={
+        "contestant_id": f.p1["id"], "suit": card["suit"], "card": card["card"]})
+    assert(r.status_code == 200)
+    assert(r.get_json()["status"]["current_player"] == f.p2["id"])
+
+def test_errors(client_with_game):
+    f = client_with_game # typographical shortcut for the fixture
+    path = "/games/{}".format(f.game_id)
+    assert(f.client.post("/games", json={}).status_code == 400)
+    assert(f.client.get("/games/bogus/status?contestant_id=x").status_code == 404)
+    r = f.client.post(path + "/acquire", json={"contestant_id": f.p2["id"], "source": "draw"})
+    assert(r.status_code == 409)
+    assert("error" in r.get_json())
@@ -0,0 +1,101 @@
+import pytest
+import json
+import threading
+
+from pylgrum.game import Game, GameEvent
+from pylgrum.player import Player
+from pylgrum.server.change_feed import GameChangeFeed
+from pylgrum.server.errors import InvalidContestant
+
+@pytest.fixture
+def game_with_feed():
+
+    class GenericContainer():
+        pass
+
+    td = GenericContainer()
+
+    td.game = Game(Player(contestant_id='p1'), Player(contestant_id='p2'))
+    td.feed = GameChangeFeed(td.game)
+
+    yield td
+
+def draw_and_discard(game):
+    game.start_new_move()
+    game.current_move.choose_card_from_draw()
+    game.acquire_card()
+    game.current_move.discard(game.current_player.hand.get(0))
+    game.finalize_move()
+
+def test_payload_is_status_json(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    (version, payload) = f.feed.payload_for('p1')
+    decoded = json.loads(payload)
+    assert(version == 0)
+    assert(decoded['version'] == 0)
+    assert(decoded['status'] == f.game.status_for(f.game.player1))
+
+def test_payload_is_shared_within_a_version(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    assert(f.feed.payload_for('p1')[1] is f.feed.payload_for('p1')[1])
+    assert(f.feed.payload_for('p1')[1] is not f.feed.payload_for('p2')[1])
+
+def test_game_events_bump_version(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    (_, before) = f.feed.payload_for('p1')
+    draw_and_discard(f.game)
+    assert(f.feed.version == 2)
+    assert(f.feed.last_event == GameEvent.MOVE_FINALIZED)
+    (version, after) = f.feed.payload_for('p1')
+    assert(version == 2)
+    assert(after != before)
+
+def test_knock_is_announced(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    f.game.start_new_move()
+    f.game.current_move.choose_card_from_draw()
+    f.game.acquire_card()
+    f.game.current_move.discard(f.game.current_player.hand.get(0))
+    f.game.current_move.knocking = True
+    f.game.finalize_move()
+    assert(f.feed.last_event == GameEvent.KNOCKED)
+    assert(f.game.is_over)
+
+def test_wait_returns_immediately_if_already_changed(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    draw_and_discard(f.game)
+    (version, _) = f.feed.wait_for_change('p2', 0, timeout=0)
+    assert(version == 2)
+
+def test_wait_times_out(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    assert(f.feed.wait_for_change('p2', 0, timeout=0.01) is None)
+
+def test_wait_wakes_on_change(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    results = []
+    waiters = [
+        threading.Thread(
+            target=lambda: results.append(f.feed.wait_for_change('p2', 0, timeout=5))
+        )
+        for _ in range(3)
+    ]
+    for waiter in waiters:
+        waiter.start()
+    f.game.next_turn()
+    for waiter in waiters:
+        waiter.join()
+    assert(len(results) == 3)
+    assert(all(r[0] == 1 for r in results))
+    assert(results[0][1] is results[1][1] is results[2][1])
+
+def test_wait_for_unknown_contestant_raises(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    with pytest.raises(InvalidContestant):
+        f.feed.wait_for_change('bogus', 0, timeout=0)
+
+def test_closed_feed_stops_listening(game_with_feed):
+    f = game_with_feed # typographical shortcut for the fixture
+    f.feed.close()
+    f.game.next_turn()
+    assert(f.feed.last_event is None)
@@ -3,7 +3,13 @@ import json
 import uuid
 
 from pylgrum.server.game_manager import GameManager, Contestant
-from pylgrum.server.errors import ContestantAlreadyPlaying, InvalidContestant
+from pylgrum.card import Card, Rank, Suit
+from pylgrum.deck import Deck
+from pylgrum.stack import CardStack
+from pylgrum.errors import IllegalMoveError
+from pylgrum.scoring import score_game
+from pylgrum.server.errors import (ContestantAlreadyPlaying, DuplicateContestant, DuplicateGame,
+                                   InvalidContestant, InvalidGame)
 
 @pytest.fixture
 def gm_with_contestants():
@@ -69,6 +75,24 @@ def test_bogus_contestant_raises(gm_with_contestants):
     with pytest.raises(InvalidContestant):
         f.gm.create_game(f.p1.id, bogus_contestant)
 
+def test_duplicate_contestant_id_raises(gm_with_contestants):
+    f = gm_with_contestants # typographical shortcut for the fixture
+    with pytest.raises(DuplicateContestant):
+        f.gm.add_contestant('impostor', contestant_id=f.p1.id)
+    assert(f.gm.contestants[f.p1.id] is f.p1)
+
+def test_duplicate_game_id_raises(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    game = f.gm.games[f.game_id]
+    feed = f.gm.feeds[f.game_id]
+    c = f.gm.add_contestant('c')
+    d = f.gm.add_contestant('d')
+    with pytest.raises(DuplicateGame):
+        f.gm.create_game(c.id, d.id, game_id=f.game_id)
+    assert(f.gm.games[f.game_id] is game)
+    assert(f.gm.feeds[f.game_id] is feed)
+    assert(not c.is_playing and not d.is_playing)
+
 def test_contestant_only_plays_one_at_a_time(game_underway):
     f = game_underway # typographical shortcut for the fixture
     new_contestant = f.gm.add_contestant('new contestant')
@@ -78,4 +102,125 @@ def test_contestant_only_plays_one_at_a_time(game_underway):
 def test_currently_playing_flag_set(game_underway):
     f = game_underway # typographical shortcut for the fixture
     assert(f.p1.is_playing)
-    assert(f.p2.is_playing)
\ No newline at end of file
+    assert(f.p2.is_playing)
+
+def test_status_for(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    status = f.gm.status_for(f.game_id, f.p1.id)
+    assert(status['game_id'] == f.game_id)
+    assert(status['current_player'] == f.p1.id)
+    assert(status['version'] == 0)
+    assert(len(status['hand']) == 10)
+
+def test_status_for_bogus_game_raises(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    with pytest.raises(InvalidGame):
+        f.gm.status_for(str(uuid.uuid4()), f.p1.id)
+
+def test_status_for_uninvolved_contestant_raises(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    new_contestant = f.gm.add_contestant('new contestant')
+    with pytest.raises(InvalidContestant):
+        f.gm.status_for(f.game_id, new_contestant.id)
+
+def test_move_out_of_turn_raises(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    with pytest.raises(IllegalMoveError):
+        f.gm.acquire_card(f.game_id, f.p2.id, "draw")
+
+def test_discard_before_acquiring_raises(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    card = f.gm.status_for(f.game_id, f.p1.id)['hand'][0]
+    with pytest.raises(IllegalMoveError):
+        f.gm.discard_card(f.game_id, f.p1.id, card['suit'], card['card'])
+
+def test_full_turn(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    status = f.gm.acquire_card(f.game_id, f.p1.id, "discard")
+    assert(len(status['hand']) == 11)
+    assert('new_card' in status)
+    card = status['hand'][0]
+    status = f.gm.discard_card(f.game_id, f.p1.id, card['suit'], card['card'])
+    assert(len(status['hand']) == 10)
+    assert(status['visible_discard'] == card)
+    assert(status['current_player'] == f.p2.id)
+
+def test_opponent_never_sees_drawn_card(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    status = f.gm.acquire_card(f.game_id, f.p1.id, "draw")
+    assert('new_card' in status)
+    assert('new_card' not in f.gm.status_for(f.game_id, f.p2.id))
+    # discard the drawn card, so the opponent can't tell it from the hand
+    drawn = status['new_card']
+    status = f.gm.discard_card(f.game_id, f.p1.id, drawn['suit'], drawn['card'])
+    assert('new_card' not in status)
+    assert('new_card' not in f.gm.status_for(f.game_id, f.p2.id))
+    payload = json.loads(f.gm.wait_for_change(f.game_id, f.p2.id, 0, timeout=0))
+    assert('new_card' not in payload['status'])
+
+def test_taking_from_empty_pile_can_be_retried(gm_with_contestants):
+    f = gm_with_contestants # typographical shortcut for the fixture
+    deck = CardStack()
+    deck.add(Deck().cards[:21]) # just enough to deal, leaving no draw pile
+    game_id = f.gm.create_game(f.p1.id, f.p2.id, deck=deck)['id']
+    with pytest.raises(IllegalMoveError):
+        f.gm.acquire_card(game_id, f.p1.id, "draw")
+    with pytest.raises(IllegalMoveError):
+        f.gm.acquire_card(game_id, f.p1.id, "pile")
+    status = f.gm.acquire_card(game_id, f.p1.id, "discard")
+    assert(len(status['hand']) == 11)
+
+def test_discard_not_in_hand_raises(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    status = f.gm.acquire_card(f.game_id, f.p1.id, "draw")
+    held = [(c['suit'], c['card']) for c in status['hand']]
+    missing = next(
+        (s.name, r.name) for s in Suit for r in Rank if (s.name, r.name) not in held
+    )
+    with pytest.raises(IllegalMoveError):
+        f.gm.discard_card(f.game_id, f.p1.id, *missing)
+
+def stacked_deck(*top_cards):
+    """A deck whose first cards (dealt alternately, then the rest) are given."""
+    deck = CardStack()
+    deck.add([card for card in Deck().cards if str(card) not in
+              [str(Card.from_text(text)) for text in top_cards]])
+    deck.add([Card.from_text(text) for text in reversed(top_cards)])
+    return deck
+
+@pytest.fixture
+def game_to_knock(gm_with_contestants):
+    """A game where p1 can knock after drawing the AS and discarding the KS."""
+    first = ["2C", "3C", "4C", "5S", "5H", "5D", "9H", "10H", "JH", "KS"]
+    second = ["KD", "QS", "JS", "KC", "QD", "8C", "7C", "2D", "4D", "6S"]
+    dealt = [card for pair in zip(first, second) for card in pair]
+    f = gm_with_contestants
+    f.game_id = f.gm.create_game(f.p1.id, f.p2.id,
+                                 deck=stacked_deck(*(dealt + ["QC", "AS"])))['id']
+    f.gm.acquire_card(f.game_id, f.p1.id, "draw")
+    yield f
+
+def test_knock_ends_game(game_to_knock):
+    f = game_to_knock # typographical shortcut for the fixture
+    f.gm.discard_card(f.game_id, f.p1.id, "SPADE", "KING", knock=True)
+    assert(f.gm.games[f.game_id].is_over)
+    assert(score_game(f.gm.games[f.game_id]).knocker_deadwood == 1)
+    with pytest.raises(IllegalMoveError):
+        f.gm.acquire_card(f.game_id, f.p2.id, "draw")
+
+def test_knock_over_limit_raises(game_to_knock):
+    f = game_to_knock # typographical shortcut for the fixture
+    with pytest.raises(IllegalMoveError):
+        # leaves 3C, 4C, KS and AS unmatched: 18 deadwood
+        f.gm.discard_card(f.game_id, f.p1.id, "CLUB", "TWO", knock=True)
+    assert(not f.gm.games[f.game_id].is_over)
+    status = f.gm.discard_card(f.game_id, f.p1.id, "CLUB", "TWO")
+    assert(status['current_player'] == f.p2.id)
+
+def test_wait_for_change(game_underway):
+    f = game_underway # typographical shortcut for the fixture
+    assert(f.gm.wait_for_change(f.game_id, f.p2.id, 0, timeout=0) is None)
+    f.gm.acquire_card(f.game_id, f.p1.id, "draw")
+    payload = json.loads(f.gm.wait_for_change(f.game_id, f.p2.id, 0, timeout=0))
+    assert(payload['version'] == 1)
+    assert(payload['status']['current_player'] == f.p1.id)
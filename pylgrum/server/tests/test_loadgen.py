@@ -0,0 +1,83 @@
+import pytest
+import random
+import time
+
+from pylgrum.errors import IllegalMoveError
+from pylgrum.server.game_manager import GameManager
+from pylgrum.server.loadgen import _play_games, percentile, summarize
+
+def test_percentile_of_nothing():
+    assert(percentile([], 50) is None)
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert(percentile(values, 50) == 50)
+    assert(percentile(values, 99) == 99)
+    assert(percentile(values, 100) == 100)
+    assert(percentile(values, 0) == 1)
+
+def test_percentile_small_sample():
+    assert(percentile([1, 2, 3], 50) == 2)
+    assert(percentile([1, 2, 3], 99) == 3)
+
+def test_summarize():
+    report = summarize(
+        {"GET /x": [0.002, 0.001, 0.003]},
+        {"GET /x": 1, "POST /y": 2},
+        2.0
+    )
+    assert(report["GET /x"]["requests"] == 3)
+    assert(report["GET /x"]["errors"] == 1)
+    assert(report["GET /x"]["p50_ms"] == pytest.approx(2.0))
+    assert(report["GET /x"]["requests_per_second"] == pytest.approx(1.5))
+    assert(report["POST /y"]["requests"] == 0)
+    assert(report["POST /y"]["p99_ms"] is None)
+
+class DirectClient():
+    """Serves the load generator's requests from a GameManager, without HTTP."""
+
+    def __init__(self) -> None:
+        self.gm = GameManager()
+        self.requests = []
+        self.games = []
+
+    def request(self, endpoint: str, method: str, path: str, body: dict = None):
+        try:
+            if endpoint == "POST /contestants":
+                (status, result) = (201, {"id": self.gm.add_contestant(body["name"]).id})
+            elif endpoint == "POST /games":
+                (status, result) = (201, self.gm.create_game(body["challenger_id"],
+                                                             body["opponent_id"]))
+                self.games.append(result["id"])
+            else:
+                game_id = path.split("/")[2]
+                if endpoint == "GET /games/{id}/status":
+                    result = self.gm.status_for(game_id, path.split("contestant_id=")[1])
+                elif endpoint == "POST /games/{id}/acquire":
+                    result = self.gm.acquire_card(game_id, body["contestant_id"], body["source"])
+                else:
+                    result = self.gm.discard_card(game_id, body["contestant_id"], body["suit"],
+                                                  body["card"], body["knock"])
+                (status, result) = (200, {"version": result.pop("version"), "status": result})
+        except IllegalMoveError:
+            (status, result) = (409, None)
+        self.requests.append((endpoint, status))
+        return (status, result)
+
+def test_games_are_played_to_the_end_without_errors():
+    client = DirectClient()
+    random.seed(3)
+    # a deadline far off: stop after a few games by raising from the client
+    deadline = time.monotonic() + 60
+    real_request = client.request
+    def request(endpoint, method, path, body=None):
+        if endpoint == "POST /contestants" and len(client.games) == 5:
+            raise StopIteration
+        return real_request(endpoint, method, path, body)
+    client.request = request
+    with pytest.raises(StopIteration):
+        _play_games(client, deadline, random.Random(1))
+    assert(all(status < 400 for (_, status) in client.requests))
+    games = [client.gm.games[game_id] for game_id in client.games]
+    assert(all(game.is_over for game in games))
+    assert(any(not game.draw_pile_exhausted for game in games)) # someone knocked
@@ -0,0 +1,188 @@
+import pytest
+import os
+import threading
+import time
+
+from pylgrum.errors import PylgrumInternalError
+from pylgrum.server.persistence import WriteAheadLog, PersistentGameManager
+
+@pytest.fixture
+def manager_with_game(tmp_path):
+
+    class GenericContainer():
+        pass
+
+    td = GenericContainer()
+
+    td.directory = str(tmp_path)
+    td.gm = PersistentGameManager(td.directory)
+    td.p1 = td.gm.add_contestant('p1')
+    td.p2 = td.gm.add_contestant('p2')
+    td.game_id = td.gm.create_game(td.p1.id, td.p2.id)['id']
+
+    yield td
+
+def play_a_turn(gm, game_id, contestant_id, knock=False):
+    status = gm.acquire_card(game_id, contestant_id, "draw")
+    card = status['hand'][0]
+    return gm.discard_card(game_id, contestant_id, card['suit'], card['card'], knock)
+
+def test_wal_round_trip(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    assert(wal.append({"a": 1}) == 1)
+    assert(wal.append({"b": 2}) == 2)
+    wal.close()
+    assert(list(WriteAheadLog.read(str(tmp_path))) == [(1, {"a": 1}), (2, {"b": 2})])
+    assert(list(WriteAheadLog.read(str(tmp_path), after_lsn=1)) == [(2, {"b": 2})])
+
+def test_wal_ignores_partial_record(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    wal.append({"a": 1})
+    wal.close()
+    with open(WriteAheadLog.segments(str(tmp_path))[0][1], "a") as segment:
+        segment.write('{"b":')
+    assert(list(WriteAheadLog.read(str(tmp_path))) == [(1, {"a": 1})])
+
+def test_wal_segments_continue_lsns(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    wal.append({"a": 1})
+    assert(wal.rotate() == 2)
+    wal.append({"b": 2})
+    wal.close()
+    assert([lsn for (lsn, _) in WriteAheadLog.read(str(tmp_path))] == [1, 2])
+    WriteAheadLog.drop_segments_before(str(tmp_path), 2)
+    assert(len(WriteAheadLog.segments(str(tmp_path))) == 1)
+
+def test_group_commit_shares_fsyncs(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), commit_delay=0.01)
+    def writer():
+        for i in range(10):
+            wal.commit(wal.append({"i": i}))
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(wal.last_lsn == 80)
+    assert(wal.fsync_count < 80)
+
+def test_recover_from_log(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    play_a_turn(f.gm, f.game_id, f.p1.id)
+    expected = f.gm.status_for(f.game_id, f.p2.id)
+    f.gm.close()
+
+    recovered = PersistentGameManager(f.directory)
+    assert(recovered.status_for(f.game_id, f.p2.id) == expected)
+    assert(recovered.contestants[f.p1.id].name == 'p1')
+    assert(recovered.contestants[f.p1.id].is_playing)
+
+def test_recover_from_snapshot_and_tail(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    play_a_turn(f.gm, f.game_id, f.p1.id)
+    f.gm.snapshot()
+    play_a_turn(f.gm, f.game_id, f.p2.id)
+    expected = f.gm.status_for(f.game_id, f.p1.id)
+    f.gm.close()
+
+    recovered = PersistentGameManager(f.directory)
+    assert(recovered.status_for(f.game_id, f.p1.id) == expected)
+    # recovered games keep working, and keep being logged
+    play_a_turn(recovered, f.game_id, f.p1.id)
+    expected = recovered.status_for(f.game_id, f.p2.id)
+    recovered.close()
+    assert(PersistentGameManager(f.directory).status_for(f.game_id, f.p2.id) == expected)
+
+def test_snapshot_prunes_log(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    f.gm.snapshot()
+    play_a_turn(f.gm, f.game_id, f.p1.id)
+    f.gm.snapshot()
+    names = os.listdir(f.directory)
+    assert(len([n for n in names if n.startswith("snapshot-")]) == 1)
+    assert(len([n for n in names if n.startswith("wal-")]) == 1)
+
+def test_snapshot_interval(tmp_path):
+    gm = PersistentGameManager(str(tmp_path), snapshot_interval=3)
+    for _ in range(4):
+        gm.add_contestant()
+    assert(any(n.startswith("snapshot-") for n in os.listdir(str(tmp_path))))
+    gm.close()
+    assert(len(PersistentGameManager(str(tmp_path)).list_contestants()) == 4)
+
+def test_failed_operations_are_not_logged(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    with pytest.raises(Exception):
+        f.gm.acquire_card(f.game_id, f.p2.id, "draw")
+    f.gm.close()
+    assert(len(list(WriteAheadLog.read(f.directory))) == 3)
+
+def test_moves_are_hidden_until_durable(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    version = f.gm.status_for(f.game_id, f.p2.id)['version']
+    committing = threading.Event()
+    durable = threading.Event()
+    commit = f.gm._wal.commit
+    def slow_commit(lsn=None):
+        committing.set()
+        durable.wait()
+        commit(lsn)
+    f.gm._wal.commit = slow_commit
+    mover = threading.Thread(target=f.gm.acquire_card, args=(f.game_id, f.p1.id, "draw"))
+    mover.start()
+    assert(committing.wait(5))
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(
+        f.gm.wait_for_change(f.game_id, f.p2.id, version, timeout=0)))
+    reader.start()
+    reader.join(0.2)
+    assert(reader.is_alive())
+    durable.set()
+    mover.join()
+    reader.join()
+    assert(seen[0] is not None)
+
+def test_log_failure_stops_further_changes(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    expected = f.gm.status_for(f.game_id, f.p1.id)
+    def broken_append(record):
+        raise OSError("disk full")
+    f.gm._wal.append = broken_append
+    with pytest.raises(OSError):
+        f.gm.acquire_card(f.game_id, f.p1.id, "draw")
+    with pytest.raises(PylgrumInternalError):
+        f.gm.add_contestant()
+    with pytest.raises(PylgrumInternalError):
+        f.gm.snapshot()
+    recovered = PersistentGameManager(f.directory)
+    assert(recovered.status_for(f.game_id, f.p1.id) == expected)
+
+def test_move_on_game_being_created_does_not_deadlock(manager_with_game):
+    f = manager_with_game # typographical shortcut for the fixture
+    p3 = f.gm.add_contestant('p3')
+    p4 = f.gm.add_contestant('p4')
+    published = threading.Event()
+    mover_started = threading.Event()
+
+    class PublishingFeeds(dict):
+        """Lets the mover at the new game as soon as its feed is published."""
+        def __setitem__(self, key, value):
+            super().__setitem__(key, value)
+            if key == "x":
+                published.set()
+                mover_started.wait(1)
+                time.sleep(0.05)
+    f.gm.feeds = PublishingFeeds(f.gm.feeds)
+
+    def move():
+        published.wait()
+        mover_started.set()
+        f.gm.acquire_card("x", p3.id, "draw")
+    creator = threading.Thread(target=f.gm.create_game, args=(p3.id, p4.id, "x"), daemon=True)
+    mover = threading.Thread(target=move, daemon=True)
+    mover.start()
+    creator.start()
+    creator.join(5)
+    mover.join(5)
+    assert(not creator.is_alive() and not mover.is_alive())
+    assert(len(f.gm.status_for("x", p3.id)['hand']) == 11)
@@ -0,0 +1,105 @@
+import pytest
+import uuid
+
+from pylgrum.errors import IllegalMoveError
+from pylgrum.server.sharding import HashRing, ShardedGameManager
+from pylgrum.server.errors import (ContestantAlreadyPlaying, DuplicateContestant, DuplicateGame,
+                                   InvalidContestant, InvalidGame)
+
+@pytest.fixture
+def sharded_gm():
+
+    class GenericContainer():
+        pass
+
+    td = GenericContainer()
+
+    td.gm = ShardedGameManager(num_shards=2)
+    td.players = [td.gm.add_contestant("p{}".format(i)) for i in range(8)]
+    td.game_ids = [
+        td.gm.create_game(td.players[i].id, td.players[i+1].id)['id']
+        for i in range(0, 8, 2)
+    ]
+
+    yield td
+
+    td.gm.close()
+
+def test_ring_is_deterministic():
+    ring = HashRing(range(4))
+    keys = [str(uuid.uuid4()) for _ in range(100)]
+    assert([ring.shard_for(k) for k in keys] == [HashRing(range(4)).shard_for(k) for k in keys])
+
+def test_ring_uses_all_shards():
+    ring = HashRing(range(4))
+    owners = {ring.shard_for(str(uuid.uuid4())) for _ in range(1000)}
+    assert(owners == {0, 1, 2, 3})
+
+def test_growing_ring_moves_few_keys():
+    keys = [str(uuid.uuid4()) for _ in range(2000)]
+    before = HashRing(range(4))
+    after = HashRing(range(5))
+    moved = [k for k in keys if before.shard_for(k) != after.shard_for(k)]
+    # ideal is 1/5 of keys, all of them onto the new shard
+    assert(len(moved) < len(keys) * 0.35)
+    assert(all(after.shard_for(k) == 4 for k in moved))
+
+def test_status_for(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    status = f.gm.status_for(f.game_ids[0], f.players[0].id)
+    assert(status['game_id'] == f.game_ids[0])
+    assert(len(status['hand']) == 10)
+
+def test_shard_errors_are_reraised(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    with pytest.raises(InvalidGame):
+        f.gm.status_for(str(uuid.uuid4()), f.players[0].id)
+    with pytest.raises(IllegalMoveError):
+        f.gm.acquire_card(f.game_ids[0], f.players[1].id, "draw")
+
+def test_contestants_play_one_game_across_shards(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    new_contestant = f.gm.add_contestant('new contestant')
+    with pytest.raises(ContestantAlreadyPlaying):
+        f.gm.create_game(new_contestant.id, f.players[0].id)
+    assert(not new_contestant.is_playing)
+
+def test_bogus_contestant_raises(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    with pytest.raises(InvalidContestant):
+        f.gm.create_game(f.players[0].id, str(uuid.uuid4()))
+
+def test_duplicate_ids_raise(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    with pytest.raises(DuplicateContestant):
+        f.gm.add_contestant("impostor", f.players[0].id)
+    c = f.gm.add_contestant("c")
+    d = f.gm.add_contestant("d")
+    with pytest.raises(DuplicateGame):
+        f.gm.create_game(c.id, d.id, game_id=f.game_ids[0])
+    assert(not c.is_playing and not d.is_playing)
+    assert(f.gm.status_for(f.game_ids[0], f.players[0].id)["version"] >= 0)
+
+def test_moves_are_forwarded(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    status = f.gm.acquire_card(f.game_ids[1], f.players[2].id, "draw")
+    card = status['hand'][0]
+    status = f.gm.discard_card(f.game_ids[1], f.players[2].id, card['suit'], card['card'])
+    assert(status['current_player'] == f.players[3].id)
+
+def test_resize_keeps_games(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    hands = [f.gm.status_for(g, f.players[2*i].id)['hand'] for (i, g) in enumerate(f.game_ids)]
+    f.gm.resize(3)
+    assert(f.gm.num_shards == 3)
+    f.gm.resize(1)
+    assert(f.gm.num_shards == 1)
+    for (i, game_id) in enumerate(f.game_ids):
+        assert(f.gm.status_for(game_id, f.players[2*i].id)['hand'] == hands[i])
+    # migrated games are still playable
+    f.gm.acquire_card(f.game_ids[0], f.players[0].id, "discard")
+
+def test_resize_to_one_moves_only_other_shards_games(sharded_gm):
+    f = sharded_gm # typographical shortcut for the fixture
+    on_shard_1 = [g for g in f.game_ids if f.gm.shard_for(g) == 1]
+    assert(f.gm.resize(1) == len(on_shard_1))
@@ -0,0 +1,295 @@
+"""Differential fuzzing of meld solvers against MeldDetector.
+
+Usage:
+    python -m pylgrum.solver_fuzz [--hands N] [--workers W] [--seed SEED]
+                                  [--cards C] [--mutated FRACTION]
+                                  [--max-orderings K] [--solvers NAME ...]
+
+Every registered solver is run on each of N generated hands, and the
+minimum deadwood each finds is compared. (Only the deadwood: when several
+arrangements of melds tie, solvers may correctly choose different ones.) A
+solver that raises counts as disagreeing. Each hand that solvers disagree
+on is shrunk - cards are removed one at a time for as long as the solvers
+still disagree - so it is reported along with a minimal hand that shows
+the same problem.
+
+Hands are of C cards (10 by default), either dealt at random or, for the
+given fraction of them, mutated from a random deal by repeatedly replacing
+a card with a neighbour (in rank or suit) of another, which builds up
+overlapping runs and sets. MeldDetector - the reference - takes time
+exponential in the number of overlapping melds, so hands needing more
+than K orderings of them (see `reference_orderings()`) are skipped and
+counted as such.
+
+Hands are generated and checked in chunks, spread over W worker processes
+(one per CPU by default). A chunk's hands depend only on the seed and the
+chunk's position, so a run's results don't depend on W.
+
+To check a new solver, register it with the `solver` decorator, in a module
+imported before fuzz() is called:
+
+    @solver("my_solver")
+    def my_solver(hand: int) -> int:   # hand is a bitmask of card indices
+        ...                            #  (see `pylgrum.meld_solver`)
+        return minimum_deadwood
+
+Classes:
+
+    Mismatch: a hand the solvers disagree on
+    FuzzReport: the results of a fuzzing run
+
+Functions:
+
+    solver: register a solver (decorator)
+    random_hand / mutated_hand: hand generators
+    meld_conflicts: count the overlapping melds in a hand
+    reference_orderings: how many orderings of melds MeldDetector will try
+    check_hand: run solvers on one hand
+    shrink: reduce a hand the solvers disagree on to a minimal one
+    fuzz: check many hands, in parallel
+"""
+
+import argparse
+from collections import namedtuple
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from pylgrum.card import Card
+from pylgrum.meld_detector import MeldDetector
+from pylgrum.meld_solver import MELDS_BY_CARD, deadwood_value, mask_indices, mask_to_cards
+
+SOLVERS = {}
+"""Solver name -> function from a hand's bitmask to its minimum deadwood."""
+
+REFERENCE = "meld_detector"
+"""The solver every other is checked against."""
+
+def solver(name: str):
+    """Register a function from a hand (as a bitmask) to its minimum deadwood."""
+    def register(function):
+        SOLVERS[name] = function
+        return function
+    return register
+
+@solver(REFERENCE)
+def meld_detector_deadwood(hand: int) -> int:
+    """MeldDetector's minimum deadwood for a hand."""
+    detector = MeldDetector(*mask_to_cards(hand))
+    detector.detect_optimal_melds()
+    return detector.optimal_hand.deadwood_value
+
+@solver("meld_solver")
+def meld_solver_deadwood(hand: int) -> int:
+    """`pylgrum.meld_solver`'s minimum deadwood for a hand."""
+    return deadwood_value(hand)
+
+Mismatch = namedtuple('Mismatch', ['hand', 'shrunk', 'results'])
+Mismatch.__doc__ = """A hand the solvers disagree on.
+
+Fields:
+    hand (int): the generated hand, as a bitmask
+    shrunk (int): a minimal hand (a subset of hand) they still disagree on
+    results (dict): solver name -> deadwood found for shrunk, or the
+        exception it raised (as "ExceptionType: message")
+"""
+
+FuzzReport = namedtuple('FuzzReport', ['hands', 'checked', 'skipped', 'mismatches', 'seconds'])
+FuzzReport.__doc__ = """The results of a fuzzing run.
+
+Fields:
+    hands (int): hands generated
+    checked (int): hands every solver was run on
+    skipped (int): hands skipped as too slow for the reference
+    mismatches (list): a Mismatch for each hand the solvers disagreed on
+    seconds (float): how long the run took
+"""
+
+def random_hand(rng: random.Random, cards: int = 10) -> int:
+    """Deal a random hand; return it as a bitmask."""
+    return sum(1 << index for index in rng.sample(range(52), cards))
+
+def mutated_hand(rng: random.Random, cards: int = 10, mutations: int = None) -> int:
+    """Deal a random hand, then pull it towards overlapping melds.
+
+    Each mutation replaces a random card with a card next to another one in
+    the hand: the same suit and one rank away, or the same rank in another
+    suit. The hand is returned as a bitmask.
+
+    Args:
+        rng (random.Random): the source of randomness
+        cards (int): [optional] the number of cards in the hand
+        mutations (int): [optional] how many mutations to make (by
+            default, a random number up to the number of cards)
+    """
+    hand = random_hand(rng, cards)
+    if mutations is None:
+        mutations = rng.randint(1, cards)
+    for _ in range(mutations):
+        held = mask_indices(hand)
+        (suit, rank) = divmod(rng.choice(held), 13)
+        neighbours = [suit * 13 + rank + step for step in (-1, 1) if 0 <= rank + step < 13]
+        neighbours += [other * 13 + rank for other in range(4) if other != suit]
+        into = rng.choice(neighbours)
+        if not hand >> into & 1:
+            hand ^= (1 << rng.choice(held)) | (1 << into)
+    return hand
+
+def meld_conflicts(hand: int) -> tuple:
+    """Count the melds in a hand that share cards, which make MeldDetector slow.
+
+    Returns (orderings of overlapping melds MeldDetector will try,
+    overlapping melds, complete melds). MeldDetector tries each ordering of
+    up to 3 of the complete melds that share a card with another, and its
+    time grows with their number.
+    """
+    melds = []
+    for index in mask_indices(hand):
+        for meld in MELDS_BY_CARD[index]:
+            # each meld once: from its lowest card
+            if meld & hand == meld and meld & -meld == 1 << index:
+                melds.append(meld)
+    overlapping = sum(1 for meld in melds
+                      if any(other != meld and other & meld for other in melds))
+    orderings = 1
+    for i in range(min(3, overlapping)):
+        orderings *= overlapping - i
+    return (orderings, overlapping, len(melds))
+
+def reference_orderings(hand: int) -> int:
+    """The number of orderings of overlapping melds MeldDetector will try."""
+    return meld_conflicts(hand)[0]
+
+def check_hand(hand: int, solvers: dict = None) -> dict:
+    """Run each solver on a hand.
+
+    Returns solver name -> the deadwood it found, or the exception it
+    raised (as "ExceptionType: message").
+    """
+    results = {}
+    for (name, function) in (solvers or SOLVERS).items():
+        try:
+            results[name] = function(hand)
+        except Exception as error: # pylint: disable=broad-except
+            results[name] = "{}: {}".format(type(error).__name__, error)
+    return results
+
+def _disagree(results: dict) -> bool:
+    return len(set(results.values())) > 1
+
+def shrink(hand: int, solvers: dict = None) -> tuple:
+    """Shrink a hand the solvers disagree on.
+
+    Removes one card at a time, for as long as the solvers still disagree,
+    until no single card can be removed. Returns (the shrunk hand, the
+    solvers' results for it).
+    """
+    results = check_hand(hand, solvers)
+    shrinking = True
+    while shrinking:
+        shrinking = False
+        for index in mask_indices(hand):
+            candidate = hand ^ (1 << index)
+            candidate_results = check_hand(candidate, solvers)
+            if _disagree(candidate_results):
+                (hand, results) = (candidate, candidate_results)
+                shrinking = True
+                break
+    return (hand, results)
+
+def _fuzz_chunk(job: tuple) -> tuple:
+    """Generate and check one chunk of hands; return (checked, skipped, mismatches)."""
+    (seed, chunk, hands, cards, mutated, max_orderings, solvers) = job
+    rng = random.Random("{}-{}".format(seed, chunk))
+    checked = 0
+    skipped = 0
+    mismatches = []
+    for _ in range(hands):
+        if rng.random() < mutated:
+            hand = mutated_hand(rng, cards)
+        else:
+            hand = random_hand(rng, cards)
+        if reference_orderings(hand) > max_orderings:
+            skipped += 1
+            continue
+        checked += 1
+        if _disagree(check_hand(hand, solvers)):
+            (shrunk, results) = shrink(hand, solvers)
+            mismatches.append(Mismatch(hand, shrunk, results))
+    return (checked, skipped, mismatches)
+
+def fuzz(hands: int, seed: int = 0, workers: int = None, cards: int = 10,
+         mutated: float = 0.5, max_orderings: int = 60, solvers: dict = None,
+         chunk_size: int = 1000) -> FuzzReport:
+    """Check that every solver finds the same minimum deadwood, over many hands.
+
+    Args:
+        hands (int): number of hands to generate
+        seed (int): [optional] seed for the hands
+        workers (int): [optional] number of processes to check hands in;
+            None means one per CPU. With 1, hands are checked in this process.
+        cards (int): [optional] cards in each hand
+        mutated (float): [optional] fraction of hands to mutate towards
+            overlapping melds (see mutated_hand())
+        max_orderings (int): [optional] skip hands for which MeldDetector
+            would try more orderings of melds than this
+        solvers (dict): [optional] name -> solver function, to use instead of
+            the registered SOLVERS; they must be picklable (module-level)
+            for workers > 1
+        chunk_size (int): [optional] hands generated and checked at a time
+    """
+    solvers = dict(solvers or SOLVERS)
+    workers = workers or os.cpu_count() or 1
+    jobs = [(seed, chunk, min(chunk_size, hands - start), cards, mutated, max_orderings,
+             solvers)
+            for (chunk, start) in enumerate(range(0, hands, chunk_size))]
+    started = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = [_fuzz_chunk(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_fuzz_chunk, jobs)
+    return FuzzReport(
+        hands=hands,
+        checked=sum(checked for (checked, _, _) in results),
+        skipped=sum(skipped for (_, skipped, _) in results),
+        mismatches=[mismatch for (_, _, mismatches) in results for mismatch in mismatches],
+        seconds=time.perf_counter() - started,
+    )
+
+def _cards_text(hand: int) -> list:
+    return [str(Card.from_index(index)) for index in mask_indices(hand)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--hands", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cards", type=int, default=10)
+    parser.add_argument("--mutated", type=float, default=0.5)
+    parser.add_argument("--max-orderings", type=int, default=60)
+    parser.add_argument("--solvers", nargs="*", default=None,
+                        help="solvers to compare (default: all registered)")
+    args = parser.parse_args()
+    solvers = None
+    if args.solvers:
+        solvers = {name: SOLVERS[name] for name in set(args.solvers) | {REFERENCE}}
+    report = fuzz(args.hands, args.seed, args.workers, args.cards, args.mutated,
+                  args.max_orderings, solvers)
+    print(json.dumps({
+        "hands": report.hands,
+        "checked": report.checked,
+        "skipped": report.skipped,
+        "seconds": report.seconds,
+        "mismatches": [{"hand": _cards_text(mismatch.hand),
+                        "shrunk": _cards_text(mismatch.shrunk),
+                        "results": mismatch.results}
+                       for mismatch in report.mismatches],
+    }, indent=2))
+    if report.mismatches:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
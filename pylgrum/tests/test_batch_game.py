@@ -0,0 +1,121 @@
+import pytest
+import random
+
+from pylgrum.batch_game import DRAW, TAKE, BatchGame
+from pylgrum.card import Card
+from pylgrum.errors import IllegalMoveError
+from pylgrum.game import Game
+from pylgrum.meld_solver import cards_to_mask, mask_indices
+from pylgrum.move import MoveState
+from pylgrum.player import Player
+from pylgrum.scoring import HandOutcome, score_game
+from pylgrum.stack import CardStack
+
+class ScriptedPlayer(Player):
+    """Plays the actions it is given, as a BatchGame would apply them."""
+
+    def __init__(self):
+        super().__init__()
+        self.actions = []
+
+    def turn_start(self, move):
+        if self.actions.pop(0) == DRAW:
+            move.choose_card_from_draw()
+        else:
+            move.choose_card_from_discard()
+
+    def turn_finish(self, move):
+        action = self.actions.pop(0)
+        move.knocking = action >= 52
+        move.discard(Card.from_index(action % 52))
+
+def random_actions(batch, rng):
+    actions = []
+    for legal in batch.legal_actions():
+        choices = [action for action in range(106) if legal >> action & 1]
+        # knock whenever possible, so games end either way
+        knocks = [action for action in choices if 52 <= action < 104]
+        actions.append(rng.choice(knocks or choices) if choices else None)
+    return actions
+
+def test_deal():
+    batch = BatchGame(8, seed=1)
+    for game in range(8):
+        (hand0, hand1) = (batch.hands[0][game], batch.hands[1][game])
+        assert(bin(hand0).count("1") == 10 and bin(hand1).count("1") == 10)
+        assert(not hand0 & hand1)
+        assert(len(batch.draw_piles[game]) == 31)
+        assert(len(batch.discard_piles[game]) == 1)
+    assert(batch.legal_actions() == [1 << DRAW | 1 << TAKE] * 8)
+
+def test_matches_game():
+    rng = random.Random(2)
+    decks = []
+    for _ in range(6):
+        deck = list(range(52))
+        rng.shuffle(deck)
+        decks.append(deck)
+    batch = BatchGame(6, decks=decks)
+    played = [([], []) for _ in decks]
+    while not all(batch.is_over):
+        actions = random_actions(batch, rng)
+        for (game, action) in enumerate(actions):
+            if action is not None:
+                played[game][batch.current[game]].append(action)
+        batch.step(actions)
+
+    for (game, deck) in enumerate(decks):
+        stack = CardStack()
+        for index in deck:
+            stack.add(Card.from_index(index))
+        players = (ScriptedPlayer(), ScriptedPlayer())
+        (players[0].actions, players[1].actions) = played[game]
+        g = Game(*players, deck=stack)
+        g.play()
+        assert(cards_to_mask(g.player1.hand.cards) == batch.hands[0][game])
+        assert(cards_to_mask(g.player2.hand.cards) == batch.hands[1][game])
+        assert([card.index for card in g._discards.cards] == batch.discard_piles[game])
+        assert(g.num_moves == batch.num_moves[game])
+        assert(g.draw_pile_exhausted ==
+               (batch.results[game].outcome == HandOutcome.NO_WINNER))
+        assert(score_game(g) == batch.results[game])
+
+def test_knocking_rewards():
+    batch = BatchGame(50, seed=3)
+    rng = random.Random(3)
+    total = [0] * 50
+    while not all(batch.is_over):
+        rewards = batch.step(random_actions(batch, rng))
+        total = [t + r for (t, r) in zip(total, rewards)]
+    assert(total == batch.rewards)
+    assert(any(total))
+    for game in range(50):
+        result = batch.results[game]
+        if result.outcome == HandOutcome.NO_WINNER:
+            assert(total[game] == 0)
+
+def test_only_legal_knocks():
+    batch = BatchGame(20, seed=4)
+    batch.step([DRAW] * 20)
+    for (game, legal) in enumerate(batch.legal_actions()):
+        hand = batch.hands[0][game]
+        assert(legal & ((1 << 52) - 1) == hand)
+        for index in mask_indices(legal >> 52):
+            assert(hand >> index & 1)
+
+def test_illegal_action_changes_nothing():
+    batch = BatchGame(2, seed=5)
+    hands = [list(batch.hands[0]), list(batch.hands[1])]
+    with pytest.raises(IllegalMoveError):
+        batch.step([DRAW, 3])
+    with pytest.raises(IllegalMoveError):
+        batch.step([DRAW, -1])
+    assert(batch.hands == hands)
+    assert(batch.state == [MoveState.NEW, MoveState.NEW])
+
+def test_reset():
+    batch = BatchGame(2, seed=6)
+    batch.step([DRAW, TAKE])
+    batch.reset(1)
+    assert(batch.state == [MoveState.IN_PROGRESS, MoveState.NEW])
+    assert(bin(batch.hands[0][1]).count("1") == 10)
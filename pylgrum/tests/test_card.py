@@ -1,4 +1,5 @@
 import unittest
+import pickle
 from pylgrum.card import Suit, Rank, Card
 
 class TestCard(unittest.TestCase):
@@ -176,5 +177,23 @@ class TestCard(unittest.TestCase):
             print("expect {} to match {}".format(cards[i], expected[i]))
             self.assertTrue(cards[i].is_same_card(expected[i]))
 
+    def test_card_index(self):
+        self.assertEqual(Card(rank=Rank.ACE, suit=Suit.DIAMOND).index, 0)
+        self.assertEqual(Card(rank=Rank.KING, suit=Suit.DIAMOND).index, 12)
+        self.assertEqual(Card(rank=Rank.ACE, suit=Suit.CLUB).index, 13)
+        self.assertEqual(Card(rank=Rank.KING, suit=Suit.SPADE).index, 51)
+
+    def test_card_index_round_trip(self):
+        for i in range(52):
+            self.assertEqual(Card.from_index(i).index, i)
+
+    def test_card_index_follows_card_order(self):
+        cards = [Card.from_index(i) for i in range(52)]
+        self.assertEqual(cards, sorted(cards))
+
+    def test_pickled_card_is_shared_instance(self):
+        card = Card(rank=Rank.QUEEN, suit=Suit.HEART)
+        self.assertIs(pickle.loads(pickle.dumps(card)), Card.from_index(card.index))
+
 if __name__ == '__main__':
     unittest.main()
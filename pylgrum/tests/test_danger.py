@@ -0,0 +1,121 @@
+import pytest
+
+from pylgrum.card import Card
+from pylgrum.deck import Deck
+from pylgrum.stack import CardStack
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.knowledge import KnowledgeTracker
+from pylgrum.danger import TRIPLES, TRIPLES_BY_CARD, DangerTable
+from pylgrum.search import finish_actions
+
+class WatchfulPlayer(GreedyPlayer):
+    def join_game(self, game):
+        super().join_game(game)
+        self.knowledge = KnowledgeTracker(self)
+        self.knowledge.watch(game)
+        self.danger = DangerTable(self.knowledge)
+
+def index(card_string):
+    return Card.from_text(card_string).index
+
+def stacked_deck(*top_cards):
+    """A deck whose first cards (dealt alternately, then the up-card) are given."""
+    deck = CardStack()
+    rest = [card for card in Deck().cards if str(card) not in
+            [str(Card.from_text(text)) for text in top_cards]]
+    for card in rest:
+        deck.add(card)
+    for text in reversed(top_cards):
+        deck.add(Card.from_text(text))
+    return deck
+
+@pytest.fixture
+def game():
+    """Player 1 will see 7H come up; player 2 holds hearts and clubs."""
+    p1_cards = ["2S", "3S", "4S", "9D", "10D", "JD", "KS", "KD", "QS", "5C"]
+    p2_cards = ["AH", "2H", "3H", "8C", "9C", "10C", "AS", "AD", "QC", "4D"]
+    dealt = []
+    for (p1_card, p2_card) in zip(p1_cards, p2_cards):
+        dealt.extend([p1_card, p2_card])
+    deck = stacked_deck(*(dealt + ["7H"]))
+    yield Game(WatchfulPlayer(), WatchfulPlayer(), deck=deck)
+
+def test_triples():
+    assert(len(TRIPLES) == 4 * 11 + 13 * 4)
+    for index in range(52):
+        assert(len(TRIPLES_BY_CARD[index]) <= 6)
+        for number in TRIPLES_BY_CARD[index]:
+            assert(index in TRIPLES[number])
+
+def test_unseen_partners_give_some_danger(game):
+    f = game # typographical shortcut for the fixture
+    table = f.player1.danger.table()
+    # 3H-4H-5H, 4H-5H-6H and 5D-5H-5S might be the opponent's (5C is held)
+    assert(table[index("5H")] > 0)
+    # only JH-QH-KH might be (KS and KD are held)
+    assert(0 < table[index("KH")] < table[index("5H")])
+    assert(f.player1.danger.danger(index("KH")) == table[index("KH")])
+
+def test_opponent_taking_a_card_raises_danger(game):
+    f = game # typographical shortcut for the fixture
+    before = f.player1.danger.table()
+    f.start_new_move()
+    f.current_move.choose_card_from_draw()
+    f.acquire_card()
+    f.current_move.discard(Card.from_text("5C"))
+    f.finalize_move()
+    f.next_turn()
+    f.start_new_move()
+    f.current_move.choose_card_from_discard() # player 2 takes the 5C
+    f.acquire_card()
+    f.current_move.discard(Card.from_text("QC"))
+    f.finalize_move()
+    after = f.player1.danger.table()
+    assert(after[index("5D")] > before[index("5D")])
+    assert(after[index("6C")] > before[index("6C")])
+
+def test_opponent_passing_lowers_danger(game):
+    f = game # typographical shortcut for the fixture
+    f.start_new_move()
+    f.current_move.choose_card_from_draw()
+    f.acquire_card()
+    f.current_move.discard(Card.from_text("5C"))
+    f.finalize_move()
+    f.next_turn()
+    before = f.player1.danger.table()
+    f.start_new_move()
+    f.current_move.choose_card_from_draw() # player 2 passes on the 5C
+    f.acquire_card()
+    f.current_move.discard(f.player2.hand.cards[-1])
+    f.finalize_move()
+    after = f.player1.danger.table()
+    assert(after[index("6C")] < before[index("6C")])
+    assert(after[index("5D")] < before[index("5D")])
+
+def test_incremental_matches_rebuild():
+    for _ in range(10):
+        g = Game(WatchfulPlayer(), WatchfulPlayer())
+        g.play()
+        for player in (g.player1, g.player2):
+            rebuilt = DangerTable(player.knowledge).table()
+            for (incremental, fresh) in zip(player.danger.table(), rebuilt):
+                assert(incremental == pytest.approx(fresh))
+
+def test_new_game_rebuilds_table(game):
+    f = game # typographical shortcut for the fixture
+    player = f.player1
+    player.danger.table()
+    player.reset_hand()
+    g = Game(player, WatchfulPlayer())
+    assert(player.danger.table() == DangerTable(player.knowledge).table())
+
+def test_finish_actions_prefers_safe_discards():
+    hand = sum(1 << index(card) for card in
+               ("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "KC", "KH"))
+    danger = [0.0] * 52
+    danger[index("KH")] = 1.0
+    assert(finish_actions(hand)[0][0] == index("KC")) # no danger: either king
+    assert(finish_actions(hand, danger=danger)[0][0] == index("KC"))
+    danger[index("KC")] = 2.0
+    assert(finish_actions(hand, danger=danger)[0][0] == index("KH"))
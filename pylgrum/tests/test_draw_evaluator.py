@@ -0,0 +1,61 @@
+import pytest
+import random
+
+from pylgrum.card import Card
+from pylgrum.draw_evaluator import evaluate_draw, meld_completing_cards
+from pylgrum.meld_solver import best_discard
+
+def mask(*card_strings):
+    return sum(1 << Card.from_text(card).index for card in card_strings)
+
+def index(card_string):
+    return Card.from_text(card_string).index
+
+@pytest.fixture
+def hand():
+    """3 melds, plus the 4C (4 points of deadwood)."""
+    yield mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C")
+
+def test_meld_completing_cards(hand):
+    f = hand # typographical shortcut for the fixture
+    completing = meld_completing_cards(f)
+    for card in ("2D", "3D", "7D", "8S", "QS", "3C"):
+        assert(completing >> index(card) & 1)
+    for card in ("KH", "AD", "5C"):
+        assert(not completing >> index(card) & 1)
+
+def test_take_value(hand):
+    f = hand # typographical shortcut for the fixture
+    assert(evaluate_draw(f, index("3C"), 0).take == 2) # 2C-3C-4C, then drop a 2
+    assert(evaluate_draw(f, index("KH"), 0).take == 10)
+    assert(evaluate_draw(f, -1, 0).take is None)
+
+def test_draw_values(hand):
+    f = hand # typographical shortcut for the fixture
+    unknown = mask("KH", "AD", "3C", "QS")
+    evaluation = evaluate_draw(f, -1, unknown)
+    assert(evaluation.by_card == {
+        index("KH"): 4,  # throw it back
+        index("AD"): 1,  # keep it instead of the 4C
+        index("3C"): 2,  # 2C-3C-4C, then drop the 2S or 2H
+        index("QS"): 0,  # gin
+    })
+    assert(evaluation.draw_expected == (4 + 1 + 2 + 0) / 4)
+    assert(evaluation.draw_distribution == {0: 0.25, 1: 0.25, 2: 0.25, 4: 0.25})
+
+def test_nothing_to_draw(hand):
+    f = hand # typographical shortcut for the fixture
+    evaluation = evaluate_draw(f, index("KH"), 0)
+    assert(evaluation.draw_expected is None)
+    assert(evaluation.draw_distribution == {})
+
+def test_matches_full_search():
+    rng = random.Random(7)
+    for _ in range(100):
+        cards = list(range(52))
+        rng.shuffle(cards)
+        hand = sum(1 << card for card in cards[:10])
+        unknown = sum(1 << card for card in cards[11:42])
+        evaluation = evaluate_draw(hand, cards[10], unknown)
+        for card in cards[11:42]:
+            assert(evaluation.by_card[card] == best_discard(hand | 1 << card)[0])
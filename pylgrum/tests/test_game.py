@@ -2,6 +2,7 @@ import unittest
 from unittest import skip
 from pylgrum.game import Game
 from pylgrum.player import Player
+from pylgrum.greedy_player import GreedyPlayer
 
 class TestGame(unittest.TestCase):
 
@@ -38,12 +39,25 @@ class TestGame(unittest.TestCase):
 
     def test_next_turn(self):
         self.assertEqual(self.g.player1, self.g._current_player)
+        self.assertEqual(self.g.num_moves, 0)
         self.g.next_turn()
         self.assertEqual(self.g.player2, self.g._current_player)
+        self.assertEqual(self.g.num_moves, 1)
 
-    @skip("Cannot implement play test yet - need computer player.")
     def test_play(self):
-        self.assertTrue(False)
+        g = Game(GreedyPlayer(), GreedyPlayer())
+        g.play()
+        self.assertTrue(g.is_over)
+        if not g.draw_pile_exhausted:
+            self.assertTrue(g.current_move.knocking)
+
+    def test_game_ends_when_draw_pile_runs_out(self):
+        while self.g._deck.size() > Game.DRAW_PILE_MINIMUM:
+            self.g._draw()
+        self.assertFalse(self.g.is_over)
+        self.g.next_turn()
+        self.assertTrue(self.g.is_over)
+        self.assertTrue(self.g.draw_pile_exhausted)
 
 if __name__ == '__main__':
     unittest.main()
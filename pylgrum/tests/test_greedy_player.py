@@ -0,0 +1,63 @@
+import pytest
+
+from pylgrum.card import Card
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.move import Move, MoveState, CardSource
+
+@pytest.fixture
+def player_with_hand():
+    """A hand with 3 melds and 4 points of deadwood (the 4C)."""
+    player = GreedyPlayer()
+    for card in Card.from_text(
+        "2C", "2S", "2H", "4D", "5D",
+        "6D", "9S", "10S", "JS", "4C"
+    ):
+        player.receive_card(card)
+    yield player
+
+def test_takes_discard_that_helps(player_with_hand):
+    move = Move(Card.from_text("3C"))
+    player_with_hand.turn_start(move)
+    assert(move.card_source == CardSource.DISCARD_STACK)
+
+def test_draws_when_discard_does_not_help(player_with_hand):
+    move = Move(Card.from_text("KH"))
+    player_with_hand.turn_start(move)
+    assert(move.card_source == CardSource.DRAW_STACK)
+
+def test_discards_worst_card_and_knocks(player_with_hand):
+    move = Move(Card.from_text("KH"))
+    move.choose_card_from_draw()
+    move.acquired = Card.from_text("QH")
+    player_with_hand.receive_card(move.acquired)
+    player_with_hand.turn_finish(move)
+    assert(move.state == MoveState.COMPLETE)
+    assert(move.discarded == Card.from_text("QH"))
+    assert(move.knocking)
+
+def test_does_not_discard_card_taken_from_discard_pile(player_with_hand):
+    move = Move(Card.from_text("KH"))
+    move.choose_card_from_discard()
+    move.acquired = Card.from_text("KH")
+    player_with_hand.receive_card(move.acquired)
+    player_with_hand.turn_finish(move)
+    assert(move.discarded == Card.from_text("4C"))
+
+def test_does_not_knock_with_too_much_deadwood():
+    player = GreedyPlayer()
+    for card in Card.from_text(
+        "2C", "4S", "6H", "8D", "10C",
+        "QS", "KH", "AD", "3C", "5S", "7H"
+    ):
+        player.receive_card(card)
+    move = Move(Card.from_text("9D"))
+    move.choose_card_from_draw()
+    move.acquired = Card.from_text("7H")
+    player.turn_finish(move)
+    assert(not move.knocking)
+
+def test_greedy_game_finishes():
+    game = Game(GreedyPlayer(), GreedyPlayer())
+    game.play()
+    assert(game.is_over)
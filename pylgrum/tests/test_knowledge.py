@@ -0,0 +1,122 @@
+import pytest
+
+from pylgrum.card import Card
+from pylgrum.game import Game
+from pylgrum.player import Player
+from pylgrum.knowledge import KnowledgeChange, KnowledgeTracker
+
+class TrackingPlayer(Player):
+    def join_game(self, game):
+        super().join_game(game)
+        self.knowledge = KnowledgeTracker(self)
+        self.knowledge.watch(game)
+
+def mask(cards):
+    return sum(1 << card.index for card in cards)
+
+@pytest.fixture
+def game():
+    """A game between two players that track their knowledge."""
+    game = Game(TrackingPlayer(), TrackingPlayer())
+    game.changes = []
+    game.player2.knowledge.add_listener(
+        lambda tracker, change, index: game.changes.append((change, index)))
+    yield game
+
+def play(game, from_discard: bool, discard: Card = None):
+    """Play a move for the current player; discard the first card by default."""
+    game.start_new_move()
+    if from_discard:
+        game.current_move.choose_card_from_discard()
+    else:
+        game.current_move.choose_card_from_draw()
+    game.acquire_card()
+    if discard is None:
+        discard = game.current_player.hand.cards[0]
+    game.current_move.discard(discard)
+    game.finalize_move()
+    game.next_turn()
+    return discard
+
+def test_start(game):
+    f = game # typographical shortcut for the fixture
+    tracker = f.player1.knowledge
+    assert(not tracker.started)
+    tracker.start()
+    assert(tracker.own == mask(f.player1.hand.cards))
+    assert(tracker.top == f.visible_discard.index)
+    assert(tracker.discard_pile == 1 << tracker.top)
+    assert(tracker.dead == 0)
+    assert(tracker.draw_pile_size == 31)
+    assert(bin(tracker.unknown).count("1") == 52 - 11)
+
+def test_opponent_draws(game):
+    f = game # typographical shortcut for the fixture
+    up_card = f.visible_discard
+    discard = play(f, from_discard=False)
+    tracker = f.player2.knowledge
+    assert(tracker.opponent_declined == 1 << up_card.index)
+    assert(tracker.opponent_discarded == 1 << discard.index)
+    assert(tracker.top == discard.index)
+    assert(tracker.dead == 1 << up_card.index)
+    assert(not tracker.is_live(up_card.index))
+    assert(tracker.is_live(discard.index))
+    assert(tracker.draw_pile_size == 30)
+    assert(tracker.opponent_known == 0)
+    assert(f.changes == [(KnowledgeChange.OPPONENT_DREW, up_card.index),
+                         (KnowledgeChange.OPPONENT_DISCARDED, discard.index)])
+
+def test_opponent_takes_discard(game):
+    f = game # typographical shortcut for the fixture
+    up_card = f.visible_discard
+    discard = play(f, from_discard=True, discard=f.player1.hand.cards[0])
+    tracker = f.player2.knowledge
+    assert(tracker.opponent_known == 1 << up_card.index)
+    assert(tracker.discard_pile == 1 << discard.index)
+    assert(tracker.opponent_unknown_count == 9)
+    assert(tracker.draw_pile_size == 31)
+    assert(not tracker.unknown >> up_card.index & 1)
+    assert(f.changes[0] == (KnowledgeChange.OPPONENT_TOOK, up_card.index))
+
+    # and then discards it again
+    play(f, from_discard=False)
+    play(f, from_discard=False, discard=up_card)
+    assert(tracker.opponent_known == 0)
+
+def test_own_moves(game):
+    f = game # typographical shortcut for the fixture
+    play(f, from_discard=False)
+    taken = f.visible_discard
+    discard = play(f, from_discard=True, discard=f.player2.hand.cards[0])
+    tracker = f.player2.knowledge
+    assert(tracker.own == mask(f.player2.hand.cards))
+    assert(tracker.own >> taken.index & 1)
+    assert(tracker.top == discard.index)
+    assert(f.changes[2:] == [(KnowledgeChange.OWN_ACQUIRED, taken.index),
+                             (KnowledgeChange.OWN_DISCARDED, discard.index)])
+
+def test_sets_stay_consistent(game):
+    f = game # typographical shortcut for the fixture
+    for turn in range(20):
+        play(f, from_discard=turn % 3 == 0)
+        for player in (f.player1, f.player2):
+            tracker = player.knowledge
+            assert(tracker.own == mask(player.hand.cards))
+            assert(tracker.discard_pile == mask(f._discards.cards))
+            assert(tracker.draw_pile_size == f._deck.size())
+            assert(tracker.own & tracker.opponent_known == 0)
+            assert(tracker.own & tracker.discard_pile == 0)
+            assert(bin(tracker.unknown).count("1") ==
+                   tracker.draw_pile_size + tracker.opponent_unknown_count)
+        if f.is_over:
+            break
+
+def test_watch_new_game(game):
+    f = game # typographical shortcut for the fixture
+    tracker = f.player1.knowledge
+    play(f, from_discard=False)
+    g = Game(Player(), Player())
+    tracker.watch(g)
+    assert(not tracker.started)
+    assert(tracker.opponent_discarded == 0)
+    assert(tracker.observe not in f._listeners)
@@ -0,0 +1,131 @@
+import random
+
+from pylgrum.card import Card
+from pylgrum.meld import Meld
+from pylgrum.meld_detector import MeldDetector
+from pylgrum.meld_solver import ALL_MELDS, mask_indices, optimal_melds
+from pylgrum.layoff import best_layoffs, layoff_options, solve_layoffs
+
+def mask(*card_strings):
+    return sum(1 << Card.from_text(card).index for card in card_strings)
+
+def brute_force(hand: int, knocker_melds: tuple) -> int:
+    """Minimum deadwood over every subset of hand that could be laid off."""
+    cards = mask_indices(hand)
+    best = None
+    for subset in range(1 << len(cards)):
+        layoffs = sum(1 << cards[i] for i in range(len(cards)) if subset >> i & 1)
+        if _can_lay_off(layoffs, knocker_melds):
+            deadwood = optimal_melds(hand & ~layoffs)[0]
+            best = deadwood if best is None else min(best, deadwood)
+    return best
+
+def _can_lay_off(layoffs: int, knocker_melds: tuple) -> bool:
+    melds = list(knocker_melds)
+    remaining = layoffs
+    progress = True
+    while remaining and progress:
+        progress = False
+        for index in mask_indices(remaining):
+            for (i, meld) in enumerate(melds):
+                suits = {card // 13 for card in mask_indices(meld)}
+                low = min(mask_indices(meld))
+                high = max(mask_indices(meld))
+                if len(suits) > 1:
+                    fits = index % 13 == low % 13 and len(mask_indices(meld)) == 3
+                else:
+                    fits = index // 13 == low // 13 and index in (low - 1, high + 1)
+                if fits:
+                    melds[i] = meld | 1 << index
+                    remaining &= ~(1 << index)
+                    progress = True
+                    break
+    return remaining == 0
+
+def test_layoff_options_for_set():
+    meld = mask("7C", "7D", "7H")
+    assert(layoff_options(meld, mask("7S", "2C")) == [0, mask("7S")])
+    assert(layoff_options(meld, mask("8S", "2C")) == [0])
+    assert(layoff_options(mask("7C", "7D", "7H", "7S"), mask("8S")) == [0])
+
+def test_layoff_options_for_run():
+    meld = mask("4H", "5H", "6H")
+    options = layoff_options(meld, mask("2H", "3H", "7H", "9H", "7S"))
+    assert(sorted(options) == sorted([
+        0, mask("3H"), mask("2H", "3H"),
+        mask("7H"), mask("3H", "7H"), mask("2H", "3H", "7H"),
+    ]))
+
+def test_layoff_options_at_ends_of_suit():
+    assert(layoff_options(mask("AH", "2H", "3H"), mask("KD")) == [0])
+    assert(layoff_options(mask("JD", "QD", "KD"), mask("AH", "10D")) == [0, mask("10D")])
+
+def test_simple_layoff():
+    knocker = (mask("4H", "5H", "6H"), mask("9C", "9D", "9S"))
+    hand = mask("7H", "8H", "9H", "KC", "KD", "2S", "3C", "QS", "JD", "AC")
+    result = best_layoffs(hand, knocker)
+    # 7H-8H-9H is a meld, and no layoffs beat keeping it
+    assert(result.deadwood == 10 + 10 + 2 + 3 + 10 + 10 + 1)
+    assert(result.layoffs == 0)
+
+def test_layoff_beats_own_meld():
+    # 7H could go in 7H-8H-... but laying it off frees 8H for 8D-8H-8S
+    knocker = (mask("4H", "5H", "6H"), mask("9C", "9D", "9S"))
+    hand = mask("7H", "8H", "8S", "8D", "KC", "KD", "2S", "QS", "JD", "AC")
+    result = best_layoffs(hand, knocker)
+    assert(result.deadwood == 10 + 10 + 2 + 10 + 10 + 1)
+    assert(result.deadwood == brute_force(hand, knocker))
+    assert(result.layoffs == mask("7H"))
+    assert(result.melds == (mask("8H", "8S", "8D"),))
+
+def test_ties_prefer_fewer_layoffs():
+    knocker = (mask("4H", "5H", "6H"),)
+    hand = mask("7H", "8H", "9H", "10H", "KC", "KD", "2S", "QS", "JD", "AC")
+    result = best_layoffs(hand, knocker)
+    assert(result.layoffs == 0)
+    assert(result.melds == (mask("7H", "8H", "9H", "10H"),))
+
+def test_own_meld_beats_layoff():
+    # the 7S could be the set's 4th card, but 5S-6S-7S is worth more
+    knocker = (mask("7C", "7D", "7H"), mask("JC", "QC", "KC"))
+    hand = mask("5S", "6S", "7S", "2D", "3D", "9H", "AS", "4C", "8D", "KH")
+    result = best_layoffs(hand, knocker)
+    assert(result.deadwood == brute_force(hand, knocker))
+    assert(mask("5S", "6S", "7S") in result.melds)
+
+def test_matches_brute_force():
+    rng = random.Random(11)
+    for _ in range(40):
+        cards = list(range(52))
+        rng.shuffle(cards)
+        knocker_hand = 0
+        knocker_melds = []
+        for meld in rng.sample(ALL_MELDS, 20):
+            if len(knocker_melds) < 3 and not meld & knocker_hand \
+                    and bin(knocker_hand | meld).count("1") <= 10:
+                knocker_melds.append(meld)
+                knocker_hand |= meld
+        # favor cards next to the knocker's melds, to make layoffs likely
+        near = [c for c in range(52) if not knocker_hand >> c & 1 and any(
+            abs(c - m) == 1 or (c - m) % 13 == 0 for m in mask_indices(knocker_hand))]
+        rest = [c for c in cards if not knocker_hand >> c & 1 and c not in near]
+        chosen = rng.sample(near, min(6, len(near)))
+        chosen += rng.sample(rest, 10 - len(chosen))
+        hand = sum(1 << c for c in chosen)
+        result = best_layoffs(hand, tuple(knocker_melds))
+        assert(result.deadwood == brute_force(hand, tuple(knocker_melds)))
+        assert(result.layoffs & hand == result.layoffs)
+        for meld in result.melds:
+            assert(meld & result.layoffs == 0)
+
+def test_solve_layoffs_with_meld_detector():
+    knocker = MeldDetector(*[Card.from_text(c) for c in
+                             ("4H", "5H", "6H", "9C", "9D", "9S", "AS", "2S", "3S", "KC")])
+    knocker.detect_optimal_melds()
+    knocker_melds = [meld for meld in knocker.optimal_hand.melds if meld.complete]
+    hand = [Card.from_text(c) for c in
+            ("7H", "8H", "8S", "8D", "KD", "KH", "2D", "QS", "JD", "AC")]
+    result = solve_layoffs(hand, knocker_melds)
+    assert(result.deadwood == 10 + 10 + 2 + 10 + 10 + 1)
+    assert(result.layoffs == [Card.from_text("7H")])
+    assert(result.melds == (Meld(*[Card.from_text(c) for c in ("8H", "8S", "8D")]),))
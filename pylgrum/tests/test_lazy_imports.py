@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+import pylgrum
+import pylgrum.server
+import pylgrum.tui
+
+def _imported_by(statement: str) -> set:
+    """The modules a statement imports, in a fresh interpreter."""
+    code = ("import sys; before = set(sys.modules); {}; "
+            "print(' '.join(set(sys.modules) - before))").format(statement)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True)
+    return set(result.stdout.split())
+
+def test_card_imports_nothing_else():
+    assert({m for m in _imported_by("import pylgrum.card") if m.startswith("pylgrum")} ==
+           {"pylgrum", "pylgrum.card"})
+
+def test_scoring_does_not_import_game_engine():
+    imported = _imported_by("import pylgrum.scoring")
+    for module in ("pylgrum.game", "pylgrum.player", "pylgrum.server", "multiprocessing"):
+        assert(module not in imported)
+
+def test_server_package_imports_lazily():
+    imported = _imported_by("import pylgrum.server")
+    assert("pylgrum.server.game_manager" not in imported)
+    assert("uuid" not in imported)
+
+def test_top_level_classes_are_lazy():
+    imported = _imported_by("import pylgrum; pylgrum.Card")
+    assert("pylgrum.card" in imported)
+    assert("pylgrum.game" not in imported)
+
+def test_lazy_submodules():
+    imported = _imported_by("import pylgrum; pylgrum.meld_solver.deadwood_value(0)")
+    assert("pylgrum.meld_solver" in imported)
+    assert("pylgrum.server" not in imported)
+    assert("meld_solver" in dir(pylgrum))
+
+def test_lazy_classes():
+    from pylgrum.card import Card
+    from pylgrum.meld_detector import MeldDetector
+    from pylgrum.server.game_manager import GameManager
+    from pylgrum.tui.game import TUIGame
+    assert(pylgrum.Card is Card)
+    assert(pylgrum.MeldDetector is MeldDetector)
+    assert("SearchPlayer" in dir(pylgrum))
+    assert(pylgrum.server.GameManager is GameManager)
+    assert(pylgrum.tui.TUIGame is TUIGame)
+    assert("ShardedGameManager" in dir(pylgrum.server))
+
+@pytest.mark.parametrize("package", [pylgrum, pylgrum.server, pylgrum.tui])
+def test_unknown_attribute(package):
+    with pytest.raises(AttributeError):
+        package.no_such_thing # pylint: disable=pointless-statement
@@ -0,0 +1,128 @@
+import itertools
+import pytest
+import random
+
+from pylgrum.card import Card
+from pylgrum.deck import Deck
+from pylgrum.meld_detector import MeldDetector
+from pylgrum.meld_solver import (ALL_MELDS, MELDS_BY_CARD, best_discard, cache_clear,
+                                 cache_info, canonical_mask, canonical_suits, cards_to_mask,
+                                 deadwood_value, mask_points, mask_to_cards, optimal_melds,
+                                 restore_suits)
+
+def mask(*card_strings):
+    return cards_to_mask(Card.from_text(card) for card in card_strings)
+
+def test_number_of_possible_melds():
+    # per suit: 11 runs of 3, 10 of 4, ... 1 of 13; per rank: 4 sets of 3, 1 of 4
+    assert(len(ALL_MELDS) == 4 * sum(range(1, 12)) + 13 * 5)
+    assert(len(set(ALL_MELDS)) == len(ALL_MELDS))
+
+def test_melds_by_card():
+    seven_h = Card.from_text("7H").index
+    for meld in MELDS_BY_CARD[seven_h]:
+        assert(meld >> seven_h & 1)
+
+def test_mask_round_trip():
+    cards = Card.from_text("AD", "10C", "KS")
+    assert(mask_to_cards(cards_to_mask(cards)) == cards)
+
+def test_mask_points():
+    assert(mask_points(mask("AD", "10C", "KS", "5H")) == 26)
+
+def test_simple_hand():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C")
+    (deadwood, melds) = optimal_melds(hand)
+    assert(deadwood == 4)
+    assert(len(melds) == 3)
+
+def test_overlapping_hand():
+    # see test_optimal_meld_scenario_3 in test_meld_detector
+    hand = mask("10S", "9S", "8S", "9H", "8H", "9C", "8C", "7C", "9D", "JS")
+    (deadwood, melds) = optimal_melds(hand)
+    assert(deadwood == 7)
+    assert(set(melds) == {mask("9H", "9C", "9D"), mask("8H", "8C", "8S"),
+                          mask("9S", "10S", "JS")})
+
+def test_gin_hand():
+    hand = mask("4S", "3S", "2S", "AS", "3H", "2H", "AH", "4D", "3D", "2D")
+    assert(deadwood_value(hand) == 0)
+
+def test_melds_do_not_share_cards():
+    hand = mask("2C", "2S", "2H", "2D", "3D", "4D", "5D", "3S", "3C", "AC")
+    (deadwood, melds) = optimal_melds(hand)
+    assert(deadwood == 3)
+    used = 0
+    for meld in melds:
+        assert(used & meld == 0)
+        used |= meld
+
+def test_agrees_with_meld_detector():
+    rng = random.Random(42)
+    deck = Deck().cards
+    for _ in range(50):
+        cards = rng.sample(deck, 10)
+        detector = MeldDetector(*cards)
+        detector.detect_optimal_melds()
+        assert(deadwood_value(cards_to_mask(cards)) == detector.optimal_hand.deadwood_value)
+
+def test_best_discard():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH")
+    (deadwood, discard) = best_discard(hand)
+    assert(deadwood == 4)
+    assert(Card.from_index(discard) == Card.from_text("KH"))
+
+def test_best_discard_breaks_ties_by_points():
+    # discarding either end of the 5-card run leaves no deadwood
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "7D", "8D", "9S", "10S", "JS")
+    (deadwood, discard) = best_discard(hand)
+    assert(deadwood == 0)
+    assert(Card.from_index(discard) == Card.from_text("8D"))
+
+def test_best_discard_respects_keep():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH")
+    (deadwood, discard) = best_discard(hand, keep=mask("KH"))
+    assert(deadwood == 10)
+    assert(Card.from_index(discard) == Card.from_text("4C"))
+
+def _permute_suits(hand, permutation):
+    return sum(((hand >> (13 * suit)) & 0x1FFF) << (13 * permutation[suit]) for suit in range(4))
+
+def test_canonical_mask_is_shared_by_suit_permutations():
+    hand = mask("AD", "2D", "3D", "7C", "7H", "7S", "QS", "KH", "9C", "4D")
+    forms = {canonical_mask(_permute_suits(hand, p)) for p in itertools.permutations(range(4))}
+    assert(forms == {canonical_mask(hand)})
+    assert(canonical_mask(canonical_mask(hand)) == canonical_mask(hand))
+
+def test_restore_suits_undoes_canonical_suits():
+    rng = random.Random(7)
+    for _ in range(200):
+        hand = sum(1 << index for index in rng.sample(range(52), 10))
+        (canonical, order) = canonical_suits(hand)
+        assert(canonical == canonical_mask(hand))
+        assert(restore_suits(canonical, order) == hand)
+
+def test_optimal_melds_of_permuted_hands():
+    hand = mask("AD", "2D", "3D", "7C", "7H", "7S", "QS", "KH", "9C", "4D")
+    (deadwood, _) = optimal_melds(hand)
+    for permutation in itertools.permutations(range(4)):
+        permuted = _permute_suits(hand, permutation)
+        (permuted_deadwood, melds) = optimal_melds(permuted)
+        assert(permuted_deadwood == deadwood)
+        used = 0
+        for meld in melds:
+            assert(meld in ALL_MELDS)
+            assert(meld & permuted == meld and not meld & used)
+            used |= meld
+        assert(mask_points(permuted & ~used) == deadwood)
+
+def test_cache_is_shared_by_suit_permutations():
+    hand = mask("AD", "2D", "3D", "7C", "7H", "7S", "QS", "KH", "9C", "4D")
+    cache_clear()
+    optimal_melds(hand)
+    solved = cache_info()["deadwood"].currsize
+    for permutation in itertools.permutations(range(4)):
+        optimal_melds(_permute_suits(hand, permutation))
+    assert(cache_info()["deadwood"].currsize == solved)
+    assert(cache_info()["melds"].currsize == 1)
+
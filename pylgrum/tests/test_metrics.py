@@ -0,0 +1,89 @@
+import pytest
+
+from pylgrum.metrics import Histogram, MetricsRegistry, REGISTRY, instrumented
+from pylgrum.server.game_manager import GameManager
+
+@pytest.fixture
+def registry():
+    yield MetricsRegistry()
+
+@pytest.fixture
+def enabled_global_registry():
+    REGISTRY.reset()
+    REGISTRY.enable()
+    yield REGISTRY
+    REGISTRY.disable()
+    REGISTRY.reset()
+
+def test_histogram_buckets():
+    h = Histogram("h", bounds=(1, 2, 4))
+    for value in (0.5, 1, 1.5, 3, 10):
+        h.observe(value)
+    assert(h.counts == [2, 1, 1, 1])
+    assert(h.count == 5)
+    assert(h.total == pytest.approx(16))
+
+def test_histogram_exposition_is_cumulative():
+    h = Histogram("h", "help text", bounds=(1, 2))
+    for value in (0.5, 1.5, 3):
+        h.observe(value)
+    text = h.exposition()
+    assert('h_seconds_bucket{le="1"} 1' in text)
+    assert('h_seconds_bucket{le="2"} 2' in text)
+    assert('h_seconds_bucket{le="+Inf"} 3' in text)
+    assert('h_seconds_count 3' in text)
+    assert('# TYPE h_seconds histogram' in text)
+
+def test_error_counter_family_matches_its_sample():
+    h = Histogram("h", "help text")
+    h.observe(1, error=True)
+    lines = h.exposition().splitlines()
+    assert("# TYPE h_errors_total counter" in lines)
+    assert("h_errors_total 1" in lines)
+    lines = h.exposition(openmetrics=True).splitlines()
+    assert("# TYPE h_errors counter" in lines)
+    assert("h_errors_total 1" in lines)
+
+def test_disabled_registry_records_nothing(registry):
+    @instrumented("f", registry=registry)
+    def f(x):
+        return x * 2
+    assert(f(2) == 4)
+    assert(registry.histograms["f"].count == 0)
+
+def test_enabled_registry_records_calls_and_errors(registry):
+    @instrumented("f", registry=registry)
+    def f(x):
+        if x is None:
+            raise ValueError
+        return x
+    registry.enable()
+    f(1)
+    with pytest.raises(ValueError):
+        f(None)
+    assert(registry.histograms["f"].count == 2)
+    assert(registry.histograms["f"].errors == 1)
+
+def test_reset(registry):
+    registry.histogram("f").observe(1.0)
+    registry.reset()
+    assert(registry.histograms["f"].count == 0)
+
+def test_openmetrics_trailer(registry):
+    registry.histogram("f")
+    assert(registry.exposition(openmetrics=True).endswith("# EOF\n"))
+
+def test_game_manager_operations_are_instrumented(enabled_global_registry):
+    gm = GameManager()
+    p1 = gm.add_contestant()
+    p2 = gm.add_contestant()
+    game_id = gm.create_game(p1.id, p2.id)['id']
+    gm.list_contestants()
+    gm.acquire_card(game_id, p1.id, "draw")
+    counts = {name: h.count for (name, h) in enabled_global_registry.histograms.items()}
+    assert(counts["pylgrum_game_manager_add_contestant"] == 2)
+    assert(counts["pylgrum_game_manager_create_game"] == 1)
+    assert(counts["pylgrum_game_manager_list_contestants"] == 1)
+    assert(counts["pylgrum_game_acquire_card"] == 1)
+    assert(counts["pylgrum_game_status_for"] == 1)
+    assert("pylgrum_game_manager_create_game_seconds_count 1" in gm.metrics_text())
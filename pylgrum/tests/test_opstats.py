@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from pylgrum.card import Card, Rank, Suit
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.hand_melds import HandWithMelds
+from pylgrum.meld import Meld
+from pylgrum.meld_detector import MeldDetector
+from pylgrum.opstats import COUNTERS, OpCounters
+
+class DetectingPlayer(GreedyPlayer):
+    """A GreedyPlayer that also runs MeldDetector over its hand each turn."""
+
+    def turn_start(self, move) -> None:
+        MeldDetector(*self.hand.cards).detect_optimal_melds()
+        super().turn_start(move)
+
+@pytest.fixture
+def counters():
+    c = OpCounters()
+    yield c
+    c.disable()
+
+def _run():
+    return [Card(rank=Rank.ACE, suit=suit) for suit in (Suit.CLUB, Suit.HEART, Suit.SPADE)]
+
+def test_disabled_counters_leave_methods_alone(counters):
+    init = Meld.__dict__["__init__"]
+    deadwood_value = HandWithMelds.__dict__["deadwood_value"]
+    counters.enable()
+    assert(Meld.__dict__["__init__"] is not init)
+    counters.disable()
+    assert(Meld.__dict__["__init__"] is init)
+    assert(HandWithMelds.__dict__["deadwood_value"] is deadwood_value)
+    Meld(*_run())
+    assert(not counters.totals())
+
+def test_counts_methods_and_properties(counters):
+    counters.enable()
+    hand = HandWithMelds()
+    hand.add(_run())
+    meld = hand.create_meld(*_run())
+    hand.deadwood_value # pylint: disable=pointless-statement
+    hand.remove_meld(meld)
+    totals = counters.totals()
+    assert(totals["HandWithMelds.create_meld"] == 1)
+    assert(totals["HandWithMelds.remove_meld"] == 1)
+    assert(totals["HandWithMelds.deadwood_value"] == 1)
+    assert(totals["Meld.__init__"] >= 1)
+    assert(totals["Meld._update_validity"] >= 1)
+
+def test_enable_twice_wraps_once(counters):
+    counters.enable()
+    counters.enable()
+    Meld(*_run())
+    assert(counters.totals()["Meld.__init__"] == 1)
+
+def test_only_one_instance_can_be_enabled(counters):
+    f = counters # typographical shortcut for the fixture
+    init = Meld.__dict__["__init__"]
+    other = OpCounters()
+    f.enable()
+    with pytest.raises(RuntimeError):
+        other.enable()
+    assert(not other.enabled)
+    f.disable()
+    assert(Meld.__dict__["__init__"] is init)
+    other.enable()
+    other.disable()
+    assert(Meld.__dict__["__init__"] is init)
+
+def test_counts_are_kept_after_disable_until_reset(counters):
+    counters.enable()
+    Meld(*_run())
+    counters.disable()
+    Meld(*_run())
+    assert(counters.totals()["Meld.__init__"] == 1)
+    counters.reset()
+    assert(not counters.totals())
+
+def test_calls_during_a_game_are_credited_to_it(counters):
+    random.seed(3)
+    games = [Game(DetectingPlayer(), DetectingPlayer()) for _ in range(2)]
+    counters.enable()
+    Meld(*_run()) # outside any game
+    outside = counters.totals()
+    for g in games:
+        g.play()
+    (first, second) = (counters.for_game(g) for g in games)
+    assert(first["MeldDetector.detect_optimal_melds"] > 0)
+    assert(second["MeldDetector.detect_optimal_melds"] > 0)
+    assert(first + second + outside == counters.totals())
+
+    counters.reset(games[0])
+    assert(not counters.for_game(games[0]))
+    assert(counters.for_game(games[1]) == second)
+
+def test_global_counters_start_disabled():
+    assert(not COUNTERS.enabled)
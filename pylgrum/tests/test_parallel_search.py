@@ -0,0 +1,68 @@
+import pytest
+
+from pylgrum.card import Card
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.move import CardSource
+from pylgrum.parallel_search import SearchPool, decode_action, encode_action, merged_choice
+from pylgrum.search import SearchState, finish_actions
+from pylgrum.search_player import SearchPlayer
+
+def mask(*card_strings):
+    return sum(1 << Card.from_text(card).index for card in card_strings)
+
+@pytest.fixture(scope="module")
+def pool():
+    with SearchPool(2, seed=1) as pool:
+        yield pool
+
+def test_encode_actions():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH")
+    actions = [CardSource.DRAW_STACK, CardSource.DISCARD_STACK] + finish_actions(hand)
+    codes = [encode_action(action) for action in actions]
+    assert(len(set(codes)) == len(codes))
+    assert([decode_action(code) for code in codes] == actions)
+
+def test_pool_search(pool):
+    f = pool # typographical shortcut for the fixture
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH")
+    state = SearchState(hand, -1, mask("QD"), 0, 20)
+    actions = finish_actions(hand)
+    (action, stats) = f.search(state, actions, budget=0.01)
+    assert(action in actions)
+    assert(stats["workers"] == 2)
+    assert(stats["samples"] >= 2 * 4) # every worker completes its first pass
+    assert(stats["nodes"] > 0)
+    assert(len(stats["visits"]) == len(actions))
+    assert(sum(stats["visits"]) >= 2 * 4 * len(actions))
+
+def test_merged_choice_when_workers_disagree():
+    # each worker's last pass compared actions 0 and 1, in different worlds
+    first = ([12, 12, 4], [60, 30, 10])   # prefers action 0
+    second = ([12, 12, 4], [20, 90, 10])  # prefers action 1, by more
+    visits = [a + b for (a, b) in zip(first[0], second[0])]
+    values = [a + b for (a, b) in zip(first[1], second[1])]
+    assert(merged_choice(visits, values) == 1)
+    # more worlds beats a better total over fewer of them
+    assert(merged_choice([4, 12], [40, 12]) == 1)
+    assert(merged_choice([8, 8], [5, 5]) == 0)
+
+def test_pool_search_single_action(pool):
+    f = pool # typographical shortcut for the fixture
+    state = SearchState(mask("2C", "2S"), -1, 0, 0, 20)
+    (action, stats) = f.search(state, [CardSource.DRAW_STACK])
+    assert(action == CardSource.DRAW_STACK)
+    assert(stats["samples"] == 0)
+
+def test_search_player_with_pool(pool):
+    f = pool # typographical shortcut for the fixture
+    g = Game(SearchPlayer(budget=0.002, pool=f), GreedyPlayer())
+    g.play()
+    assert(g.is_over)
+
+def test_closed_pool():
+    pool = SearchPool(1)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.search(SearchState(mask("2C", "2S"), 5, 0, 0, 20),
+                    [CardSource.DRAW_STACK, CardSource.DISCARD_STACK])
@@ -12,6 +12,13 @@ class TestPlayer(unittest.TestCase):
     def test_initial_hand_size(self):
         self.assertEqual(self.p.hand.size(), 0)
 
+    def test_reset_hand(self):
+        p = Player(handtype=HandWithMelds)
+        p.receive_card(Card(rank=Rank.TEN, suit=Suit.HEART))
+        p.reset_hand()
+        self.assertEqual(p.hand.size(), 0)
+        self.assertIsInstance(p.hand, HandWithMelds)
+
     def test_receive_card(self):
         self.p.receive_card(Card(rank=Rank.TEN, suit=Suit.HEART))
         self.assertEqual(self.p.hand.size(), 1)
@@ -0,0 +1,40 @@
+import os
+import pstats
+import time
+
+import pytest
+
+from pylgrum.profile import StackSampler, profile_games
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sampler_collects_collapsed_stacks():
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    _spin(0.1)
+    sampler.stop()
+    assert(sum(sampler.stacks.values()) > 0)
+    lines = sampler.collapsed().splitlines()
+    assert(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+    assert(any("test_profile:_spin" in line for line in lines))
+    assert(sampler.collapsed(("pylgrum.server",)) == "")
+
+@pytest.mark.parametrize("focus", ["all", "meld", "server"])
+def test_profile_games_writes_outputs(focus, tmp_path):
+    summary = profile_games(3, str(tmp_path), seed=1, focus=focus, top=5)
+    for path in summary["files"].values():
+        assert(os.path.exists(path))
+    assert(pstats.Stats(summary["files"]["profile.prof"]).total_calls > 0)
+    assert(0 < len(summary["top"]) <= 5)
+    if focus == "server":
+        assert(all("server" in row["function"] for row in summary["top"]))
+    if focus == "meld":
+        assert(all("meld" in row["function"] or "layoff" in row["function"]
+                   for row in summary["top"]))
+
+def test_unknown_focus(tmp_path):
+    with pytest.raises(ValueError):
+        profile_games(1, str(tmp_path), focus="everything")
@@ -0,0 +1,180 @@
+import pytest
+import json
+import random
+
+from pylgrum.card import Card
+from pylgrum.deck import Deck
+from pylgrum.errors import IllegalMoveError, PylgrumError
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.player import Player
+from pylgrum.stack import CardStack
+from pylgrum.scoring import (HandOutcome, HandRecord, Match, ScoringRules,
+                             hand_record, score_game, score_hand, score_hands)
+
+def mask(*card_strings):
+    return sum(1 << Card.from_text(card).index for card in card_strings)
+
+def index(card_string):
+    return Card.from_text(card_string).index
+
+# knocker: 2C 3C 4C run, 5S 5H 5D set, 9H 10H JH run, 3S deadwood (3)
+KNOCKER = mask("2C", "3C", "4C", "5S", "5H", "5D", "9H", "10H", "JH", "3S")
+GIN = mask("2C", "3C", "4C", "5S", "5H", "5D", "9H", "10H", "JH", "QH")
+
+def test_knock():
+    defender = mask("KS", "QS", "JS", "KD", "QD", "8C", "7C", "2D", "4D", "6S")
+    result = score_hand(KNOCKER, defender)
+    assert(result.outcome == HandOutcome.KNOCK)
+    assert(result.knocker_deadwood == 3)
+    assert(result.defender_deadwood == 10 + 10 + 8 + 7 + 2 + 4 + 6)
+    assert(result.points == result.defender_deadwood - 3)
+    assert(result.layoffs == 0)
+
+def test_knock_with_layoffs():
+    # 5C lays off on the 2C-4C run, and QH on the 9H-JH run
+    defender = mask("KS", "QS", "JS", "5C", "QH", "8C", "7D", "2D", "4D", "6S")
+    result = score_hand(KNOCKER, defender)
+    assert(result.layoffs == mask("5C", "QH"))
+    assert(result.defender_deadwood == 8 + 7 + 2 + 4 + 6)
+    assert(result.points == 27 - 3)
+
+def test_undercut():
+    defender = mask("KS", "QS", "JS", "KD", "QD", "JD", "8C", "7C", "6C", "2S")
+    result = score_hand(KNOCKER, defender)
+    assert(result.outcome == HandOutcome.UNDERCUT)
+    assert(result.points == -(3 - 2 + 25))
+
+def test_equal_deadwood_is_an_undercut():
+    defender = mask("KS", "QS", "JS", "KD", "QD", "JD", "8C", "7C", "6C", "3D")
+    assert(score_hand(KNOCKER, defender).points == -25)
+
+def test_gin():
+    # 8H could be laid off on the knocker's run, but not on gin
+    defender = mask("KS", "QS", "JS", "KD", "QD", "8H", "7C", "2D", "4D", "6S")
+    result = score_hand(GIN, defender)
+    assert(result.outcome == HandOutcome.GIN)
+    assert(result.layoffs == 0)
+    assert(result.points == 10 + 10 + 8 + 7 + 2 + 4 + 6 + 25)
+
+def test_layoffs_on_gin_rule():
+    defender = mask("KS", "QS", "JS", "KD", "QD", "8H", "7C", "2D", "4D", "6S")
+    result = score_hand(GIN, defender, rules=ScoringRules(layoffs_on_gin=True))
+    assert(result.layoffs == mask("8H"))
+    assert(result.points == 10 + 10 + 7 + 2 + 4 + 6 + 25)
+
+def test_big_gin():
+    defender = mask("KS", "QS", "JS", "KD", "QD", "8D", "7C", "2D", "4D", "6S")
+    assert(score_hand(GIN, defender, index("KH")).outcome == HandOutcome.BIG_GIN)
+    assert(score_hand(GIN, defender, index("KH")).points == 47 + 31)
+    assert(score_hand(GIN, defender, index("KC")).outcome == HandOutcome.GIN)
+    assert(score_hand(GIN, defender).outcome == HandOutcome.GIN)
+
+def test_rules_are_configurable():
+    rules = ScoringRules(gin_bonus=20, undercut_bonus=10)
+    defender = mask("KS", "QS", "JS", "KD", "QD", "JD", "8C", "7C", "6C", "2S")
+    assert(score_hand(KNOCKER, defender, rules=rules).points == -(1 + 10))
+    assert(score_hand(GIN, defender, rules=rules).points == 2 + 20)
+
+def test_illegal_knock():
+    knocker = mask("2C", "3C", "4C", "5S", "5H", "5D", "7H", "8H", "KS", "QS")
+    defender = mask("KD", "QC", "JS", "KC", "QD", "8C", "7C", "2D", "4D", "6S")
+    with pytest.raises(IllegalMoveError):
+        score_hand(knocker, defender)
+    result = score_hand(knocker, defender, rules=ScoringRules(knock_limit=35))
+    assert(result.points == 77 - 35)
+
+def stacked_deck(*top_cards):
+    """A deck whose first cards (dealt alternately, then the rest) are given."""
+    deck = CardStack()
+    rest = [card for card in Deck().cards if str(card) not in
+            [str(Card.from_text(text)) for text in top_cards]]
+    for card in rest:
+        deck.add(card)
+    for text in reversed(top_cards):
+        deck.add(Card.from_text(text))
+    return deck
+
+@pytest.fixture
+def knocked_game():
+    first = ["2C", "3C", "4C", "5S", "5H", "5D", "9H", "10H", "JH", "KS"]
+    second = ["KD", "QS", "JS", "KC", "QD", "8C", "7C", "2D", "4D", "6S"]
+    dealt = []
+    for (first_card, second_card) in zip(first, second):
+        dealt.extend([first_card, second_card])
+    deck = stacked_deck(*(dealt + ["QC", "AS"]))
+    return Game(GreedyPlayer(), GreedyPlayer(), deck=deck)
+
+def test_score_game(knocked_game):
+    f = knocked_game # typographical shortcut for the fixture
+    with pytest.raises(PylgrumError):
+        score_game(f)
+    f.play()
+    # player1 draws AS, throws KS and knocks with 1 deadwood
+    assert(f.current_player is f.player1)
+    record = hand_record(f)
+    assert(record == HandRecord(mask("2C", "3C", "4C", "5S", "5H", "5D", "9H", "10H",
+                                     "JH", "AS"),
+                                mask("KD", "QS", "JS", "KC", "QD", "8C", "7C", "2D",
+                                     "4D", "6S"),
+                                index("KS")))
+    result = score_game(f)
+    assert(result.outcome == HandOutcome.KNOCK)
+    assert(result.points == 77 - 1)
+
+def test_exhausted_game_scores_nothing():
+    g = Game(Player(), Player())
+    while g._deck.size() > Game.DRAW_PILE_MINIMUM:
+        g._draw()
+    g.next_turn()
+    assert(score_game(g).outcome == HandOutcome.NO_WINNER)
+    assert(score_game(g).points == 0)
+
+def played_records(count, seed):
+    """HandRecords from games between GreedyPlayers."""
+    random.seed(seed)
+    records = []
+    for _ in range(count):
+        game = Game(GreedyPlayer(), GreedyPlayer())
+        game.play()
+        records.append(hand_record(game))
+    return records
+
+def test_score_hands_matches_score_hand():
+    records = played_records(100, 7) + [HandRecord(0, 0, -1)]
+    expected = [score_hand(*record) for record in records if record.knocker]
+    results = score_hands(records)
+    assert([result for result in results if result.outcome != HandOutcome.NO_WINNER]
+           == expected)
+    assert(results[-1].outcome == HandOutcome.NO_WINNER)
+    # records read back from JSON
+    assert(score_hands(json.loads(json.dumps(records))) == results)
+
+def test_score_hands_in_worker_processes():
+    records = played_records(50, 8)
+    assert(score_hands(records, workers=2, chunk_size=10) == score_hands(records))
+
+def test_match():
+    random.seed(3)
+    (p1, p2) = (GreedyPlayer("one"), GreedyPlayer("two"))
+    result = Match(p1, p2, ScoringRules(match_target=50)).play()
+    assert(result.totals[result.winner] >= 50)
+    loser = p2 if result.winner is p1 else p1
+    assert(result.totals[loser] < 50)
+    assert(sum(abs(hand.points) for (_, hand) in result.hands) ==
+           result.totals[p1] + result.totals[p2])
+    assert(result.final[result.winner] >= result.totals[result.winner] + 100 + 25)
+
+def test_match_alternates_first_player():
+    random.seed(4)
+    match = Match(GreedyPlayer(), GreedyPlayer())
+    (game, result) = (None, None)
+    while result is None or result.outcome == HandOutcome.NO_WINNER:
+        result = match.play_hand()
+        game = match.hands[-1][0]
+    knocker = game.current_player
+    defender = game.player2 if knocker is game.player1 else game.player1
+    winner = knocker if result.points > 0 else defender
+    match.play_hand()
+    next_game = match.hands[-1][0]
+    assert(next_game.player1 is not winner)
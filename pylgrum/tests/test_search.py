@@ -0,0 +1,105 @@
+import pytest
+import random
+
+from pylgrum.card import Card
+from pylgrum.move import CardSource
+from pylgrum.meld_solver import deadwood_value
+from pylgrum.search import (SearchState, finish_actions, knock_value, rollout,
+                            sample_world, search, start_actions)
+
+def mask(*card_strings):
+    return sum(1 << Card.from_text(card).index for card in card_strings)
+
+@pytest.fixture
+def state():
+    """A 10-card hand with 3 melds and the 4C as deadwood; 2H showing."""
+    yield SearchState(
+        hand=mask("2C", "2S", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH"),
+        top=Card.from_text("2H").index,
+        seen=mask("QC", "QD"),
+        opponent_known=mask("7H", "8H"),
+        draw_pile_size=29,
+    )
+
+def test_sample_world_is_consistent(state):
+    f = state # typographical shortcut for the fixture
+    (opponent, pile) = sample_world(f, random.Random(1))
+    assert(bin(opponent).count("1") == 10)
+    assert(opponent & f.opponent_known == f.opponent_known)
+    assert(opponent & (f.hand | f.seen | 1 << f.top) == 0)
+    assert(len(pile) == f.draw_pile_size)
+    assert(len(set(pile)) == len(pile))
+    for index in pile:
+        assert(not opponent >> index & 1)
+        assert(not (f.hand | f.seen | f.opponent_known | 1 << f.top) >> index & 1)
+
+def test_start_actions(state):
+    f = state # typographical shortcut for the fixture
+    assert(start_actions(f) == [CardSource.DISCARD_STACK, CardSource.DRAW_STACK])
+    assert(start_actions(f._replace(top=Card.from_text("KS").index)) ==
+           [CardSource.DRAW_STACK, CardSource.DISCARD_STACK])
+    assert(start_actions(f._replace(top=-1)) == [CardSource.DRAW_STACK])
+
+def test_finish_actions():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH")
+    actions = finish_actions(hand)
+    assert(len(actions) == 11 + 2) # 4C and KH can each be discarded to knock
+    assert(actions[0] == (Card.from_text("KH").index, True))
+    assert((Card.from_text("4C").index, True) in actions)
+    assert((Card.from_text("2C").index, True) not in actions)
+
+def test_finish_actions_respects_keep():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C", "KH")
+    actions = finish_actions(hand, keep=mask("KH"))
+    assert(Card.from_text("KH").index not in [index for (index, _) in actions])
+
+def test_knock_value():
+    knocker = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "4C")
+    gin = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "QS")
+    defender = mask("AC", "3S", "AH", "3D", "7D", "8C", "KS", "10H", "JH", "4H")
+    assert(knock_value(knocker, defender) == deadwood_value(defender) - 4)
+    assert(knock_value(gin, defender) == deadwood_value(defender) + 25)
+    assert(knock_value(defender, knocker) == -(deadwood_value(defender) - 4 + 25))
+
+def test_rollout_stops_at_horizon(state):
+    f = state # typographical shortcut for the fixture
+    (opponent, pile) = sample_world(f, random.Random(1))
+    pile_size = len(pile)
+    (_, turns) = rollout([f.hand, opponent], 1, f.top, pile, 1, knock_limit=-1)
+    assert(turns == 1)
+    assert(len(pile) >= pile_size - 1)
+
+def test_rollout_ends_when_draw_pile_runs_out(state):
+    f = state # typographical shortcut for the fixture
+    (opponent, pile) = sample_world(f, random.Random(1))
+    (value, turns) = rollout([f.hand, opponent], 1, f.top, pile, 100, knock_limit=-1)
+    assert(value == 0)
+    assert(len(pile) <= 2)
+
+def test_search_takes_useful_discard(state):
+    f = state # typographical shortcut for the fixture
+    # given the worse choice as the default, search should find the better one
+    (action, stats) = search(f, [CardSource.DRAW_STACK, CardSource.DISCARD_STACK],
+                             rng=random.Random(1), max_samples=20)
+    assert(action == CardSource.DISCARD_STACK)
+    assert(stats['samples'] == 20)
+    assert(stats['depth'] >= 1)
+
+def test_search_knocks_with_gin():
+    hand = mask("2C", "2S", "2H", "4D", "5D", "6D", "9S", "10S", "JS", "QS", "KH")
+    state = SearchState(hand=hand, top=-1, seen=0, opponent_known=0, draw_pile_size=20)
+    (action, _) = search(state, finish_actions(hand), rng=random.Random(1), max_samples=20)
+    assert(action == (Card.from_text("KH").index, True))
+
+def test_search_respects_budget(state):
+    f = state # typographical shortcut for the fixture
+    (_, stats) = search(f, [CardSource.DRAW_STACK, CardSource.DISCARD_STACK], budget=0.01)
+    assert(stats['seconds'] < 0.5)
+    assert(stats['nodes'] > 0)
+    assert(stats['nodes_per_second'] > 0)
+
+def test_search_with_one_action(state):
+    f = state # typographical shortcut for the fixture
+    (action, stats) = search(f, [CardSource.DRAW_STACK])
+    assert(action == CardSource.DRAW_STACK)
+    assert(stats['samples'] == 0)
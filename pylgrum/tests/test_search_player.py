@@ -0,0 +1,40 @@
+import pytest
+
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.search_player import SearchPlayer
+from pylgrum.move import MoveState
+
+@pytest.fixture
+def game():
+    """A game between a SearchPlayer and a GreedyPlayer."""
+    yield Game(SearchPlayer(budget=0.005, seed=1), GreedyPlayer())
+
+def test_search_player_moves(game):
+    f = game # typographical shortcut for the fixture
+    f.start_new_move()
+    f.player1.turn_start(f.current_move)
+    assert(f.current_move.state == MoveState.IN_PROGRESS)
+    f.acquire_card()
+    f.player1.turn_finish(f.current_move)
+    assert(f.current_move.state == MoveState.COMPLETE)
+    assert(f.current_move.discarded in f.player1.hand.cards)
+    assert(f.player1.last_stats['samples'] > 0)
+    f.finalize_move()
+    assert(len(f.player1.hand.cards) == 10)
+
+def test_search_player_tracks_knowledge(game):
+    f = game # typographical shortcut for the fixture
+    f.start_new_move()
+    f.player1.turn_start(f.current_move)
+    f.acquire_card()
+    f.player1.turn_finish(f.current_move)
+    f.finalize_move()
+    f.next_turn()
+    assert(f.player1.knowledge.own == sum(1 << c.index for c in f.player1.hand.cards))
+    assert(f.player1.knowledge.top == f.current_move.discarded.index)
+
+def test_search_game_finishes(game):
+    f = game # typographical shortcut for the fixture
+    f.play()
+    assert(f.is_over)
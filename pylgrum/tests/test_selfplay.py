@@ -0,0 +1,80 @@
+import pytest
+import ast
+import os
+
+from pylgrum.selfplay import (NPY_HEADER_SIZE, PHASE_FINISH, PHASE_START, ROW_WIDTH,
+                              ShardWriter, generate, play_game, read_shard)
+
+def rows_of(values):
+    return [values[i:i + ROW_WIDTH] for i in range(0, len(values), ROW_WIDTH)]
+
+def test_shard_header(tmp_path):
+    writer = ShardWriter(str(tmp_path))
+    writer.write(list(range(ROW_WIDTH)))
+    writer.close()
+    with open(writer.paths[0], "rb") as shard:
+        data = shard.read()
+    assert(data[:8] == b"\x93NUMPY\x01\x00")
+    header_len = int.from_bytes(data[8:10], "little")
+    assert(10 + header_len == NPY_HEADER_SIZE)
+    assert(NPY_HEADER_SIZE % 64 == 0)
+    assert(data[NPY_HEADER_SIZE - 1:NPY_HEADER_SIZE] == b"\n")
+    header = ast.literal_eval(data[10:NPY_HEADER_SIZE].decode("latin1"))
+    assert(header == {'descr': '<i2', 'fortran_order': False, 'shape': (1, ROW_WIDTH)})
+    assert(len(data) == NPY_HEADER_SIZE + 2 * ROW_WIDTH)
+
+def test_shard_round_trip(tmp_path):
+    writer = ShardWriter(str(tmp_path), buffer_rows=2)
+    rows = [[(i * 7 + j) % 300 - 150 for j in range(ROW_WIDTH)] for i in range(5)]
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    (shape, values) = read_shard(writer.paths[0])
+    assert(shape == (5, ROW_WIDTH))
+    assert([list(row) for row in rows_of(values)] == rows)
+
+def test_shard_rotation(tmp_path):
+    writer = ShardWriter(str(tmp_path), prefix="test", rows_per_shard=3, buffer_rows=2)
+    for i in range(7):
+        writer.write([i] * ROW_WIDTH)
+    writer.close()
+    assert([os.path.basename(path) for path in writer.paths] ==
+           ["test-00000.npy", "test-00001.npy", "test-00002.npy"])
+    assert([read_shard(path)[0][0] for path in writer.paths] == [3, 3, 1])
+    assert(writer.rows == 7)
+    assert(list(read_shard(writer.paths[2])[1]) == [6] * ROW_WIDTH)
+
+def test_game_rows(tmp_path):
+    writer = ShardWriter(str(tmp_path))
+    count = play_game(writer)
+    writer.close()
+    (shape, values) = read_shard(writer.paths[0])
+    assert(shape == (count, ROW_WIDTH))
+    rows = rows_of(values)
+    outcomes = set()
+    for row in rows:
+        hand = row[0:52]
+        phase = row[158]
+        if phase == PHASE_START:
+            assert(sum(hand) == 10)
+            assert(0 <= row[156] < 52)
+            assert(row[159] in (0, 1))
+        else:
+            assert(phase == PHASE_FINISH)
+            assert(sum(hand) == 11)
+            assert(row[156] == -1)
+            assert(hand[row[159] % 52] == 1) # the discard was in hand
+        assert(not any(h and d for (h, d) in zip(hand, row[52:104])))
+        outcomes.add(row[160])
+    assert(len(outcomes) == 1 or sum(outcomes) == 0) # zero-sum between players
+
+def test_generate(tmp_path):
+    summary = generate(str(tmp_path / "data"), games=6, workers=2,
+                       rows_per_shard=50, seed=1)
+    assert(summary["games"] == 6)
+    assert(len(summary["shards"]) >= 2)
+    assert(sum(read_shard(path)[0][0] for path in summary["shards"]) == summary["rows"])
+
+def test_generate_in_process(tmp_path):
+    summary = generate(str(tmp_path), games=2, workers=1, seed=1)
+    assert(summary["shards"] == [os.path.join(str(tmp_path), "shard-000-00000.npy")])
@@ -0,0 +1,55 @@
+import random
+
+from pylgrum.card import Card
+from pylgrum.meld_solver import cards_to_mask, deadwood_value
+from pylgrum.solver_fuzz import (REFERENCE, SOLVERS, check_hand, fuzz, mutated_hand,
+                                 random_hand, reference_orderings, shrink)
+
+def wrong_with_ace_of_diamonds(hand: int) -> int:
+    """A broken solver: off by one whenever the hand holds the ace of diamonds (card index 0)."""
+    return deadwood_value(hand) + (hand & 1)
+
+BROKEN = {REFERENCE: SOLVERS[REFERENCE], "broken": wrong_with_ace_of_diamonds}
+
+def test_generated_hands_have_the_right_size():
+    rng = random.Random(0)
+    for _ in range(50):
+        assert(bin(random_hand(rng)).count("1") == 10)
+        assert(bin(mutated_hand(rng, cards=11)).count("1") == 11)
+
+def test_reference_orderings():
+    assert(reference_orderings(cards_to_mask(Card.from_text("AC", "2C", "3C", "9H"))) == 1)
+    # a 4-card run holds 3 overlapping runs: 3 * 2 * 1 orderings
+    assert(reference_orderings(cards_to_mask(Card.from_text("AC", "2C", "3C", "4C"))) == 6)
+
+def test_check_hand_reports_exceptions():
+    def raises(hand):
+        raise ValueError("nope")
+    results = check_hand(cards_to_mask(Card.from_text("AC", "2C")), {"ok": deadwood_value,
+                                                                     "raises": raises})
+    assert(results == {"ok": 3, "raises": "ValueError: nope"})
+
+def test_registered_solvers_agree():
+    report = fuzz(300, seed=1, workers=1)
+    assert(report.hands == 300)
+    assert(report.checked + report.skipped == 300)
+    assert(report.mismatches == [])
+
+def test_shrink_finds_minimal_hand():
+    hand = cards_to_mask(Card.from_text("AD", "2D", "3D", "7H", "8H", "KS"))
+    (shrunk, results) = shrink(hand, BROKEN)
+    assert(shrunk == 1 << Card.from_text("AD").index)
+    assert(results == {REFERENCE: 1, "broken": 2})
+
+def test_fuzz_reports_mismatches():
+    report = fuzz(200, seed=2, workers=1, solvers=BROKEN)
+    assert(report.mismatches)
+    for mismatch in report.mismatches:
+        assert(mismatch.hand & 1)
+        assert(mismatch.shrunk == 1)
+
+def test_results_do_not_depend_on_workers():
+    serial = fuzz(120, seed=3, workers=1, solvers=BROKEN, chunk_size=40)
+    parallel = fuzz(120, seed=3, workers=2, solvers=BROKEN, chunk_size=40)
+    assert(serial.mismatches == parallel.mismatches)
+    assert(serial.skipped == parallel.skipped)
@@ -0,0 +1,119 @@
+import itertools
+import json
+import pickle
+import random
+
+import pytest
+
+from pylgrum.game import Game
+from pylgrum.greedy_player import GreedyPlayer
+from pylgrum.turn_trace import PHASES, TurnTracer
+
+def _ticking_clock():
+    """A clock that advances 10ns every time it is read."""
+    return itertools.count(0, 10).__next__
+
+@pytest.fixture
+def traced_game():
+    random.seed(5)
+    game = Game(GreedyPlayer(), GreedyPlayer(), game_id="g1")
+    game.tracer = TurnTracer(capacity=1000, clock=_ticking_clock())
+    game.play()
+    yield game
+
+def test_untraced_game_records_nothing():
+    assert(Game.tracer is None)
+
+def test_every_turn_is_recorded(traced_game):
+    f = traced_game # typographical shortcut for the fixture
+    records = f.tracer.records()
+    assert(len(records) == f.num_moves + (0 if f.draw_pile_exhausted else 1))
+    assert([r.move for r in records] == list(range(len(records))))
+    assert([r.player for r in records[:4]] == [1, 2, 1, 2])
+    assert(all(r.game == "g1" for r in records))
+    for r in records[:-1]:
+        assert(not r.knocked)
+        assert(list(r.phases_ns.values()) == [10] * len(PHASES))
+
+def test_knocking_turn_skips_post_turn_hook():
+    random.seed(1)
+    for _ in range(20):
+        game = Game(GreedyPlayer(), GreedyPlayer())
+        game.tracer = TurnTracer(clock=_ticking_clock())
+        game.play()
+        if not game.draw_pile_exhausted:
+            break
+    last = game.tracer.records()[-1]
+    assert(last.knocked)
+    assert(last.phases_ns["post_turn_hook"] == 0)
+    assert(last.game == id(game))
+
+def test_ring_buffer_keeps_the_latest_turns():
+    random.seed(5)
+    game = Game(GreedyPlayer(), GreedyPlayer())
+    game.tracer = TurnTracer(capacity=3, clock=_ticking_clock())
+    game.play()
+    records = game.tracer.records()
+    assert(len(records) == 3)
+    assert(records[-1].move == game.num_moves - (1 if game.draw_pile_exhausted else 0))
+    assert(game.tracer.dropped > 0)
+    game.tracer.reset()
+    assert(game.tracer.records() == [])
+
+def test_summary_separates_think_time(traced_game):
+    f = traced_game # typographical shortcut for the fixture
+    summary = f.tracer.summary()
+    assert(summary["think_ns"] == 2 * 10 * summary["turns"])
+    assert(summary["think_ns"] + summary["engine_ns"] == sum(summary["phases_ns"].values()))
+
+def test_dumps(traced_game, tmp_path):
+    f = traced_game # typographical shortcut for the fixture
+    turns = len(f.tracer.records())
+    assert(f.tracer.dump_jsonl(str(tmp_path / "t.jsonl")) == turns)
+    lines = (tmp_path / "t.jsonl").read_text().splitlines()
+    assert(len(lines) == turns)
+    assert(json.loads(lines[0])["phases_ns"]["turn_start"] == 10)
+
+    assert(f.tracer.dump_chrome_trace(str(tmp_path / "t.json")) == turns)
+    events = json.loads((tmp_path / "t.json").read_text())["traceEvents"]
+    phases = [e for e in events if e["ph"] == "X"]
+    knocked = 0 if f.draw_pile_exhausted else 1
+    assert(len(phases) == turns * len(PHASES) - knocked)
+    assert(phases[0]["dur"] == pytest.approx(0.01))
+
+def test_tracer_is_not_pickled(traced_game):
+    f = traced_game # typographical shortcut for the fixture
+    assert(pickle.loads(pickle.dumps(f)).tracer is None)
+
+class FailingPlayer(GreedyPlayer):
+    """Raises at the start of its turn on the given move."""
+    def __init__(self, move: int) -> None:
+        super().__init__()
+        self.fail_on = move
+
+    def turn_start(self, move):
+        if self.game.num_moves == self.fail_on:
+            raise RuntimeError("player crashed")
+        super().turn_start(move)
+
+def test_aborted_turn_does_not_hide_later_turns():
+    tracer = TurnTracer(capacity=1000, clock=_ticking_clock())
+    random.seed(5)
+    game = Game(FailingPlayer(2), GreedyPlayer())
+    game.tracer = tracer
+    with pytest.raises(RuntimeError):
+        game.play()
+    assert(tracer.aborted == 1)
+    assert(len(tracer.records()) == 2)
+
+    random.seed(5)
+    game = Game(GreedyPlayer(), GreedyPlayer(), game_id="g1")
+    game.tracer = tracer
+    game.play()
+    records = [r for r in tracer.records() if r.game == "g1"]
+    assert(len(records) == game.num_moves + (0 if game.draw_pile_exhausted else 1))
+    assert(records[-1].knocked != game.draw_pile_exhausted)
+    summary = tracer.summary()
+    assert(summary["turns"] == 2 + len(records))
+    assert(summary["aborted"] == 1)
+    assert(summary["dropped"] == 0)
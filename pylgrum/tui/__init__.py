@@ -4,4 +4,27 @@ Classes all extend base classes from `pylgrum`:
 
     TUIGame: simple console-based proof-of-concept
     TUIPlayer: simple console-based PoC
-"""
\ No newline at end of file
+
+Both are imported when first used (on python >=3.7; see PEP 562).
+"""
+
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "TUIGame": "pylgrum.tui.game",
+    "TUIPlayer": "pylgrum.tui.player",
+}
+"""Class name -> the module it is imported from on first access."""
+
+_LAZY_SUBMODULES = frozenset(("game", "player", "util"))
+
+def __getattr__(name: str):
+    """Import a class or module on first access (PEP 562)."""
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
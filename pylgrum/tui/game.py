@@ -1,8 +1,10 @@
 """Text-mode game controller."""
 import time
 
+from pylgrum.errors import IllegalMoveError
 from pylgrum.game import Game
 from pylgrum.player import Player
+from pylgrum.scoring import HandOutcome, score_game
 from pylgrum.tui.util import clear_screen
 
 DELAY = 0.25 # in seconds
@@ -48,3 +50,24 @@ class TUIGame(Game):
         clear_screen()
         print("{}'s move:\n  {}".
               format(self._current_player, self.current_move.public_str()))
+
+    def game_over_hook(self):
+        """Announce how the game ended, and its score.
+
+        This method implements the abstract base method.
+        """
+        try:
+            result = score_game(self)
+        except IllegalMoveError as err:
+            print("Illegal knock: {}".format(err.message))
+            return
+        if result.outcome == HandOutcome.NO_WINNER:
+            print("The draw pile has run out: nobody wins")
+            return
+        knocker = self._current_player
+        defender = self.player2 if knocker is self.player1 else self.player1
+        print("{} has knocked to end the game".format(knocker))
+        winner = knocker if result.points > 0 else defender
+        print("{} wins {} points ({}; deadwood {} to {})".format(
+            winner, abs(result.points), result.outcome.name.lower().replace("_", " "),
+            result.knocker_deadwood, result.defender_deadwood))
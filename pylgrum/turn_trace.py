@@ -0,0 +1,216 @@
+"""Per-phase timing of game turns, kept in a fixed-size ring buffer.
+
+A turn played by `Game.play()` runs through seven phases - pre_turn_hook,
+start_new_move, the player's turn_start, acquire_card, the player's
+turn_finish, finalize_move and post_turn_hook (skipped when the player
+knocks). A Game with a TurnTracer timestamps the boundaries between them,
+so slow turns can be put down to player think time (turn_start and
+turn_finish) or to engine overhead (everything else) without a profiler:
+
+    from pylgrum.turn_trace import TurnTracer
+    tracer = TurnTracer()
+    game.tracer = tracer        # or Game.tracer = tracer, for every game
+    game.play()
+    tracer.summary()            # {"turns": ..., "think_ns": ..., ...}
+    tracer.dump_chrome_trace("turns.json")  # for chrome://tracing / Perfetto
+
+Each turn is one compact record: eight nanosecond timestamps in a
+preallocated array, plus the game, move number, player and whether they
+knocked. Once the buffer is full the oldest turns are overwritten. A turn
+that raises (e.g. in the player's code) is counted as aborted, and not
+recorded. Without a tracer, a turn costs one attribute check per phase.
+
+Classes:
+
+    TurnRecord: one traced turn
+    TurnTracer: the ring buffer of traced turns
+"""
+
+from array import array
+from collections import namedtuple
+import itertools
+import json
+import os
+import threading
+import time
+
+PHASES = ("pre_turn_hook", "start_new_move", "turn_start", "acquire_card",
+          "turn_finish", "finalize_move", "post_turn_hook")
+"""The phases of a turn, in order."""
+
+THINK_PHASES = ("turn_start", "turn_finish")
+"""The phases spent in the player's code."""
+
+STAMPS = len(PHASES) + 1
+"""Timestamps per turn: the start of each phase, and the end of the last."""
+
+TurnRecord = namedtuple("TurnRecord", ["game", "move", "player", "knocked",
+                                       "start_ns", "phases_ns"])
+TurnRecord.__doc__ = """One traced turn.
+
+Fields:
+    game: the game's game_id, or (if it has none) its id()
+    move (int): the number of moves completed before this turn
+    player (int): 1 or 2
+    knocked (bool): True if the player knocked (so post_turn_hook didn't run)
+    start_ns (int): the tracer clock's reading when the turn started
+    phases_ns (dict): nanoseconds spent in each phase, in PHASES order
+"""
+
+class TurnTracer():
+    """A ring buffer of per-phase turn timings.
+
+    Turns may be traced from several threads at once; each claims its own
+    slot. If the buffer is so small that it wraps around during a turn,
+    that turn's record is lost.
+
+    Attributes:
+        capacity (int): the number of turns kept
+        clock (callable): returns the time in nanoseconds
+    """
+
+    def __init__(self, capacity: int = 4096, clock=time.perf_counter_ns) -> None:
+        """Create an empty tracer.
+
+        Args:
+            capacity (int): [optional] the number of turns to keep
+            clock (callable): [optional] returns the time in nanoseconds
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard every recorded turn."""
+        with self._lock:
+            self._stamps = array("q", [0]) * (self.capacity * STAMPS)
+            self._moves = array("q", [0]) * self.capacity
+            self._turns = array("q", [0]) * self.capacity # claim order, to sort records by
+            self._flags = array("b", [0]) * self.capacity # player, or -player if knocked
+            self._games = [None] * self.capacity
+            self._claimed = itertools.count()
+            self._finished = 0
+            self._aborted = 0
+
+    def begin_turn(self, game) -> int:
+        """Start tracing a turn of game; return its slot (for Game)."""
+        turn = next(self._claimed)
+        slot = turn % self.capacity
+        self._turns[slot] = turn
+        self._games[slot] = game.game_id if game.game_id is not None else id(game)
+        self._moves[slot] = game.num_moves
+        self._flags[slot] = 0
+        self._stamps[slot * STAMPS] = self.clock()
+        return slot
+
+    def stamp(self, slot: int, phase: int) -> None:
+        """Record that phase (an index into PHASES) of a turn has ended."""
+        self._stamps[slot * STAMPS + phase + 1] = self.clock()
+
+    def end_turn(self, slot: int, game, knocked: bool = False) -> None:
+        """Finish tracing a turn (after its last phase has been stamped)."""
+        player = 1 if game.current_player is game.player1 else 2
+        if knocked:
+            base = slot * STAMPS
+            self._stamps[base + STAMPS - 1] = self._stamps[base + STAMPS - 2]
+            player = -player
+        self._flags[slot] = player
+        with self._lock:
+            self._finished += 1
+
+    def abort_turn(self, slot: int) -> None:
+        """Give up tracing a turn that raised before end_turn (for Game)."""
+        self._flags[slot] = 0
+        with self._lock:
+            self._aborted += 1
+
+    @property
+    def aborted(self) -> int:
+        """The number of turns that raised, and so weren't recorded."""
+        return self._aborted
+
+    @property
+    def dropped(self) -> int:
+        """The number of finished turns overwritten by later ones."""
+        with self._lock:
+            finished = self._finished
+        return finished - sum(1 for flag in self._flags if flag)
+
+    def records(self) -> list:
+        """Return the finished turns still in the buffer, oldest first."""
+        slots = sorted((slot for slot in range(self.capacity) if self._flags[slot]),
+                       key=self._turns.__getitem__)
+        result = []
+        for slot in slots:
+            flag = self._flags[slot]
+            if not flag:
+                continue # claimed by a later turn since
+            stamps = self._stamps[slot * STAMPS:(slot + 1) * STAMPS]
+            result.append(TurnRecord(
+                self._games[slot], self._moves[slot], abs(flag), flag < 0, stamps[0],
+                {phase: stamps[i + 1] - stamps[i] for (i, phase) in enumerate(PHASES)}))
+        return result
+
+    def summary(self) -> dict:
+        """Total the recorded turns' time per phase, and think versus engine time.
+
+        Returns {"turns": ..., "dropped": ..., "aborted": ..., "think_ns": ...,
+        "engine_ns": ..., "phases_ns": {phase: total}}.
+        """
+        records = self.records()
+        totals = {phase: sum(record.phases_ns[phase] for record in records)
+                  for phase in PHASES}
+        think = sum(totals[phase] for phase in THINK_PHASES)
+        return {
+            "turns": len(records),
+            "dropped": self.dropped,
+            "aborted": self.aborted,
+            "think_ns": think,
+            "engine_ns": sum(totals.values()) - think,
+            "phases_ns": totals,
+        }
+
+    def dump_jsonl(self, path: str) -> int:
+        """Write one JSON object per recorded turn; return the number written."""
+        records = self.records()
+        with open(path, "w") as out:
+            for record in records:
+                out.write(json.dumps(record._asdict()))
+                out.write("\n")
+        return len(records)
+
+    def dump_chrome_trace(self, path: str) -> int:
+        """Write the recorded turns in the Chrome trace event format.
+
+        Each phase is a complete ("X") event, and each game a thread, so
+        the file can be opened in chrome://tracing or Perfetto. Returns the
+        number of turns written.
+        """
+        records = self.records()
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for record in records:
+            if record.game not in threads:
+                threads[record.game] = len(threads) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": pid,
+                               "tid": threads[record.game],
+                               "args": {"name": "game {}".format(record.game)}})
+            start = record.start_ns
+            for phase in PHASES:
+                duration = record.phases_ns[phase]
+                if not (record.knocked and phase == "post_turn_hook"):
+                    events.append({
+                        "name": phase,
+                        "cat": "think" if phase in THINK_PHASES else "engine",
+                        "ph": "X", "ts": start / 1000, "dur": duration / 1000,
+                        "pid": pid, "tid": threads[record.game],
+                        "args": {"move": record.move, "player": record.player},
+                    })
+                start += duration
+        with open(path, "w") as out:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ns"}, out)
+        return len(records)
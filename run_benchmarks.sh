@@ -0,0 +1,14 @@
+#!/bin/bash
+# Check for performance regressions against a stored baseline.
+#
+#   ./run_benchmarks.sh [NAME]    compare with baseline NAME (default "local"),
+#                                 saving one first if there isn't one yet
+#
+# Exits non-zero if any benchmark is confidently slower than the baseline.
+# Any further arguments are passed on to `python -m benchmarks.compare`.
+NAME=${1:-local}
+shift
+if [ ! -f "benchmarks/baselines/${NAME}.json" ]; then
+    python -m benchmarks.compare save "${NAME}" "$@" || exit
+fi
+python -m benchmarks.compare check "${NAME}" "$@"